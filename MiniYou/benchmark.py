@@ -0,0 +1,319 @@
+"""Benchmarks for the functions in fun.py, run with `python benchmark.py --help`.
+
+    python benchmark.py                                   # every benchmark on 10K rows
+    python benchmark.py --rows 10K 1M --output results.json
+    python benchmark.py --rows 1M --only count_match sort --compare results.json
+    python benchmark.py --parallel --rows 10M --workers 2 4 8
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from fun import *
+from weather_stub import start_weather_stub, stub_forecast
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEALTH_FILE = os.path.join(HERE, "datasets", "health_activity_data.csv")
+SLEEP_FILE = os.path.join(HERE, "datasets", "sleep_health_and_lifestyle_data.csv")
+
+
+def write_synthetic_data(source: str, filename: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic version of a bundled dataset with the given number of rows.
+
+    Each row is a copy of a bundled row picked at random, given a new ID in the first column, so the
+    columns, types and value distributions (and how the columns relate) match the original while the
+    order is shuffled like real data.
+
+    Args:
+        source (str): The bundled CSV file to copy, its first column is the ID.
+        filename (str): Where to write the CSV file.
+        rows (int): The number of data rows to write.
+        seed (int, optional): The random seed, the same seed writes the same file. Defaults to 0.
+    """
+    with open(source, mode="r", encoding="utf-8") as file:
+        header = file.readline()
+        records = [line.split(",", 1)[1] for line in file.read().splitlines() if line]
+    picker = random.Random(seed)
+    with open(filename, mode="w", encoding="utf-8") as file:
+        file.write(header)
+        for start in range(1, rows + 1, 100000):
+            count = min(100000, rows + 1 - start)
+            picked = picker.choices(records, k=count)
+            file.writelines(f"{row_id},{record}\n" for row_id, record in zip(range(start, start + count), picked))
+
+
+def write_synthetic_health_data(filename: str, rows: int) -> None:
+    """Writes a synthetic version of health_activity_data.csv with the given number of rows, see write_synthetic_data."""
+    write_synthetic_data(HEALTH_FILE, filename, rows)
+
+
+def synthetic_file(source: str, rows: int, directory: str) -> str:
+    """Returns the synthetic copy of source with rows rows in directory, writing it the first time."""
+    name = "health" if source == HEALTH_FILE else "sleep"
+    filename = os.path.join(directory, f"synthetic_{name}_{rows}.csv")
+    if not os.path.exists(filename):
+        print(f"Writing {rows} rows to {filename}", file=sys.stderr)
+        write_synthetic_data(source, filename, rows)
+    return filename
+
+
+def parse_rows(text: str) -> int:
+    """Reads a row count such as 10000, 10K, 1M or 10M."""
+    scale = {"K": 1_000, "M": 1_000_000}.get(text[-1:].upper(), 1)
+    try:
+        return int(float(text[:-1] if scale > 1 else text) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a row count: {text!r}") from None
+
+
+def time_call(func: Callable, *args: Any) -> tuple[float, Any]:
+    """Returns the wall time in seconds of one call and its result."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def measure(func: Callable[[], Any], repeat: int, memory: bool) -> dict[str, Any]:
+    """
+    Times func repeat times and, if memory is True, runs it once more under tracemalloc for its peak.
+
+    The memory run is separate because tracing every allocation slows the code down several times.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        elapsed, result = time_call(func)
+        del result
+        times.append(elapsed)
+    measured = {"seconds": min(times), "mean_seconds": sum(times) / len(times), "repeat": repeat}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = func()
+            measured["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        del result
+    return measured
+
+
+def file_cases(health_file: str) -> dict[str, Callable[[], Any]]:
+    """The benchmarks that read the synthetic health file themselves."""
+    return {
+        "load_dict": lambda: mini_load_csv_dict({"filename": health_file}),
+        "load_columnar": lambda: mini_load_csv_dict({"filename": health_file, "storage": "columnar"}),
+        "load_compact": lambda: mini_load_csv_dict({"filename": health_file, "storage": "compact"}),
+        "load_yield": lambda: sum(1 for _ in mini_load_csv_yield(health_file)),
+        "load_pushdown": lambda: mini_load_csv_dict(
+            {"filename": health_file, "columns": ["ID", "BMI"], "where": ("BMI", ">=", 30)}
+        ),
+        "describe_stream": lambda: mini_describe({"Data": mini_load_csv_yield(health_file), "Column": "BMI"}),
+        "query_top_k": lambda: (
+            MiniQuery(health_file)
+            .where(("Smoker", "=", "Yes"))
+            .select("ID", "BMI", "Daily_Steps")
+            .sort([("Daily_Steps", "desc")])
+            .limit(10)
+            .collect()
+        ),
+    }
+
+
+def data_cases(health: list[dict[str, Any]], sleep: list[dict[str, Any]], bubble_rows: int) -> dict[str, Callable[[], Any]]:
+    """The benchmarks over loaded records; mini_bubble_sort only gets the first bubble_rows records."""
+    steps = sorted(record["Daily_Steps"] for record in health)
+    probes = random.Random(1).choices(range(1000, 21000), k=10000)  # mini_value_exists gets the first 100, see below
+    bubble = health[:bubble_rows]
+    weather = [mini_weather_record(place, stub_forecast(place["lat"], place["lon"])) for place in random_places(len(health))]
+    return {
+        "count_match": lambda: mini_count_match({"Data": health, "Gender": "Female", "Smoker": "Yes"}),
+        "count_where": lambda: mini_count_where(
+            {"Data": health, "Where": ("and", ("Age", "between", (30, 50)), ("BMI", ">=", 30))}
+        ),
+        "frequency_table": lambda: mini_frequency_table({"Data": health, "Column": "Age"}),
+        "average": lambda: mini_average({"Data": health, "Column": "Hours_of_Sleep"}),
+        "aggregate": lambda: mini_aggregate({"Data": health, "Aggregates": [
+            {"Function": "len", "Column": "BMI"},
+            {"Function": "describe", "Column": "BMI"},
+            {"Function": "frequency", "Column": "Gender"},
+        ]}),
+        "frequency_table_ids": lambda: mini_frequency_table({"Data": health, "Column": "ID"}),
+        "approx_distinct": lambda: mini_aggregate({"Data": health, "Aggregates": [{"Function": "approx_distinct", "Column": "ID"}]}),
+        "approx_top_k": lambda: mini_aggregate({"Data": health, "Aggregates": [{"Function": "approx_top_k", "Column": "Calories_Intake"}]}),
+        "approx_percentiles": lambda: mini_aggregate({"Data": health, "Aggregates": [{"Function": "approx_percentiles", "Column": "BMI"}]}),
+        "sort": lambda: mini_sort(health, [("Daily_Steps", "desc"), "Age"]),
+        "sort_top_k": lambda: mini_sort(health, [("Daily_Steps", "desc")], top_k=10),
+        "bubble_sort": lambda: mini_bubble_sort(list(bubble), "Daily_Steps"),
+        # mini_value_exists counts the list with mini_simple_len on every call, so each lookup is O(n)
+        "value_exists": lambda: [mini_value_exists(steps, value) for value in probes[:100]],
+        "values_exist": lambda: mini_values_exist(steps, probes),
+        "group_by": lambda: mini_group_by(health, ["Gender", "Smoker"], [{"Function": "mean", "Column": "BMI"}]),
+        "join": lambda: sum(1 for _ in mini_join(sleep, health, ("Person ID", "ID"))),
+        "weather_analytics": lambda: MiniWeatherAnalytics(15, 25).update(weather).snapshot(),
+    }
+
+
+def random_places(count: int, seed: int = 2) -> list[dict[str, Any]]:
+    """Returns count made up cities spread over the inhabited latitudes."""
+    picker = random.Random(seed)
+    return [
+        {"city": f"City {number}", "lat": round(picker.uniform(-60, 70), 4), "lon": round(picker.uniform(-180, 180), 4)}
+        for number in range(count)
+    ]
+
+
+def weather_fetch_case(url: str, cities: int, batch_size: int, workers: int) -> Callable[[], Any]:
+    """Returns a benchmark that fetches cities places from the stub server at url."""
+    places = random_places(cities)
+
+    def fetch() -> list[dict[str, Any]]:
+        with MiniWeatherClient(batch_size, workers, rate=1e9, url=url) as client:
+            return list(client.fetch(places))
+
+    return fetch
+
+
+def git_commit() -> str | None:
+    """Returns the current commit of the repository, if git is available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args: argparse.Namespace) -> dict[str, Any]:
+    """Runs the selected benchmarks at every row count and returns the JSON report."""
+    def wanted(name: str) -> bool:
+        return not args.only or name in args.only
+
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "backend": MINI_BACKEND,
+        },
+        "results": [],
+    }
+
+    def record(name: str, rows: int, func: Callable[[], Any]) -> None:
+        measured = measure(func, args.repeat, not args.no_memory)
+        result = {"name": name, "rows": rows, **measured, "rows_per_second": round(rows / measured["seconds"])}
+        report["results"].append(result)
+        peak = f"  peak {result['peak_bytes'] / 2**20:8.1f} MiB" if "peak_bytes" in result else ""
+        print(f"{name:18} {rows:>10} rows {result['seconds']:9.4f}s{peak}", file=sys.stderr)
+
+    for rows in args.rows:
+        health_file = synthetic_file(HEALTH_FILE, rows, args.data_dir)
+        for name, func in file_cases(health_file).items():
+            if wanted(name):
+                record(name, rows, func)
+        names = [name for name in data_cases([], [], 0) if wanted(name)]
+        if not names:
+            continue
+        if rows > args.max_data_rows:
+            for name in names:
+                report["results"].append({"name": name, "rows": rows, "skipped": f"more than --max-data-rows {args.max_data_rows}"})
+            continue
+        health = mini_load_csv_dict({"filename": health_file})
+        sleep = mini_load_csv_dict({"filename": synthetic_file(SLEEP_FILE, rows, args.data_dir)})
+        cases = data_cases(health, sleep, args.bubble_rows)
+        for name in names:
+            record(name, min(rows, args.bubble_rows) if name == "bubble_sort" else rows, cases[name])
+        del health, sleep, cases
+
+    if wanted("weather_fetch"):
+        server = start_weather_stub(delay=args.delay)  # Local, so the throughput does not depend on the network
+        try:
+            record("weather_fetch", args.cities, weather_fetch_case(server.url, args.cities, args.batch_size, args.fetch_workers))
+        finally:
+            server.shutdown()
+    return report
+
+
+def compare_reports(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Prints each benchmark against the baseline run and returns the ones that are slower than tolerance allows."""
+    before = {(result["name"], result["rows"]): result for result in baseline["results"] if "seconds" in result}
+    regressions = []
+    for result in report["results"]:
+        old = before.get((result["name"], result["rows"]))
+        if old is None or "seconds" not in result:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"{result['name']:18} {result['rows']:>10} rows {old['seconds']:9.4f}s -> {result['seconds']:9.4f}s {ratio:6.2f}x {flag}")
+        if flag:
+            regressions.append(f"{result['name']} at {result['rows']} rows")
+    return regressions
+
+
+def benchmark_parallel_loader(filename: str, storage: str, workers: list[int]) -> None:
+    """Times mini_load_csv_dict for each worker count and checks every result matches the serial load."""
+    serial_time, expected = time_call(mini_load_csv_dict, {"filename": filename, "storage": storage})
+    print(f"workers=1  {serial_time:8.2f}s")
+    for count in workers:
+        if count <= 1:
+            continue
+        elapsed, result = time_call(mini_load_csv_dict, {"filename": filename, "storage": storage, "workers": count})
+        status = "identical" if result == expected else "DIFFERENT"
+        print(f"workers={count:<2} {elapsed:8.2f}s  speedup {serial_time / elapsed:5.2f}x  {status}")
+        del result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_rows, nargs="+", default=[10_000], help="row counts such as 10K 1M 10M")
+    parser.add_argument("--only", nargs="+", help="benchmark names to run, e.g. load_dict count_match weather_fetch")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, the best is reported")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="a previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    parser.add_argument("--data-dir", default=HERE, help="where the synthetic CSV files are kept")
+    parser.add_argument("--max-data-rows", type=parse_rows, default=1_000_000, help="largest data loaded as records")
+    parser.add_argument("--bubble-rows", type=parse_rows, default=2000, help="records given to mini_bubble_sort")
+    parser.add_argument("--cities", type=int, default=1000, help="places fetched from the stub weather server")
+    parser.add_argument("--batch-size", type=int, default=50, help="places per weather request")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="weather requests in flight")
+    parser.add_argument("--delay", type=float, default=0.01, help="seconds of stub server latency per request")
+    parser.add_argument("--parallel", action="store_true", help="compare the parallel loader instead")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8], help="worker counts for --parallel")
+    parser.add_argument("--storage", choices=["dict", "columnar"], default="columnar", help="storage for --parallel")
+    parser.add_argument("--file", default=None, help="the CSV file for --parallel, written if missing")
+    args = parser.parse_args()
+
+    if args.parallel:
+        for rows in args.rows:
+            filename = args.file or synthetic_file(HEALTH_FILE, rows, args.data_dir)
+            print(f"Loading {filename} ({os.path.getsize(filename) / 1e6:.0f} MB, storage={args.storage}) on {os.cpu_count()} CPUs")
+            benchmark_parallel_loader(filename, args.storage, args.workers)
+        sys.exit(0)
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, mode="r", encoding="utf-8") as file:
+            regressions = compare_reports(report, json.load(file), args.tolerance)
+        if regressions:
+            print(f"Slower than {args.tolerance}x the baseline: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
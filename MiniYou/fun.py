@@ -1,10 +1,389 @@
 """Custom Python functions for use in the project."""
 
+import cProfile
 import csv
-from typing import Any, Generator
+import inspect
+import io
+import json
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import pickle
+import pstats
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from collections.abc import Iterable, Iterator, Mapping, Sized
+from contextlib import contextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from itertools import chain, compress, islice, repeat, zip_longest
+from operator import countOf, ge, gt, indexOf, le, lt
+from threading import Lock
+from typing import Any, Callable, Generator, TextIO
 import requests
 import time
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python loops are used without it
+    np = None
+
+MINI_MISSING = (None, "", "None")
+MINI_BACKEND = "numpy" if np is not None else "python"  # Set to "python" to turn the NumPy backend off
+
+
+MINI_METRICS_SINKS = ()  # Set by mini_enable_metrics; while empty, instrumented functions run untouched
+
+
+def mini_emit(event: dict[str, Any]) -> None:
+    """Sends one metrics event to every enabled sink."""
+    event.setdefault("time", time.time())
+    for sink in MINI_METRICS_SINKS:
+        sink.emit(event)
+
+
+def mini_call_event(name: str, args: tuple) -> dict[str, Any]:
+    """Starts the event for one call with the number of records passed in and the size of the file it reads."""
+    first = args[0] if args else None
+    data = first.get("Data") if isinstance(first, dict) else first
+    filename = first.get("filename") if isinstance(first, dict) else first
+    event = {"metric": "call", "function": name}
+    if isinstance(data, Sized) and not isinstance(data, (str, dict)):
+        event["rows"] = len(data)
+    if isinstance(filename, str):
+        try:
+            event["bytes"] = os.path.getsize(filename)
+        except OSError:
+            pass
+    return event
+
+
+def mini_instrumented_generator(generator: Generator, event: dict[str, Any]) -> Generator[Any, None, None]:
+    """Yields what generator yields, timing only the work done inside it, and emits the event when it ends."""
+    yielded = wall = cpu = 0
+    try:
+        while True:
+            start, start_cpu = time.perf_counter(), time.thread_time()
+            try:
+                item = next(generator)
+            except StopIteration:
+                break
+            finally:
+                wall += time.perf_counter() - start
+                cpu += time.thread_time() - start_cpu
+            yielded += 1
+            yield item
+    except GeneratorExit:  # The caller stopped early, which is not an error
+        raise
+    except Exception:
+        event["error"] = True
+        raise
+    finally:
+        generator.close()
+        event.setdefault("rows", yielded)
+        event.update(yielded=yielded, wall_seconds=wall, cpu_seconds=cpu)
+        mini_emit(event)
+
+
+def mini_instrumented(func: Callable) -> Callable:
+    """
+    Decorates a mini_* function so that, while metrics are enabled, each call emits its wall and
+    CPU time, the records it was given (or returned) and the bytes of the file it read.
+
+    While metrics are disabled the wrapper only checks MINI_METRICS_SINKS before calling the function.
+    A generator function is timed only while it works on the next item, not while the caller uses it.
+    """
+    name = func.__name__
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def generator_wrapper(*args: Any, **kwargs: Any) -> Generator[Any, None, None]:
+            if not MINI_METRICS_SINKS:
+                return func(*args, **kwargs)
+            return mini_instrumented_generator(func(*args, **kwargs), mini_call_event(name, args))
+
+        return generator_wrapper
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not MINI_METRICS_SINKS:
+            return func(*args, **kwargs)
+        event = mini_call_event(name, args)
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            event.update(error=True, wall_seconds=time.perf_counter() - start, cpu_seconds=time.thread_time() - start_cpu)
+            mini_emit(event)
+            raise
+        event.update(wall_seconds=time.perf_counter() - start, cpu_seconds=time.thread_time() - start_cpu)
+        if "rows" not in event and isinstance(result, (list, MiniTable)):
+            event["rows"] = len(result)
+        mini_emit(event)
+        return result
+
+    return wrapper
+
+
+def mini_prometheus_labels(labels: dict[str, Any]) -> str:
+    """Formats labels for the Prometheus text format, escaping backslashes, quotes and line breaks."""
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class MiniMetricsRegistry:
+    """
+    The in-memory metrics sink: running totals per function, per HTTP status and per cache.
+
+    Events come from the mini_instrumented functions ('call'), mini_request_json ('http', one per
+    attempt) and the weather and CSV caches ('cache'). Wall and CPU times include any instrumented
+    functions called inside, so nested calls are counted in both.
+
+    Example:
+        registry = mini_enable_metrics()
+        mini_count_match({"Data": sleep_data, "Occupation": "Nurse"})
+        registry.snapshot()["Functions"]["mini_count_match"]
+        {'Calls': 1, 'Errors': 0, 'Wall seconds': 0.000151, 'CPU seconds': 0.00015, 'Max wall seconds': 0.000151, 'Rows': 374, 'Bytes': 0}
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets everything recorded so far."""
+        with self.lock:
+            self.functions = {}  # Function -> [calls, errors, wall, cpu, max wall, rows, bytes]
+            self.http = {}  # Status -> [requests, seconds, max seconds]
+            self.retries = 0
+            self.caches = {}  # Cache -> [hits, misses]
+
+    def emit(self, event: dict[str, Any]) -> None:
+        """Adds one event to the totals."""
+        metric = event["metric"]
+        with self.lock:
+            if metric == "call":
+                totals = self.functions.setdefault(event["function"], [0, 0, 0.0, 0.0, 0.0, 0, 0])
+                totals[0] += 1
+                totals[1] += 1 if event.get("error") else 0
+                totals[2] += event["wall_seconds"]
+                totals[3] += event["cpu_seconds"]
+                totals[4] = max(totals[4], event["wall_seconds"])
+                totals[5] += event.get("rows", 0)
+                totals[6] += event.get("bytes", 0)
+            elif metric == "http":
+                totals = self.http.setdefault(str(event["status"]), [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += event["seconds"]
+                totals[2] = max(totals[2], event["seconds"])
+                self.retries += 1 if event["attempt"] else 0
+            elif metric == "cache":
+                self.caches.setdefault(event["cache"], [0, 0])[0 if event["hit"] else 1] += 1
+
+    def cache_hit_ratio(self, cache: str) -> float | None:
+        """Returns the share of lookups in a cache ('weather' or 'csv') that were hits, or None before any lookup."""
+        with self.lock:
+            hits, misses = self.caches.get(cache, (0, 0))
+        return round(hits / (hits + misses), 4) if hits + misses else None
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns the totals so far.
+
+        Returns:
+            dict[str, Any]: 'Functions' (per function 'Calls', 'Errors', 'Wall seconds', 'CPU seconds',
+                'Max wall seconds', 'Rows' and 'Bytes'), 'HTTP' (per status 'Requests', 'Seconds' and
+                'Max seconds'), 'Retries' and 'Caches' (per cache 'Hits', 'Misses' and 'Hit ratio').
+        """
+        with self.lock:
+            functions = {
+                name: dict(zip(("Calls", "Errors"), totals[:2]))
+                | dict(zip(("Wall seconds", "CPU seconds", "Max wall seconds"), (round(value, 6) for value in totals[2:5])))
+                | {"Rows": totals[5], "Bytes": totals[6]}
+                for name, totals in self.functions.items()
+            }
+            http = {
+                status: {"Requests": count, "Seconds": round(seconds, 6), "Max seconds": round(longest, 6)}
+                for status, (count, seconds, longest) in self.http.items()
+            }
+            caches = {name: {"Hits": hits, "Misses": misses} for name, (hits, misses) in self.caches.items()}
+            retries = self.retries
+        for name, counts in caches.items():
+            lookups = counts["Hits"] + counts["Misses"]
+            counts["Hit ratio"] = round(counts["Hits"] / lookups, 4) if lookups else None
+        return {"Functions": functions, "HTTP": http, "Retries": retries, "Caches": caches}
+
+    def prometheus(self) -> str:
+        """Returns the totals in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        families = [
+            ("mini_calls_total", "counter", "Calls of each mini_* function.", "function", "Functions", "Calls"),
+            ("mini_call_errors_total", "counter", "Calls that raised an error.", "function", "Functions", "Errors"),
+            ("mini_call_wall_seconds_total", "counter", "Wall time spent in each function.", "function", "Functions", "Wall seconds"),
+            ("mini_call_cpu_seconds_total", "counter", "CPU time spent in each function.", "function", "Functions", "CPU seconds"),
+            ("mini_call_rows_total", "counter", "Records passed to or returned by each function.", "function", "Functions", "Rows"),
+            ("mini_call_bytes_total", "counter", "Bytes of the files each function read.", "function", "Functions", "Bytes"),
+            ("mini_http_requests_total", "counter", "Weather HTTP requests by status.", "status", "HTTP", "Requests"),
+            ("mini_http_request_seconds_total", "counter", "Time spent waiting for HTTP responses.", "status", "HTTP", "Seconds"),
+            ("mini_cache_hits_total", "counter", "Cache lookups that were hits.", "cache", "Caches", "Hits"),
+            ("mini_cache_misses_total", "counter", "Cache lookups that were misses.", "cache", "Caches", "Misses"),
+        ]
+        lines = []
+        for metric, kind, help_text, label, section, field in families:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for name, values in snapshot[section].items():
+                lines.append(f"{metric}{mini_prometheus_labels({label: name})} {values[field]}")
+        lines += ["# HELP mini_http_retries_total Weather HTTP requests that were retries.", "# TYPE mini_http_retries_total counter"]
+        lines.append(f"mini_http_retries_total {snapshot['Retries']}")
+        lines += ["# HELP mini_cache_hit_ratio Share of cache lookups that were hits.", "# TYPE mini_cache_hit_ratio gauge"]
+        for name, values in snapshot["Caches"].items():
+            if values["Hit ratio"] is not None:
+                lines.append(f"mini_cache_hit_ratio{mini_prometheus_labels({'cache': name})} {values['Hit ratio']}")
+        return "\n".join(lines) + "\n"
+
+
+class MiniPrometheusSink(MiniMetricsRegistry):
+    """
+    A registry that writes its totals to a file in the Prometheus text format, for example for the
+    node_exporter textfile collector. The file is replaced in one step so it is never read half written.
+
+    Args:
+        path (str): The .prom file to write.
+
+    Example:
+        sink = mini_enable_metrics(MiniPrometheusSink("metrics/mini.prom"))
+        ...
+        sink.write()
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def write(self) -> None:
+        """Writes the current totals to the file."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, mode="w", encoding="utf-8") as file:
+            file.write(self.prometheus())
+        os.replace(temporary, self.path)
+
+
+class MiniJsonLinesSink:
+    """
+    A metrics sink that appends every event to a file as one JSON object per line.
+
+    Args:
+        target (str | TextIO): A file name to append to, or an open text file.
+
+    Example:
+        mini_enable_metrics(MiniJsonLinesSink("metrics.jsonl"))
+        {"metric": "call", "function": "mini_load_csv_dict", "bytes": 80143, "wall_seconds": 0.0113, "cpu_seconds": 0.0113, "rows": 1000, "time": 1760792813.1}
+    """
+
+    def __init__(self, target: str | TextIO):
+        self.file = open(target, mode="a", encoding="utf-8") if isinstance(target, str) else target
+        self.owned = isinstance(target, str)
+        self.lock = Lock()
+
+    def emit(self, event: dict[str, Any]) -> None:
+        """Writes one event."""
+        line = json.dumps(event, default=str) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self) -> None:
+        """Closes the file if the sink opened it."""
+        if self.owned:
+            self.file.close()
+
+
+def mini_enable_metrics(*sinks: Any) -> Any:
+    """
+    Turns metrics on for the instrumented mini_* functions, replacing any sinks set before.
+
+    Args:
+        *sinks: Objects with an emit(event) method, such as MiniMetricsRegistry, MiniPrometheusSink
+            or MiniJsonLinesSink. Defaults to a new MiniMetricsRegistry.
+
+    Returns:
+        The first sink, so `registry = mini_enable_metrics()` keeps hold of it.
+
+    Example:
+        registry = mini_enable_metrics(MiniMetricsRegistry(), MiniJsonLinesSink("metrics.jsonl"))
+    """
+    global MINI_METRICS_SINKS
+    MINI_METRICS_SINKS = sinks or (MiniMetricsRegistry(),)
+    return MINI_METRICS_SINKS[0]
+
+
+def mini_disable_metrics() -> None:
+    """Turns metrics off again; instrumented functions go back to a single check per call."""
+    global MINI_METRICS_SINKS
+    MINI_METRICS_SINKS = ()
+
+
+@contextmanager
+def mini_profile(memory: bool = True, top: int = 20, sort: str = "cumulative") -> Generator[dict[str, Any], None, None]:
+    """
+    Profiles one block of code with cProfile and, if memory is True, tracemalloc.
+
+    The yielded dictionary is filled in when the block ends.
+
+    Args:
+        memory (bool, optional): Also trace memory allocations, which slows the block down. Defaults to True.
+        top (int, optional): How many functions and allocation sites to report. Defaults to 20.
+        sort (str, optional): The pstats sort order. Defaults to 'cumulative'.
+
+    Yields:
+        dict: After the block, 'Stats' (a pstats.Stats), 'Report' (its top functions as text) and,
+            with memory, 'Peak bytes' and 'Top allocations' (the lines that allocated the most still held).
+
+    Example:
+        with mini_profile() as profile:
+            mini_load_csv_dict({"filename": "datasets/health_activity_data.csv"})
+        print(profile["Report"])
+        profile["Peak bytes"]
+        3410254
+    """
+    report = {}
+    tracing = memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif memory:
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        text = io.StringIO()
+        report["Stats"] = pstats.Stats(profiler, stream=text).sort_stats(sort)
+        report["Stats"].print_stats(top)
+        report["Report"] = text.getvalue()
+        if memory:
+            report["Peak bytes"] = tracemalloc.get_traced_memory()[1]
+            own = [tracemalloc.Filter(False, module.__file__) for module in (cProfile, pstats, tracemalloc)]
+            snapshot = tracemalloc.take_snapshot().filter_traces(own)  # Leave out the profiler's own allocations
+            report["Top allocations"] = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+            if tracing:
+                tracemalloc.stop()
+
 
 def mini_simple_len(data: list) -> int:
     """
@@ -20,6 +399,8 @@ def mini_simple_len(data: list) -> int:
         mini_simple_len([{'column1': 'value1', 'column2': 23}])
         1
     """
+    if isinstance(data, MiniTable):
+        return len(data)
     count = 0
     for i in data:
         count += 1
@@ -46,12 +427,16 @@ def mini_validate_input_dict(input_dict: dict[str, Any], columns: list[str]) ->
             raise ValueError(f"Missing required key: '{column}'")
 
 
-def mini_data_types(data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def mini_data_types(data: list[dict[str, Any]], schema: dict[str, str] = None) -> list[dict[str, Any]]:
     """
     Converts string values in a list of dictionaries to appropriate data types (int or float).
 
+    The type of each column is inferred once from the first rows (see mini_infer_schema) and
+    only the numeric columns are converted, so text columns are never touched.
+
     Args:
         data (list[dict[str, str]]): A list of dictionaries where each dictionary represents a row in the CSV file.
+        schema (dict[str, str]): Optional column types to use instead of inferring them.
 
     Returns:
         list[dict[str, str]]: A list of dictionaries with values converted to int or float where applicable.
@@ -60,503 +445,4696 @@ def mini_data_types(data: list[dict[str, Any]]) -> list[dict[str, Any]]:
         mini_data_types([{'column1': 'value1', 'column2': '23'})
         [{'column1': 'value1', 'column2': 23}]
     """
+    if not data:
+        return data
+    header = list(data[0])
+    if schema is None:
+        sample = [[record.get(column) for column in header] for record in data[:MINI_SCHEMA_SAMPLE_SIZE]]
+        schema = mini_infer_schema_rows(header, sample)
+    converters = mini_compile_schema(schema, header)
+    active = [(column, convert) for column, convert in converters.items() if convert is not None]
     for record in data:
-        for column in record:
-            try:
-                record[column] = int(record[column])  # Try converting to int first
-            except ValueError:
-                try:
-                    record[column] = float(record[column])  # If int fails, try float
-                except ValueError:
-                    pass  # If both fail, keep the original value
+        for column, convert in active:
+            if column in record:
+                record[column] = convert(record[column])
     return data
 
 
-def mini_load_csv_dict(input_dict: dict[str, str]) -> list[dict[str, str]]:
+def mini_convert_value(value: Any) -> Any:
     """
-    Loads a CSV file into a list of dictionaries.
+    Converts a single string value to an int or float where possible.
+
+    Args:
+        value (Any): The value to convert.
+
+    Returns:
+        Any: The value as an int, a float, or unchanged if it is not numeric.
+
+    Example:
+        mini_convert_value('23')
+        23
+    """
+    try:
+        return int(value)  # Try converting to int first
+    except (TypeError, ValueError):
+        try:
+            return float(value)  # If int fails, try float
+        except (TypeError, ValueError):
+            return value  # If both fail, keep the original value
+
+
+MINI_SCHEMA_SAMPLE_SIZE = 1000
+MINI_CHUNK_SIZE = 65536
+MINI_SCHEMA_TYPES = ("int", "float", "bool", "str", "mixed", "missing")
+
+
+def mini_cell_type(value: Any) -> str:
+    """
+    Works out which schema type a single cell belongs to.
+
+    Args:
+        value (Any): A raw CSV cell, or an already converted value.
+
+    Returns:
+        str: One of 'int', 'float', 'bool' ("Yes"/"No"), 'str' or 'missing' (empty).
+
+    Example:
+        mini_cell_type('6.1')
+        'float'
+    """
+    if value is None or value == "":
+        return "missing"
+    if not isinstance(value, str):
+        return "int" if isinstance(value, int) else "float" if isinstance(value, float) else "str"
+    try:
+        int(value)
+        return "int"
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return "float"
+    except ValueError:
+        pass
+    return "bool" if value.lower() in ("yes", "no") else "str"
+
+
+def mini_infer_schema_rows(header: list[str], rows: list[list[Any]]) -> dict[str, str]:
+    """
+    Settles one type per column from a sample of rows.
+
+    A column is 'int' if every present cell is an int, 'float' if every present cell is a number,
+    'bool' if every present cell is "Yes" or "No", 'mixed' if the sample has numbers and text,
+    'missing' if the sample has no values and 'str' otherwise.
+
+    Args:
+        header (list[str]): The column names.
+        rows (list[list[Any]]): The sample rows, with cells in header order.
+
+    Returns:
+        dict[str, str]: The type of each column.
+
+    Example:
+        mini_infer_schema_rows(['Age', 'Smoker'], [['56', 'No'], ['69', 'Yes']])
+        {'Age': 'int', 'Smoker': 'bool'}
+    """
+    schema = {}
+    for position, column in enumerate(header):
+        types = {mini_cell_type(row[position]) for row in rows if position < len(row)}
+        types.discard("missing")
+        if not types:
+            schema[column] = "missing"
+        elif types == {"int"}:
+            schema[column] = "int"
+        elif types <= {"int", "float"}:
+            schema[column] = "float"
+        elif types == {"bool"}:
+            schema[column] = "bool"
+        elif types & {"int", "float"}:
+            schema[column] = "mixed"
+        else:
+            schema[column] = "str"
+    return schema
+
+
+@mini_instrumented
+def mini_infer_schema(input_dict: dict[str, Any]) -> dict[str, str]:
+    """
+    Infers the column types of a CSV file from its first rows.
 
     Args:
         input_dict (dict): A dictionary containing the filename under the key 'filename'.
+            Optionally 'sample_size', the number of rows to look at (default 1000).
 
     Returns:
-        list: A list of dictionaries where each dictionary represents a row in the CSV file.
+        dict[str, str]: The type of each column, see mini_infer_schema_rows.
 
     Raises:
         ValueError: If 'filename' is not provided in the input dictionary.
 
     Example:
-        mini_load_csv_dict({"filename": "myproject/mydata.csv"})
+        mini_infer_schema({"filename": "datasets/health_activity_data.csv"})
+        {'ID': 'int', 'Age': 'int', 'Gender': 'str', ..., 'Smoker': 'bool', ...}
     """
-    filename = input_dict.get("filename")
-    if not filename:
-        raise ValueError("Filename is required in the input dictionary.")
-    with open(filename, mode="r", newline="", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        data = [row for row in reader]
-        data = mini_data_types(data)  # Convert data types
-    return data
+    mini_validate_input_dict(input_dict, ["filename"])
+    sample_size = input_dict.get("sample_size", MINI_SCHEMA_SAMPLE_SIZE)
+    with open(input_dict["filename"], mode="r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        return mini_infer_schema_rows(header, list(islice(filter(None, reader), sample_size)))
 
 
-def mini_load_csv_yield(filename: str) -> Generator[dict[str, str], None, None]:
+def mini_save_schema(schema: dict[str, str], filename: str) -> None:
     """
-    Loads a CSV file and yields each row as a dictionary.
+    Saves a schema as JSON so later loads of the same file can skip inference.
 
-    Args:
-        filename (str): The path to the CSV file to be read.
+    Example:
+        mini_save_schema(mini_infer_schema({"filename": "datasets/sleep.csv"}), "datasets/sleep.schema.json")
+    """
+    with open(filename, mode="w", encoding="utf-8") as file:
+        json.dump(schema, file, indent=2)
 
-    Yields:
-        dict: Each row of the CSV file as a dictionary.
-            Example: [{'column1': 'value1', 'column2': 'value2'}, ...]
+
+def mini_load_schema(filename: str) -> dict[str, str]:
+    """
+    Loads a schema saved by mini_save_schema.
 
     Raises:
-        FileNotFoundError: If file is not found.
+        ValueError: If the file contains an unknown column type.
 
     Example:
-        mini_load_csv_yield({"filename": "myproject/mydata.csv"})
+        mini_load_schema("datasets/sleep.schema.json")
+        {'Person ID': 'int', 'Gender': 'str', ...}
     """
+    with open(filename, mode="r", encoding="utf-8") as file:
+        schema = json.load(file)
+    for column, kind in schema.items():
+        if kind not in MINI_SCHEMA_TYPES:
+            raise ValueError(f"Unknown type '{kind}' for column '{column}'.")
+    return schema
+
+
+def mini_to_int(value: Any) -> Any:
+    """Converter for 'int' columns; cells that are not ints fall back to mini_convert_value."""
     try:
-        with open(filename, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                data = mini_data_types([row])[0]
-                yield data
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        return
+        return int(value)
+    except (TypeError, ValueError):
+        return mini_convert_value(value)
 
 
-def mini_len(input_dict: dict[str, str]) -> dict[str, Any]:
+def mini_to_float(value: Any) -> Any:
+    """Converter for 'float' columns; whole numbers written without a point stay ints like mini_data_types."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return mini_convert_value(value)
+    if type(value) is str and number.is_integer() and "." not in value and "e" not in value and "E" not in value:
+        return int(value)
+    return number
+
+
+MINI_SCHEMA_CONVERTERS = {"int": mini_to_int, "float": mini_to_float, "mixed": mini_convert_value, "missing": mini_convert_value}
+
+
+def mini_compile_schema(schema: dict[str, str], header: list[str]) -> dict[str, Callable | None]:
     """
-    Takes a dictionary with 'Data' and 'Column' keys and returns a dictionary with information about the number of records in a specified column.
+    Turns a schema into one converter per column.
+
+    'bool' and 'str' columns keep their text, so their converter is None and the loaders skip
+    those columns entirely. "Yes"/"No" values stay as text so that existing comparisons such as
+    {"Smoker": "Yes"} keep matching. A 'mixed' column has numbers next to text such as "N/A", and a
+    'missing' column had no values in the sample but may have some later in the file, so each cell
+    of either goes through mini_convert_value.
 
     Args:
-        input_dict (dict): The input dictionary. Must contain 'Data' and 'Column' keys.
+        schema (dict[str, str]): The type of each column.
+        header (list[str]): The columns of the file being loaded.
 
     Returns:
-        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'NumRecords', and 'NumMissing'.
+        dict[str, Callable | None]: The converter of each column in header order.
 
     Raises:
-        ValueError: If 'Data' or 'Column' is not provided in the input dictionary.
-
-    Example:
-        mini_len({"Data": sleep_data, "Column": "sleep"})
-        {'Exists': True, 'Column': 'BMI Category', 'NumRecords': 374, 'NumMissing': 0}
+        ValueError: If the schema does not cover every column in the header.
     """
-    mini_validate_input_dict(input_dict, ["Data", "Column"])
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
+    missing = [column for column in header if column not in schema]
+    if missing:
+        raise ValueError(f"Schema is missing columns: {missing}")
+    return {column: MINI_SCHEMA_CONVERTERS.get(schema[column]) for column in header}
 
-    columns = data[0].keys()
-    if column in columns:
-        records = mini_simple_len(data)
-        missing = 0
-        for row in data:
-            if row[column] in [None, "", "None"]:
-                missing += 1
-        return {
-            "Exists": True,
-            "Column": column,
-            "NumRecords": records,
-            "NumMissing": missing,
-        }
-    else:
-        return {"Exists": False}
 
+def mini_resolve_schema(schema: dict[str, str] | str | None, header: list[str], sample: list[list[str]]) -> dict[str, str]:
+    """Returns the schema given as a dict or JSON path, or infers one from the sample rows."""
+    if schema is None:
+        return mini_infer_schema_rows(header, sample)
+    if isinstance(schema, str):
+        return mini_load_schema(schema)
+    return schema
 
-def mini_search(input_dict: dict[str, Any]) -> dict[str, Any]:
+
+def mini_convert_rows(
+    header: list[str], converters: dict[str, Callable | None], rows: list[list[str]], record_type: type = None
+) -> list[dict[str, Any]]:
     """
-    Searches for a specific value in a a specific column and returns a dictionary with information about the search result.
+    Converts a batch of raw CSV rows into typed dictionaries, one column at a time.
 
-    Arg:
-        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
-            Example: {"Data": sleep_data, "Column": "sleep", "Value": "insomnia"}
+    Rows that are shorter or longer than the header are handled like csv.DictReader does:
+    missing cells are None and extra cells are listed under the key None. Compact records also
+    intern their text cells, so a value such as "Female" is stored once rather than once per row.
+
+    Args:
+        header (list[str]): The column names.
+        converters (dict[str, Callable | None]): From mini_compile_schema.
+        rows (list[list[str]]): The raw rows.
+        record_type (type, optional): A class from mini_record_type(header) to build compact records
+            instead of dictionaries. Defaults to None.
 
     Returns:
-        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'NumRecords', and 'NumMissing'.
+        list[dict[str, Any]]: One typed dictionary (or MiniRecord) per row.
+    """
+    width = len(header)
+    if any(len(row) != width for row in rows):
+        return [mini_convert_row(header, converters, row, record_type) for row in rows]
+    if record_type is not None:
+        columns = [
+            list(map(sys.intern, cells)) if convert is None else list(map(convert, cells))
+            for convert, cells in zip(converters.values(), zip(*rows))
+        ]
+        return list(map(record_type, zip(*columns)))
+    columns = [
+        cells if convert is None else list(map(convert, cells))
+        for convert, cells in zip(converters.values(), zip(*rows))
+    ]
+    return [dict(zip(header, values)) for values in zip(*columns)]
+
+
+def mini_convert_row(
+    header: list[str], converters: dict[str, Callable | None], row: list[str], record_type: type = None
+) -> dict[str, Any]:
+    """Converts one raw CSV row into a typed dictionary (or MiniRecord), see mini_convert_rows."""
+    record = {}
+    for column, value in zip_longest(header, row[: len(header)]):
+        convert = converters[column]
+        record[column] = value if convert is None else convert(value)
+    if len(row) > len(header):
+        record[None] = row[len(header) :]
+        if record_type is not None:
+            return mini_record_type(list(record))(record.values())  # The extra cells need their own header
+    return record if record_type is None else record_type(record.values())
 
-    Raises:
-        ValueError: If 'Data', 'Column' or 'Value' is not provided in the input dictionary.
+
+def mini_typecode(buffer: array | memoryview) -> str:
+    """Returns the item type code of an array or of a memoryview mapped from a cache."""
+    return getattr(buffer, "typecode", None) or buffer.format
+
+
+class MiniColumn:
+    """
+    A single typed column of a MiniTable.
+
+    Numbers are stored in an `array` buffer ('q' for ints, 'd' for floats) and strings are
+    dictionary encoded: each cell holds a code into a shared pool of distinct strings.
+    Missing numeric cells ("") are tracked in a validity mask and float columns that also
+    contain whole numbers remember which cells were ints so the row view gives back the
+    same values as mini_data_types. Anything else is kept in a plain list ('object').
+
+    Attributes:
+        kind (str): One of 'int', 'float', 'str' or 'object'.
+        values (array | memoryview | list): The cell buffer (codes for 'str' columns). A memoryview
+            when the table was mapped from a cache file by mini_read_cache.
+        pool (list[str]): The distinct strings of a 'str' column, in first seen order.
+        valid (bytearray | None): 1 where a numeric cell is present, None if nothing is missing.
+        ints (bytearray | None): 1 where a 'float' cell was an int, None if there are none.
     """
-    mini_validate_input_dict(input_dict, ["Data", "Column", "Value"])
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
-    search_value = input_dict.get("Value")
 
-    output_dict = {}
-    output_dict["Exists"] = False
-    for record in data:
-        if isinstance(record[column], str):
-            if record[column].lower() == search_value.lower():
-                output_dict["Exists"] = True
-                break
-        elif record[column] == search_value:
-            output_dict["Exists"] = True
-            break
+    __slots__ = ("kind", "values", "pool", "valid", "ints")
+
+    def __init__(self, kind: str, values: Any, pool: list[str] = None, valid: bytearray = None, ints: bytearray = None):
+        self.kind = kind
+        self.values = values
+        self.pool = pool
+        self.valid = valid
+        self.ints = ints
+
+    @classmethod
+    def from_values(cls, values: list[Any]) -> "MiniColumn":
+        """
+        Builds a column from a list of already typed values.
+
+        Args:
+            values (list[Any]): The typed cell values, for example from mini_convert_value.
+
+        Returns:
+            MiniColumn: The most compact column that gives back the same values.
+
+        Example:
+            MiniColumn.from_values([6.1, 7, ""]).kind
+            'float'
+        """
+        kinds = set(map(type, values))
+        if kinds == {str}:
+            lookup = {}
+            codes = array("l", [lookup.setdefault(value, len(lookup)) for value in values])
+            return cls("str", codes, list(lookup))
+
+        numeric = kinds - {str}
+        if numeric and numeric <= {int, float} and {v for v in values if type(v) is str} <= {""}:
+            valid = None
+            if str in kinds:
+                valid = bytearray(value != "" for value in values)
+                values = [0 if value == "" else value for value in values]
+            try:
+                if numeric == {int}:
+                    return cls("int", array("q", values), valid=valid)
+                ints = bytearray(type(value) is int for value in values) if int in numeric else None
+                buffer = array("d", values)
+                if ints is None or all(buffer[i] == values[i] for i in range(len(values)) if ints[i]):
+                    return cls("float", buffer, valid=valid, ints=ints)
+            except OverflowError:
+                pass  # Too big for a typed buffer, keep the values as they are
+            values = [value if present else "" for value, present in zip(values, valid)] if valid else values
+
+        return cls("object", list(values))
+
+    @classmethod
+    def from_strings(cls, cells: list[str], kind: str) -> "MiniColumn":
+        """
+        Builds a column from raw CSV cells using the column type from a schema.
+
+        Args:
+            cells (list[str]): The raw cell text.
+            kind (str): The schema type of the column.
+
+        Returns:
+            MiniColumn: The typed column.
+        """
+        if kind == "int":
+            try:
+                return cls("int", array("q", map(int, cells)))
+            except (TypeError, ValueError, OverflowError):
+                pass  # Some cells are not ints, convert them one by one below
+        elif kind in ("str", "bool") and None not in cells:
+            lookup = {}
+            codes = array("l", [lookup.setdefault(value, len(lookup)) for value in cells])
+            return cls("str", codes, list(lookup))
+        convert = MINI_SCHEMA_CONVERTERS.get(kind)
+        return cls.from_values(list(cells) if convert is None else list(map(convert, cells)))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, index: int) -> Any:
+        """Returns the value of one cell as it would appear in a row dictionary."""
+        if self.kind == "str":
+            return self.pool[self.values[index]]
+        if self.valid is not None and not self.valid[index]:
+            return ""
+        value = self.values[index]
+        if self.ints is not None and self.ints[index]:
+            return int(value)
+        return value
+
+    def present(self) -> Iterable[int | float]:
+        """Returns an iterator over the present values of a numeric column."""
+        if self.valid is None:
+            return iter(self.values)
+        return compress(self.values, self.valid)
+
+    def to_numpy(self) -> Any:
+        """Returns a numeric column as a NumPy masked array over the same buffer, with missing cells masked."""
+        data = np.frombuffer(self.values, dtype=np.int64 if self.kind == "int" else np.float64)
+        mask = np.ma.nomask if self.valid is None else np.frombuffer(self.valid, dtype=np.uint8) == 0
+        return np.ma.MaskedArray(data, mask=mask)
+
+    def num_missing(self) -> int:
+        """Counts the cells that are None, "" or "None"."""
+        if self.kind == "str":
+            return sum(countOf(self.values, code) for code, text in enumerate(self.pool) if text in ("", "None"))
+        if self.kind == "object":
+            return sum(1 for value in self.values if value in MINI_MISSING)
+        return 0 if self.valid is None else countOf(self.valid, 0)
+
+    def count_value(self, value: Any) -> int:
+        """Counts the cells equal to value, ignoring case for strings like mini_count does."""
+        if self.kind == "str":
+            if not isinstance(value, str):
+                return 0
+            target = value.lower()
+            return sum(countOf(self.values, code) for code, text in enumerate(self.pool) if text.lower() == target)
+        if self.kind == "object":
+            count = 0
+            for cell in self.values:
+                if isinstance(cell, str):
+                    if isinstance(value, str) and cell.lower() == value.lower():
+                        count += 1
+                elif cell == value:
+                    count += 1
+            return count
+        if isinstance(value, str):
+            return self.num_missing() if value == "" else 0
+        count = countOf(self.values, value)
+        if self.valid is not None and value == 0:
+            count -= countOf(self.valid, 0)  # Missing cells hold a 0 placeholder
+        return count
+
+    def extreme(self, func: Callable) -> int | float | None:
+        """Returns max or min (passed as func) of the present numeric values, keeping int cells as ints."""
+        present = self.to_numpy().compressed() if MINI_BACKEND == "numpy" else None
+        if present is not None and not (self.kind == "float" and np.isnan(present).any()):
+            best = (present.max() if func is max else present.min()).item() if present.size else None
+        else:
+            best = func(self.present(), default=None)
+        if best is not None and self.ints is not None and self.ints[self.first_index(best)]:
+            return int(best)
+        return best
+
+    def frequencies(self) -> dict[Any, int]:
+        """Counts each distinct value in first seen order, lower casing strings like mini_frequency_table."""
+        counts = Counter(self.values)
+        results = {}
+        if self.kind == "str":
+            for code, text in enumerate(self.pool):
+                key = text.lower()
+                results[key] = results.get(key, 0) + counts[code]
+            return results
+        for value, count in counts.items():
+            if self.ints is not None and value.is_integer() and self.ints[indexOf(self.values, value)]:
+                value = int(value)
+            results[value] = count
+        return results
+
+    @classmethod
+    def concat(cls, columns: list["MiniColumn"]) -> "MiniColumn":
+        """
+        Joins columns end to end, for example the chunks of a file loaded in parallel.
+
+        Args:
+            columns (list[MiniColumn]): The columns to join, in order.
+
+        Returns:
+            MiniColumn: One column holding every cell, typed as if it had been built in one go.
+        """
+        columns = [column for column in columns if len(column)] or columns[:1]
+        if not columns:
+            return cls.from_values([])
+        kinds = {column.kind for column in columns}
+        if kinds == {"str"}:
+            lookup = {}
+            codes = array("l")
+            for column in columns:
+                remap = [lookup.setdefault(text, len(lookup)) for text in column.pool]
+                codes.extend(map(remap.__getitem__, column.values))
+            return cls("str", codes, list(lookup))
+        if kinds in ({"int"}, {"float"}):
+            values = array(mini_typecode(columns[0].values))
+            for column in columns:
+                values.frombytes(memoryview(column.values).cast("B"))
+            masks = {}
+            for name in ("valid", "ints"):
+                if any(getattr(column, name) is not None for column in columns):
+                    masks[name] = bytearray()
+                    for column in columns:
+                        mask = getattr(column, name)
+                        masks[name] += mask if mask is not None else bytes([name == "valid"]) * len(column)
+            return cls(columns[0].kind, values, **masks)
+        return cls.from_values([column.get(i) for column in columns for i in range(len(column))])
+
+    def take(self, rows: Iterable[int]) -> "MiniColumn":
+        """Returns a new column holding the cells at the given row positions, in that order."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if self.kind == "object":
+            return MiniColumn("object", list(map(self.values.__getitem__, rows)))
+        values = array(mini_typecode(self.values), map(self.values.__getitem__, rows))
+        masks = {
+            name: bytearray(map(getattr(self, name).__getitem__, rows))
+            for name in ("valid", "ints")
+            if getattr(self, name) is not None
+        }
+        return MiniColumn(self.kind, values, self.pool, **masks)
 
-    output_dict["Column"] = column
-    output_dict["Value"] = search_value
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MiniColumn):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
 
-    return output_dict
+    def first_index(self, value: int | float) -> int:
+        """Returns the position of the first present cell equal to value."""
+        index = indexOf(self.values, value)
+        if self.valid is not None and not self.valid[index]:
+            index = next(i for i in range(index, len(self.values)) if self.valid[i] and self.values[i] == value)
+        return index
 
 
-def mini_count(input_dict: dict[str, Any]) -> dict[str, Any]:
+class MiniRow(Mapping):
     """
-    Searches for a specific value in a a specific column and returns a dictionary which contains the proportion of records that match the search value.
+    A read only dictionary view of one row of a MiniTable.
 
-    Arg:
-        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
+    It supports `row[column]`, `row.get(column)`, `row.keys()`, `column in row` and iteration,
+    so functions written for a list of dictionaries work on a MiniTable unchanged.
+    """
 
-    Returns:
-        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'Value' and 'Proportion'.
+    __slots__ = ("table", "index")
 
-    Raises:
-        ValueError: If 'Data', 'Column' or 'Value' is not provided in the input dictionary.
+    def __init__(self, table: "MiniTable", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, column: str) -> Any:
+        return self.table.columns[column].get(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.columns)
+
+    def __len__(self) -> int:
+        return len(self.table.columns)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class MiniRecord(Mapping):
+    """
+    A compact read only row: its values in one tuple, its column names shared by every row of the file.
+
+    A dictionary per row repeats every column name and keeps a hash table of its own, which costs
+    more than the values themselves. A MiniRecord stores only the tuple of values; the names and
+    their positions live on a class made once per header by mini_record_type. It supports
+    `record[column]`, `record.get(column)`, `column in record`, `keys()`, `items()` and iteration,
+    compares equal to the dictionary with the same items and pickles, so the mini_* functions work
+    on it unchanged. Load records like this with the 'compact' storage of mini_load_csv_dict.
+
+    Attributes:
+        cells (tuple): The values in header order.
+        columns (tuple[str, ...]): The column names, shared by the class.
+        positions (dict[str, int]): The position of each column in cells, shared by the class.
 
     Example:
-        mini_count({"Data": sleep_data, "Column": "sleep", "Value": "insomnia"})
-        {'Exists': True, 'Column': 'BMI Category', 'Value': 'Obese', 'Proportion': 0.03}
+        sleep_data = mini_load_csv_dict({"filename": "datasets/sleep_health_and_lifestyle_data.csv", "storage": "compact"})
+        sleep_data[0]["Occupation"]
+        'Software Engineer'
     """
-    mini_validate_input_dict(input_dict, ["Data", "Column", "Value"])
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
-    search_value = input_dict.get("Value")
-    output_dict = mini_search(input_dict)
-    total = mini_simple_len(data)
-    if output_dict["Exists"]:
-        count = 0
-        for row in data:
-            if isinstance(row[column], str):
-                if row[column].lower() == search_value.lower():
-                    count += 1
-            elif row[column] == search_value:
-                count += 1
-        output_dict["Proportion"] = round(count / total, 2)
-    return output_dict
 
+    __slots__ = ("cells",)
+    columns = ()
+    positions = {}
 
-def mini_count_match(input_dict: dict[str, str]) -> dict[str, Any]:
+    def __init__(self, cells: Iterable[Any]):
+        self.cells = tuple(cells)
+
+    def __getitem__(self, column: str) -> Any:
+        return self.cells[self.positions[column]]
+
+    def get(self, column: str, default: Any = None) -> Any:
+        position = self.positions.get(column)
+        return default if position is None else self.cells[position]
+
+    def __contains__(self, column: object) -> bool:
+        return column in self.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self.columns, self.cells)))
+
+    def __reduce__(self) -> tuple:
+        return mini_make_record, (self.columns, self.cells)
+
+
+MINI_RECORD_TYPES = {}  # Header tuple -> MiniRecord subclass, so loads of the same file share one class
+
+
+def mini_record_type(header: Iterable[str]) -> type:
     """
-    Counts the number of records that match a specific value in a specific column.
+    Returns the MiniRecord class for a header, making it the first time the header is seen.
 
     Args:
-        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
+        header (Iterable[str]): The column names in file order.
 
     Returns:
-        dict[str, int]: A dictionary with keys 'Exists', 'Column', 'Value', and 'Count'.
-
-    Raises:
-        ValueError: If 'Data', 'Column' or 'Value' is not provided in the input dictionary.
+        type: A MiniRecord subclass whose instances take one value per column.
 
     Example:
-        mini_count_match({"Data": sleep_data, "Occupation": "Doctor", "BMI Category": "Normal"})
-        {'Exists': True, 'Column': 'BMI Category', 'Value': 'Obese', 'Count': 30}
+        Point = mini_record_type(["x", "y"])
+        Point((1, 2))["y"]
+        2
     """
-    data = input_dict.get("Data")
-    conditions = input_dict.copy()
+    columns = tuple(header)
+    record_type = MINI_RECORD_TYPES.get(columns)
+    if record_type is None:
+        positions = {column: position for position, column in enumerate(columns)}
+        record_type = type("MiniRecord", (MiniRecord,), {"__slots__": (), "columns": columns, "positions": positions})
+        MINI_RECORD_TYPES[columns] = record_type
+    return record_type
+
+
+def mini_make_record(header: Iterable[str], cells: Iterable[Any]) -> MiniRecord:
+    """Builds one MiniRecord from a header and its values; used to unpickle records in another process."""
+    return mini_record_type(header)(cells)
+
+
+class MiniTable:
+    """
+    Columnar in-memory storage for a loaded CSV file.
+
+    Each column is a MiniColumn, so a table keeps one typed buffer per column instead of one
+    dictionary per row. Indexing and iterating a table gives MiniRow views, which lets the
+    existing mini_* functions accept a MiniTable wherever they accept a list of dictionaries.
+
+    Attributes:
+        columns (dict[str, MiniColumn]): The columns in file order.
+        schema (dict[str, str] | None): The schema the table was loaded with, if it came from a CSV file.
+        indexes (dict[str, MiniColumnIndex]): Indexes added by mini_build_index.
+
+    Example:
+        sleep_table = mini_load_csv_dict({"filename": "datasets/sleep.csv", "storage": "columnar"})
+        sleep_table[0]["Occupation"]
+        'Software Engineer'
+    """
+
+    def __init__(self, columns: dict[str, MiniColumn], schema: dict[str, str] = None):
+        self.columns = columns
+        self.schema = schema
+        self.indexes = {}
+        self.length = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> "MiniTable":
+        """
+        Builds a table from a list of dictionaries that all share the keys of the first row.
+
+        Example:
+            MiniTable.from_rows([{'person': 'Alice', 'DailySteps': 200}])
+        """
+        if not rows:
+            return cls({})
+        return cls({column: MiniColumn.from_values([row[column] for row in rows]) for column in rows[0]})
+
+    @classmethod
+    def from_csv(
+        cls,
+        filename: str,
+        schema: dict[str, str] | str = None,
+        save_schema: str = None,
+        columns: list[str] = None,
+        where: Any = None,
+    ) -> "MiniTable":
+        """
+        Reads a CSV file straight into columns without building a dictionary per row.
+
+        Args:
+            filename (str): The path to the CSV file.
+            schema (dict | str): Optional column types, or the path of a saved schema, to skip inference.
+            save_schema (str): Optional path to save the schema that was used.
+            columns (list[str]): Optional columns to keep; the others are never converted.
+            where: Optional predicate (see mini_compile_predicate); rows that fail it are dropped as text.
+
+        Returns:
+            MiniTable: The typed table.
+        """
+        with open(filename, mode="r", newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            rows = filter(None, reader)  # Skip blank lines like csv.DictReader
+            sample = list(islice(rows, MINI_SCHEMA_SAMPLE_SIZE))
+            schema = mini_resolve_schema(schema, header, sample)
+            if save_schema:
+                mini_save_schema(schema, save_schema)
+            header, rows = mini_select_raw_rows(header, schema, chain(sample, rows), columns, where)
+            return cls.from_csv_rows(header, rows, {column: schema[column] for column in header})
+
+    @classmethod
+    def from_csv_rows(cls, header: list[str], rows: Iterable[list[str]], schema: dict[str, str]) -> "MiniTable":
+        """
+        Builds a table from raw CSV rows, transposing them into columns a chunk at a time.
+
+        Args:
+            header (list[str]): The column names.
+            rows (Iterable[list[str]]): The raw rows, without blank lines.
+            schema (dict[str, str]): The type of each column.
+
+        Returns:
+            MiniTable: The typed table.
+        """
+        rows = iter(rows)
+        cells = [[] for _ in header]
+        total = 0
+        while chunk := list(islice(rows, MINI_CHUNK_SIZE)):
+            total += len(chunk)
+            for column, values in zip(cells, zip_longest(*chunk)):
+                column.extend(values)
+            for column in cells:
+                column.extend([None] * (total - len(column)))  # Short rows read as None
+        return cls({name: MiniColumn.from_strings(values, schema[name]) for name, values in zip(header, cells)}, schema)
+
+    @classmethod
+    def concat(cls, tables: list["MiniTable"]) -> "MiniTable":
+        """Joins tables with the same columns end to end, see MiniColumn.concat."""
+        if not tables:
+            return cls({})
+        columns = {name: MiniColumn.concat([table.columns[name] for table in tables]) for name in tables[0].columns}
+        return cls(columns, tables[0].schema)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MiniTable):
+            return NotImplemented
+        return self.columns == other.columns
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> MiniRow:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("MiniTable index out of range")
+        return MiniRow(self, index)
+
+    def __iter__(self) -> Iterator[MiniRow]:
+        for index in range(self.length):
+            yield MiniRow(self, index)
+
+    def column(self, name: str) -> MiniColumn:
+        """Returns the MiniColumn for a column name."""
+        return self.columns[name]
+
+    def take(self, rows: Iterable[int]) -> "MiniTable":
+        """Returns a new table holding the rows at the given positions, in that order."""
+        rows = list(rows)
+        return MiniTable({name: column.take(rows) for name, column in self.columns.items()}, self.schema)
+
+    def select(self, columns: list[str]) -> "MiniTable":
+        """Returns a table with only the given columns, sharing their buffers."""
+        mini_header_positions(list(self.columns), columns)
+        schema = {column: self.schema[column] for column in columns} if self.schema else self.schema
+        return MiniTable({column: self.columns[column] for column in columns}, schema)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Returns the table as a list of dictionaries, the same shape as mini_load_csv_dict."""
+        names = list(self.columns)
+        getters = [self.columns[name].get for name in names]
+        return [dict(zip(names, [get(i) for get in getters])) for i in range(self.length)]
+
+    def to_records(self) -> list[MiniRecord]:
+        """Returns the table as a list of MiniRecords, the same shape as the 'compact' storage of mini_load_csv_dict."""
+        record_type = mini_record_type(self.columns)
+        getters = [column.get for column in self.columns.values()]
+        return [record_type([get(i) for get in getters]) for i in range(self.length)]
+
+
+def mini_merge_sorted(ordered: list[Any], rows: list[int], new: list[tuple[Any, int]]) -> None:
+    """
+    Merges sorted (value, row) pairs into a sorted list of values and its row ids, in place.
+
+    Each new value goes after any equal values, so ties stay in row order when the new rows come
+    last. The insertion points are found by binary search and the runs between them are copied
+    as slices, so Python does O(k log n) work for k new values and the rest is one list copy.
+    """
+    if not ordered or new[0][0] >= ordered[-1]:  # Appending in order, the usual case for a growing file
+        ordered.extend(value for value, _ in new)
+        rows.extend(row for _, row in new)
+        return
+    merged_values, merged_rows = [], []
+    start = 0
+    for value, row in new:
+        position = bisect_right(ordered, value, start)
+        merged_values += ordered[start:position]
+        merged_rows += rows[start:position]
+        merged_values.append(value)
+        merged_rows.append(row)
+        start = position
+    ordered[:] = merged_values + ordered[start:]
+    rows[:] = merged_rows + rows[start:]
+
+
+def mini_fold_key(value: Any) -> Any:
+    """Returns the key a value is indexed under: strings are lower cased like mini_search compares them."""
+    return value.lower() if isinstance(value, str) else value
+
+
+class MiniColumnIndex:
+    """
+    A secondary index on one column, built by mini_build_index.
+
+    The hash index maps each value (strings lower cased) to the ascending row ids holding it,
+    so equality lookups do not scan the data. Numeric columns also get a sorted index: the
+    present values in ascending order with their row ids, ties kept in row order. Rows added to
+    the end of the data later are merged in with extend instead of rebuilding the index.
+
+    Attributes:
+        column (str): The indexed column.
+        buckets (dict[Any, list[int]]): Folded value -> row ids.
+        sorted_values (list[int | float] | None): The sorted values of a numeric column.
+        sorted_rows (list[int] | None): The row id of each entry in sorted_values.
+        rows (int): The number of rows indexed.
+    """
+
+    __slots__ = ("column", "buckets", "sorted_values", "sorted_rows", "rows", "numeric")
+
+    def __init__(self, column: str, values: Iterable[Any]):
+        self.column = column
+        self.buckets = {}
+        self.sorted_values = self.sorted_rows = None
+        self.rows = 0
+        self.numeric = True
+        self.extend(values)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        """
+        Indexes the values of rows added after the ones already indexed, in O(k log n) comparisons
+        for k new rows.
+
+        New values are sorted and merged into the sorted index in place, so a list taken from
+        sorted_values (for mini_value_exists) stays sorted and up to date. A value that is not a
+        number drops the sorted index for good, as it would have when the index was built.
+        """
+        numeric = []
+        row = self.rows - 1
+        for row, value in enumerate(values, self.rows):
+            self.buckets.setdefault(mini_fold_key(value), []).append(row)
+            if value in MINI_MISSING:
+                continue
+            if self.numeric and isinstance(value, (int, float)) and not isinstance(value, bool):
+                numeric.append((value, row))
+            else:
+                self.numeric = False
+        self.rows = row + 1
+        if not self.numeric:
+            self.sorted_values = self.sorted_rows = None
+        elif numeric:
+            numeric.sort()
+            if self.sorted_values is None:
+                self.sorted_values, self.sorted_rows = [], []
+            mini_merge_sorted(self.sorted_values, self.sorted_rows, numeric)
+
+    def rows_for(self, value: Any) -> list[int]:
+        """Returns the row ids whose value matches, ignoring case for strings."""
+        return self.buckets.get(mini_fold_key(value), [])
+
+    def count(self, value: Any) -> int:
+        """Counts the rows whose value matches, ignoring case for strings."""
+        return len(self.rows_for(value))
+
+    def extreme(self, function: str) -> int | float | None:
+        """Returns the 'max' or 'min' of a numeric column from the sorted index, first row wins ties."""
+        if not self.sorted_values:
+            return None
+        if function == "min":
+            return self.sorted_values[0]
+        return self.sorted_values[bisect_left(self.sorted_values, self.sorted_values[-1])]
+
+
+class MiniIndexedList(list):
+    """
+    A list of records that carries the indexes built by mini_build_index.
+
+    Adding records to the end (append, extend or +=) adds them to the indexes as well. Any other
+    change to the list itself (assigning, inserting, removing or sorting rows) drops the indexes,
+    because their row ids would no longer be right. Changing a value inside a record cannot be
+    detected, so rebuild the index after editing records in place.
+    """
+
+    def __init__(self, records: Iterable[dict[str, Any]] = ()):
+        super().__init__(records)
+        self.indexes = {}
+
+    def _drop_indexes(method: Callable) -> Callable:
+        def wrapper(self, *args, **kwargs):
+            self.indexes.clear()
+            return method(self, *args, **kwargs)
+
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _drop_indexes(list.__setitem__)
+    __delitem__ = _drop_indexes(list.__delitem__)
+    __imul__ = _drop_indexes(list.__imul__)
+    insert = _drop_indexes(list.insert)
+    pop = _drop_indexes(list.pop)
+    remove = _drop_indexes(list.remove)
+    clear = _drop_indexes(list.clear)
+    sort = _drop_indexes(list.sort)
+    reverse = _drop_indexes(list.reverse)
+    del _drop_indexes
+
+    def extend(self, records: Iterable[dict[str, Any]]) -> None:
+        start = len(self)
+        super().extend(records)
+        for column, index in self.indexes.items():
+            index.extend(record[column] for record in islice(self, start, None))
+
+    def append(self, record: dict[str, Any]) -> None:
+        self.extend([record])
+
+    def __iadd__(self, records: Iterable[dict[str, Any]]) -> "MiniIndexedList":
+        self.extend(records)
+        return self
+
+    def __reduce__(self) -> tuple:
+        return self.__class__, (list(self),), self.__dict__  # The records go in before the indexes come back
+
+
+@mini_instrumented
+def mini_build_index(data: list[dict[str, Any]] | MiniTable, columns: list[str]) -> MiniIndexedList | MiniTable:
+    """
+    Builds hash and sorted indexes on columns so mini_search, mini_count, mini_count_match and
+    mini_stats can answer from the index instead of scanning every record.
+
+    Args:
+        data (list[dict] | MiniTable): The loaded data.
+        columns (list[str]): The columns to index.
+
+    Returns:
+        MiniIndexedList | MiniTable: The same records carrying the indexes. A MiniTable (or a list
+            that is already indexed) is indexed in place and returned.
+
+    Raises:
+        KeyError: If a column is not in the data.
+
+    Example:
+        sleep_data = mini_build_index(sleep_data, ["Occupation", "Heart Rate"])
+        mini_count_match({"Data": sleep_data, "Occupation": "Doctor", "Heart Rate": 72})
+        {'Conditions': {'Occupation': 'Doctor', 'Heart Rate': 72}, 'Count': 25}
+    """
+    if not isinstance(data, (MiniTable, MiniIndexedList)):
+        data = MiniIndexedList(data)
+    for column in columns:
+        if isinstance(data, MiniTable):
+            values = data.column(column)
+            data.indexes[column] = MiniColumnIndex(column, map(values.get, range(len(data))))
+        else:
+            data.indexes[column] = MiniColumnIndex(column, (record[column] for record in data))
+    return data
+
+
+def mini_get_index(data: Any, column: str) -> MiniColumnIndex | None:
+    """Returns the index on a column if mini_build_index built one for this data, otherwise None."""
+    indexes = getattr(data, "indexes", None)
+    return indexes.get(column) if indexes else None
+
+
+MINI_STORAGES = ("dict", "columnar", "compact")
+
+
+@mini_instrumented
+def mini_load_csv_dict(input_dict: dict[str, str]) -> list[dict[str, str]]:
+    """
+    Loads a CSV file into a list of dictionaries.
+
+    Args:
+        input_dict (dict): A dictionary containing the filename under the key 'filename'.
+            Optionally 'storage' set to 'columnar' to load into a MiniTable instead, or to 'compact'
+            for a list of MiniRecords, which hold the same rows in well under half the memory.
+            Optionally 'schema', a dict of column types or the path of a saved schema, to skip inference.
+            Optionally 'save_schema', a path to save the schema that was used.
+            Optionally 'workers', the number of processes to parse with (see mini_load_csv_parallel).
+            Optionally 'cache' set to True to reuse a binary sidecar cache (see mini_load_csv_cached).
+            Optionally 'columns', the columns to keep; the others are never converted.
+            Optionally 'where', a predicate (see mini_compile_predicate); rows that fail it are dropped
+            before they are converted into records.
+
+    Returns:
+        list: A list of dictionaries where each dictionary represents a row in the CSV file.
+            MiniTable: If 'storage' is 'columnar'.
+            list[MiniRecord]: If 'storage' is 'compact'.
+
+    Raises:
+        ValueError: If 'filename' is not provided in the input dictionary.
+        ValueError: If 'storage' is not 'dict', 'columnar' or 'compact'.
+        ValueError: If the schema does not cover every column.
+        ValueError: If 'where' is not a valid predicate, or it or 'columns' name a column the file does not have.
+
+    Example:
+        mini_load_csv_dict({"filename": "myproject/mydata.csv"})
+        mini_load_csv_dict({"filename": "myproject/mydata.csv", "schema": "myproject/mydata.schema.json"})
+        mini_load_csv_dict({"filename": "myproject/mydata.csv", "storage": "columnar"})
+        mini_load_csv_dict({"filename": "myproject/mydata.csv", "storage": "compact"})
+        mini_load_csv_dict({"filename": "datasets/health_activity_data.csv", "columns": ["ID", "BMI"], "where": ("BMI", ">", 30)})
+    """
+    filename = input_dict.get("filename")
+    if not filename:
+        raise ValueError("Filename is required in the input dictionary.")
+    storage = input_dict.get("storage", "dict")
+    if storage not in MINI_STORAGES:
+        raise ValueError(f"Unknown storage '{storage}', use 'dict', 'columnar' or 'compact'.")
+    columns, where = input_dict.get("columns"), input_dict.get("where")
+    if where is not None:
+        mini_normalize_predicate(where)  # Checked before the file is read
+    if input_dict.get("cache"):
+        table = mini_load_csv_cached(input_dict)
+        rows = mini_where_rows(table, where) if where is not None else None
+        if columns is not None:
+            table = table.select(columns)
+        if rows is not None:
+            table = table.take(rows)
+        if storage == "compact":
+            return table.to_records()
+        return table if storage == "columnar" else table.to_dicts()
+    if input_dict.get("workers", 1) > 1:
+        return mini_load_csv_parallel(input_dict)
+    if storage == "columnar":
+        return MiniTable.from_csv(filename, input_dict.get("schema"), input_dict.get("save_schema"), columns, where)
+    with open(filename, mode="r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        rows = filter(None, reader)  # Skip blank lines like csv.DictReader
+        chunk = list(islice(rows, MINI_SCHEMA_SAMPLE_SIZE))
+        schema = mini_resolve_schema(input_dict.get("schema"), header, chunk)
+        if input_dict.get("save_schema"):
+            mini_save_schema(schema, input_dict["save_schema"])
+        converters = mini_compile_schema(schema, header)
+        if columns is not None or where is not None:
+            read = mini_row_reader(header, converters, columns, where, storage == "compact")
+            return list(filter(None, map(read, chain(chunk, rows))))
+        record_type = mini_record_type(header) if storage == "compact" else None
+        data = []
+        while chunk:
+            data.extend(mini_convert_rows(header, converters, chunk, record_type))  # Convert data types
+            chunk = list(islice(rows, MINI_CHUNK_SIZE))
+    return data
+
+
+MINI_PREDICATE_OPS = ("=", "!=", "<", "<=", ">", ">=", "between", "in", "ieq")
+MINI_ORDER_OPS = {"<": lt, "<=": le, ">": gt, ">=": ge}
+
+
+def mini_normalize_predicate(predicate: Any) -> tuple:
+    """
+    Checks a predicate and returns it as nested ('and', [...]), ('or', [...]), ('not', p) and
+    ('leaf', column, op, value) tuples.
+
+    A predicate is a (column, op, value) tuple, ('and', p1, p2, ...), ('or', p1, p2, ...), ('not', p),
+    or a dictionary of column -> value pairs that must all be equal, like the mini_count_match conditions.
+
+    Raises:
+        ValueError: If the predicate is not one of these forms or uses an unknown operator.
+    """
+    if isinstance(predicate, Mapping):
+        return ("and", [("leaf", column, "=", value) for column, value in predicate.items()])
+    if isinstance(predicate, (tuple, list)) and predicate:
+        head = predicate[0].lower() if isinstance(predicate[0], str) else None
+        if head in ("and", "or"):
+            return (head, [mini_normalize_predicate(part) for part in predicate[1:]])
+        if head == "not" and len(predicate) == 2:
+            return ("not", mini_normalize_predicate(predicate[1]))
+        if len(predicate) == 3 and predicate[1] in MINI_PREDICATE_OPS:
+            column, op, value = predicate
+            if op == "between" and (not isinstance(value, (tuple, list)) or len(value) != 2):
+                raise ValueError(f"'between' needs a (low, high) pair, not {value!r}.")
+            if op == "in":
+                value = tuple(value)
+            return ("leaf", column, op, value)
+    raise ValueError(f"Invalid predicate {predicate!r}, use (column, op, value) with op in {list(MINI_PREDICATE_OPS)}, "
+                     "('and', ...), ('or', ...), ('not', p) or a dictionary of equal values.")
+
+
+def mini_compile_test(op: str, target: Any) -> Callable[[Any], bool]:
+    """
+    Returns a function testing one cell value against a predicate operator and target.
+
+    Missing values (None, "" and "None") and values that cannot be compared with the target are
+    never <, <=, >, >= or between; 'ieq' ignores case like mini_search.
+    """
+    if op == "=":
+        return lambda value: value == target
+    if op == "!=":
+        return lambda value: value != target
+    if op == "ieq":
+        folded = mini_fold_key(target)
+        return lambda value: mini_fold_key(value) == folded
+    if op == "in":
+        try:
+            targets = frozenset(target)
+        except TypeError:  # Unhashable targets, compare one by one
+            targets = target
+        return lambda value: value in targets
+    if op == "between":
+        low, high = target
+
+        def test(value: Any) -> bool:
+            if value in MINI_MISSING:
+                return False
+            try:
+                return low <= value <= high
+            except TypeError:
+                return False
+
+        return test
+    compare = MINI_ORDER_OPS[op]
+
+    def test(value: Any) -> bool:
+        if value in MINI_MISSING:
+            return False
+        try:
+            return compare(value, target)
+        except TypeError:
+            return False
+
+    return test
+
+
+def mini_compile_predicate(predicate: Any) -> Callable[[Mapping[str, Any]], bool]:
+    """
+    Compiles a predicate once into a function that tests a record.
+
+    Args:
+        predicate: A (column, op, value) tuple with op one of '=', '!=', '<', '<=', '>', '>=',
+            'between' (inclusive (low, high)), 'in' or 'ieq' (equal ignoring case); ('and', p1, ...),
+            ('or', p1, ...), ('not', p); or a dictionary of column -> value that must all be equal.
+
+    Returns:
+        Callable[[Mapping], bool]: True for the records that match.
+
+    Raises:
+        ValueError: If the predicate is not valid.
+
+    Example:
+        is_tired_nurse = mini_compile_predicate(("and", ("Occupation", "ieq", "nurse"), ("Sleep Duration", "<", 6.5)))
+        sum(map(is_tired_nurse, sleep_data))
+        35
+    """
+    return mini_compile_node(mini_normalize_predicate(predicate))
+
+
+def mini_compile_node(node: tuple) -> Callable[[Mapping[str, Any]], bool]:
+    """Compiles a normalized predicate (see mini_normalize_predicate) into a record test."""
+    kind = node[0]
+    if kind == "leaf":
+        _, column, op, target = node
+        if op == "=":
+            return lambda record: record.get(column) == target
+        if op == "!=":
+            return lambda record: record.get(column) != target
+        test = mini_compile_test(op, target)
+        return lambda record: test(record.get(column))
+    if kind == "not":
+        inner = mini_compile_node(node[1])
+        return lambda record: not inner(record)
+    children = node[1]
+    if not children:
+        return lambda record: kind == "and"
+    if kind == "and":  # Plain equalities are cheapest and usually the most selective, so go first
+        children = sorted(children, key=lambda part: not (part[0] == "leaf" and part[2] == "="))
+    test = mini_compile_node(children[-1])
+    for part in reversed(children[:-1]):
+        test = mini_link_node(kind, part, test)
+    return test
+
+
+def mini_link_node(kind: str, part: tuple, rest: Callable[[Mapping[str, Any]], bool]) -> Callable[[Mapping[str, Any]], bool]:
+    """Joins one part of an 'and'/'or' to the test compiled for the parts after it, keeping short circuiting."""
+    if part[0] == "leaf" and part[2] == "=":
+        column, target = part[1], part[3]
+        if kind == "and":
+            return lambda record: record.get(column) == target and rest(record)
+        return lambda record: record.get(column) == target or rest(record)
+    first = mini_compile_node(part)
+    if kind == "and":
+        return lambda record: first(record) and rest(record)
+    return lambda record: first(record) or rest(record)
+
+
+def mini_predicate_columns(node: tuple) -> list[str]:
+    """Returns the columns a normalized predicate reads, in first use order."""
+    if node[0] == "leaf":
+        return [node[1]]
+    parts = [node[1]] if node[0] == "not" else node[1]
+    return list(dict.fromkeys(chain.from_iterable(map(mini_predicate_columns, parts))))
+
+
+def mini_predicate_text(node: tuple) -> str:
+    """Writes a normalized predicate out as text, e.g. (Occupation = 'Nurse' and Sleep Duration < 6.5)."""
+    if node[0] == "leaf":
+        return f"{node[1]} {node[2]} {node[3]!r}"
+    if node[0] == "not":
+        return f"not {mini_predicate_text(node[1])}"
+    if len(node[1]) == 1:
+        return mini_predicate_text(node[1][0])
+    return "(" + f" {node[0]} ".join(map(mini_predicate_text, node[1])) + ")"
+
+
+def mini_index_candidates(data: Any, node: tuple) -> set[int] | None:
+    """
+    Returns the row ids that can match a normalized predicate according to the indexes of data,
+    or None if the indexes cannot narrow it down. The rows still have to be tested.
+    """
+    kind = node[0]
+    if kind == "leaf":
+        _, column, op, target = node
+        index = mini_get_index(data, column)
+        if index is None:
+            return None
+        if op in ("=", "ieq"):
+            return set(index.rows_for(target))  # Folded, so a superset for '='
+        if op == "in":
+            return set(chain.from_iterable(map(index.rows_for, target)))
+        bounds = target if op == "between" else (target,)
+        if op == "!=" or index.sorted_values is None or not all(
+            isinstance(bound, (int, float)) and not isinstance(bound, bool) for bound in bounds
+        ):
+            return None
+        values = index.sorted_values
+        if op == "between":
+            start, end = bisect_left(values, target[0]), bisect_right(values, target[1])
+        elif op in ("<", "<="):
+            start, end = 0, (bisect_left if op == "<" else bisect_right)(values, target)
+        else:
+            start, end = (bisect_right if op == ">" else bisect_left)(values, target), len(values)
+        return set(index.sorted_rows[start:end])
+    if kind == "not":
+        return None
+    found = [mini_index_candidates(data, part) for part in node[1]]
+    if kind == "and":
+        known = sorted((rows for rows in found if rows is not None), key=len)
+        return set.intersection(*known) if known else None
+    if not found or any(rows is None for rows in found):
+        return None
+    return set().union(*found)
+
+
+def mini_predicate_mask(table: MiniTable, node: tuple) -> bytes:
+    """
+    Returns one byte per row of a MiniTable, 1 where the normalized predicate matches.
+
+    Text columns are tested once per distinct value and the answer looked up by code; numeric columns
+    are compared as whole NumPy arrays when the backend is on and the target is a number.
+    """
+    size = len(table)
+    kind = node[0]
+    if kind == "not":
+        return mini_predicate_mask(table, node[1]).translate(bytes.maketrans(b"\x00\x01", b"\x01\x00"))
+    if kind in ("and", "or"):
+        masks = [mini_predicate_mask(table, part) for part in node[1]]
+        if not masks:
+            return bytes([kind == "and"]) * size
+        combined = masks[0]
+        for mask in masks[1:]:
+            if MINI_BACKEND == "numpy":
+                left, right = np.frombuffer(combined, dtype=np.uint8), np.frombuffer(mask, dtype=np.uint8)
+                combined = (left & right if kind == "and" else left | right).tobytes()
+            else:
+                combined = bytes(map(min if kind == "and" else max, combined, mask))
+        return combined
+
+    _, column, op, target = node
+    test = mini_compile_test(op, target)
+    if column not in table.columns:
+        return bytes([test(None)]) * size
+    values = table.column(column)
+    if values.kind == "str":
+        lookup = bytes(test(text) for text in values.pool)
+        return bytes(map(lookup.__getitem__, values.values))
+    if values.kind == "object":
+        return bytes(map(test, values.values))
+
+    bounds = target if op in ("between", "in") else (target,)
+    numeric = all(isinstance(bound, (int, float)) and not isinstance(bound, bool) for bound in bounds)
+    if MINI_BACKEND == "numpy" and numeric:
+        cells = np.frombuffer(values.values, dtype=np.int64 if values.kind == "int" else np.float64)
+        if op in ("=", "ieq"):
+            result = cells == target
+        elif op == "!=":
+            result = cells != target
+        elif op == "between":
+            result = (cells >= target[0]) & (cells <= target[1])
+        elif op == "in":
+            result = np.isin(cells, np.array(target))
+        else:
+            result = MINI_ORDER_OPS[op](cells, target)
+        if values.valid is not None:
+            present = np.frombuffer(values.valid, dtype=np.uint8).astype(bool)
+            result = np.where(present, result, test(""))
+        return result.astype(np.uint8).tobytes()
+
+    result = bytearray(map(test, values.values))
+    if values.valid is not None:
+        missing = test("")
+        for row in compress(range(size), values.valid.translate(bytes.maketrans(b"\x00\x01", b"\x01\x00"))):
+            result[row] = missing
+    return bytes(result)
+
+
+@mini_instrumented
+def mini_where_rows(data: list[dict[str, Any]] | MiniTable, predicate: Any) -> list[int]:
+    """
+    Returns the ascending row ids of the records that match a predicate.
+
+    Indexes from mini_build_index narrow the rows down first when the predicate uses indexed
+    columns. A MiniTable without a usable index is tested column by column with
+    mini_predicate_mask; a list is tested record by record with the compiled predicate.
+
+    Args:
+        data (list[dict] | MiniTable): The loaded data.
+        predicate: See mini_compile_predicate.
+
+    Returns:
+        list[int]: The matching row ids.
+
+    Example:
+        mini_where_rows(sleep_data, ("Heart Rate", "between", (80, 85)))
+        [3, 4, 5, 6, 16, ...]
+    """
+    node = mini_normalize_predicate(predicate)
+    candidates = mini_index_candidates(data, node)
+    if candidates is not None:
+        test = mini_compile_node(node)
+        return [row for row in sorted(candidates) if test(data[row])]
+    if isinstance(data, MiniTable):
+        return list(compress(range(len(data)), mini_predicate_mask(data, node)))
+    test = mini_compile_node(node)
+    return [row for row, record in enumerate(data) if test(record)]
+
+
+@mini_instrumented
+def mini_filter(input_dict: dict[str, Any]) -> Generator[dict[str, Any], None, None]:
+    """
+    Yields the records that match a predicate, optionally keeping only some columns.
+
+    Args:
+        input_dict (dict): A dictionary containing the data and the predicate. Must contain 'Data'
+            and 'Where' keys (see mini_compile_predicate for the predicate). 'Columns' is an optional
+            list of columns to keep. 'Data' can be a list, a MiniTable or a stream.
+
+    Yields:
+        dict: Each matching record, or just its 'Columns'.
+
+    Raises:
+        ValueError: If 'Data' or 'Where' is not provided or the predicate is not valid.
+
+    Example:
+        list(mini_filter({"Data": sleep_data, "Where": ("Occupation", "in", ["Doctor", "Nurse"]), "Columns": ["Person ID"]}))
+        [{'Person ID': 2}, {'Person ID': 3}, ...]
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Where"])
+    data = input_dict["Data"]
+    columns = input_dict.get("Columns")
+    if isinstance(data, (list, MiniTable)):
+        records = map(data.__getitem__, mini_where_rows(data, input_dict["Where"]))
+    else:
+        records = filter(mini_compile_predicate(input_dict["Where"]), data)
+    for record in records:
+        yield {column: record.get(column) for column in columns} if columns is not None else record
+
+
+@mini_instrumented
+def mini_count_where(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Counts the records that match a predicate.
+
+    Args:
+        input_dict (dict): A dictionary containing the data and the predicate. Must contain 'Data'
+            and 'Where' keys (see mini_compile_predicate). 'Data' can be a list, a MiniTable or a stream.
+
+    Returns:
+        dict[str, Any]: 'Where' and 'Count'.
+
+    Raises:
+        ValueError: If 'Data' or 'Where' is not provided or the predicate is not valid.
+
+    Example:
+        mini_count_where({"Data": sleep_data, "Where": ("or", ("Sleep Disorder", "=", "Insomnia"), ("Stress Level", ">=", 8))})
+        {'Where': ('or', ...), 'Count': 144}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Where"])
+    data = input_dict["Data"]
+    node = mini_normalize_predicate(input_dict["Where"])
+    test = mini_compile_node(node)
+    candidates = mini_index_candidates(data, node) if isinstance(data, (list, MiniTable)) else None
+    if candidates is not None:
+        count = sum(1 for row in candidates if test(data[row]))
+    elif isinstance(data, MiniTable):
+        count = mini_predicate_mask(data, node).count(1)
+    else:
+        count = sum(map(test, data))
+    return {"Where": input_dict["Where"], "Count": count}
+
+
+def mini_header_positions(header: list[str], columns: list[str]) -> list[int]:
+    """Returns the position of each column in the header."""
+    positions = {column: position for position, column in enumerate(header)}
+    unknown = [column for column in columns if column not in positions]
+    if unknown:
+        raise ValueError(f"Columns not in the file: {unknown}")
+    return [positions[column] for column in columns]
+
+
+def mini_row_test(header: list[str], converters: dict[str, Callable | None], where: Any) -> Callable[[list[str]], bool]:
+    """
+    Compiles a predicate into a test on raw CSV rows that converts only the cells the predicate reads,
+    so rows can be dropped before the rest of their cells are touched.
+    """
+    node = mini_normalize_predicate(where)
+    tested = mini_predicate_columns(node)
+    cells = list(zip(tested, mini_header_positions(header, tested), map(converters.get, tested)))
+    width = len(header)
+    if node[0] == "leaf":  # One cell, tested without building a record
+        test_value = mini_compile_test(node[2], node[3])
+        (_, position, convert), = cells
+
+        def row_test(row: list[str]) -> bool:
+            value = row[position] if position < len(row) else None
+            return test_value(value if convert is None else convert(value))
+
+        return row_test
+    test = mini_compile_node(node)
+
+    def row_test(row: list[str]) -> bool:
+        if len(row) < width:
+            row = row + [None] * (width - len(row))  # Short rows read as None like csv.DictReader
+        return test({column: row[position] if convert is None else convert(row[position]) for column, position, convert in cells})
+
+    return row_test
+
+
+def mini_row_reader(
+    header: list[str],
+    converters: dict[str, Callable | None],
+    columns: list[str] = None,
+    where: Any = None,
+    compact: bool = False,
+) -> Callable[[list[str]], dict[str, Any] | None]:
+    """
+    Compiles a function that turns a raw CSV row into a record holding only columns (all of them
+    if None), or returns None when the row does not match where. Cells of other columns are never
+    converted and rows that fail the predicate never become dictionaries. With compact the records
+    are MiniRecords instead of dictionaries.
+    """
+    output = header if columns is None else list(columns)
+    cells = list(zip(output, mini_header_positions(header, output), map(converters.get, output)))
+    row_test = mini_row_test(header, converters, where) if where is not None else None
+    width = len(header)
+    record_type = mini_record_type(output) if compact else None
+    if compact:  # Text cells are interned like mini_convert_rows does
+        cells = [(column, position, sys.intern if convert is None else convert) for column, position, convert in cells]
+
+    def read(row: list[str]) -> dict[str, Any] | None:
+        if row_test is not None and not row_test(row):
+            return None
+        if len(row) != width:
+            record = mini_convert_row(header, converters, row)
+            if columns is not None:
+                record = {column: record[column] for column in output}
+            return record if record_type is None else mini_record_type(list(record))(record.values())
+        if record_type is not None:
+            return record_type([convert(row[position]) for _, position, convert in cells])
+        return {column: row[position] if convert is None else convert(row[position]) for column, position, convert in cells}
+
+    return read
+
+
+def mini_select_raw_rows(
+    header: list[str], schema: dict[str, str], rows: Iterable[list[str]], columns: list[str] = None, where: Any = None
+) -> tuple[list[str], Iterable[list[str]]]:
+    """Returns the header and raw rows narrowed to the rows matching where and to columns, still as text."""
+    if where is not None:
+        rows = filter(mini_row_test(header, mini_compile_schema(schema, header), where), rows)
+    if columns is None:
+        return header, rows
+    positions = mini_header_positions(header, columns)
+    return list(columns), ([row[position] if position < len(row) else None for position in positions] for row in rows)
+
+
+@mini_instrumented
+def mini_load_csv_yield(
+    filename: str,
+    schema: dict[str, str] | str = None,
+    workers: int = 1,
+    cache: bool = False,
+    where: Any = None,
+    columns: list[str] = None,
+    storage: str = "dict",
+) -> Generator[dict[str, str], None, None]:
+    """
+    Loads a CSV file and yields each row as a dictionary.
+
+    The column types are inferred once from the first rows, or taken from schema.
+
+    Args:
+        filename (str): The path to the CSV file to be read.
+        schema (dict | str): Optional column types, or the path of a saved schema, to skip inference.
+        workers (int): The number of processes to parse with. Rows are still yielded in file order
+            and only a few chunks are held in memory at a time.
+        cache (bool): If True, rows are read from the binary sidecar cache (see mini_load_csv_cached).
+            The first load builds the whole file as a MiniTable to write the cache.
+        where: An optional predicate (see mini_compile_predicate); only the rows that match are yielded.
+            Only the cells the predicate reads are converted before a row is dropped.
+        columns (list[str]): Optional columns to keep; the other cells are never converted.
+        storage (str): 'dict' to yield dictionaries or 'compact' to yield MiniRecords.
+
+    Yields:
+        dict: Each row of the CSV file as a dictionary.
+            Example: [{'column1': 'value1', 'column2': 'value2'}, ...]
+
+    Raises:
+        FileNotFoundError: If file is not found.
+        ValueError: If where is not a valid predicate, or it or columns name a column the file does not have.
+        ValueError: If storage is not 'dict' or 'compact'.
+
+    Example:
+        mini_load_csv_yield({"filename": "myproject/mydata.csv"})
+        mini_load_csv_yield("datasets/health_activity_data.csv", where=("Smoker", "=", "Yes"), columns=["ID", "BMI"])
+    """
+    if storage not in ("dict", "compact"):
+        raise ValueError(f"Unknown storage '{storage}', use 'dict' or 'compact'.")
+    if where is not None:
+        mini_normalize_predicate(where)  # Checked before the file is opened
+    compact = storage == "compact"
+    try:
+        if cache:
+            table = mini_load_csv_cached({"filename": filename, "schema": schema, "workers": workers})
+            rows = mini_where_rows(table, where) if where is not None else range(len(table))
+            if columns is not None:
+                table = table.select(columns)
+            if compact:
+                record_type, getters = mini_record_type(table.columns), [column.get for column in table.columns.values()]
+                yield from (record_type([get(i) for get in getters]) for i in rows)
+                return
+            yield from map(table.__getitem__, rows)
+            return
+        with open(filename, newline="", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            rows = filter(None, reader)  # Skip blank lines like csv.DictReader
+            sample = list(islice(rows, MINI_SCHEMA_SAMPLE_SIZE))
+            schema = mini_resolve_schema(schema, header, sample)
+            if workers > 1:
+                yield from mini_parse_csv_parallel(filename, header, schema, storage, workers, columns, where)
+                return
+            converters = mini_compile_schema(schema, header)
+            if columns is not None or where is not None:
+                read = mini_row_reader(header, converters, columns, where, compact)
+                yield from filter(None, map(read, chain(sample, rows)))
+                return
+            record_type = mini_record_type(header) if compact else None
+            for row in chain(sample, rows):
+                data = mini_convert_row(header, converters, row, record_type)
+                yield data
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return
+
+
+def mini_csv_byte_ranges(filename: str, parts: int) -> list[tuple[int, int]]:
+    """
+    Splits the rows of a CSV file into byte ranges that start and end on row boundaries.
+
+    Rows are split at newlines, so fields must not contain quoted line breaks.
+
+    Args:
+        filename (str): The path to the CSV file.
+        parts (int): The number of ranges to aim for.
+
+    Returns:
+        list[tuple[int, int]]: (start, end) byte offsets covering every row after the header.
+
+    Example:
+        mini_csv_byte_ranges("datasets/health_activity_data.csv", 2)
+        [(191, 33558), (33558, 66851)]
+    """
+    size = os.path.getsize(filename)
+    with open(filename, mode="rb") as file:
+        file.readline()  # Skip the header
+        bounds = [file.tell()]
+        for part in range(1, parts):
+            target = bounds[0] + (size - bounds[0]) * part // parts
+            if target <= bounds[-1]:
+                continue
+            file.seek(target - 1)
+            file.readline()  # Move to the start of the next row
+            if bounds[-1] < file.tell() < size:
+                bounds.append(file.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def mini_parse_csv_range(
+    filename: str,
+    start: int,
+    end: int,
+    header: list[str],
+    schema: dict[str, str],
+    storage: str,
+    columns: list[str] = None,
+    where: Any = None,
+) -> list[dict[str, Any]] | MiniTable:
+    """
+    Parses and types the rows in one byte range of a CSV file. Runs inside a worker process.
+
+    Args:
+        filename (str): The path to the CSV file.
+        start (int): The offset of the first row.
+        end (int): The offset just after the last row.
+        header (list[str]): The column names.
+        schema (dict[str, str]): The type of each column.
+        storage (str): 'dict' for a list of dictionaries, 'compact' for a list of MiniRecords or 'columnar' for a MiniTable.
+        columns (list[str]): Optional columns to keep.
+        where: Optional predicate the rows must match.
+
+    Returns:
+        list[dict[str, Any]] | list[MiniRecord] | MiniTable: The typed rows of the range.
+    """
+    with open(filename, mode="rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+    rows = filter(None, csv.reader(io.StringIO(text, newline="")))
+    if storage == "columnar":
+        header, rows = mini_select_raw_rows(header, schema, rows, columns, where)
+        return MiniTable.from_csv_rows(header, rows, {column: schema[column] for column in header})
+    converters = mini_compile_schema(schema, header)
+    compact = storage == "compact"
+    if columns is not None or where is not None:
+        return list(filter(None, map(mini_row_reader(header, converters, columns, where, compact), rows)))
+    return mini_convert_rows(header, converters, list(rows), mini_record_type(header) if compact else None)
+
+
+def mini_parse_csv_parallel(
+    filename: str,
+    header: list[str],
+    schema: dict[str, str],
+    storage: str,
+    workers: int,
+    columns: list[str] = None,
+    where: Any = None,
+) -> Generator[list[dict[str, Any]] | MiniTable, None, None]:
+    """
+    Parses a CSV file in a pool of processes and yields the rows (or tables) of each range in file order.
+
+    At most two ranges per worker are in flight, so memory stays bounded when the caller streams.
+    """
+    if columns is not None or where is not None:
+        mini_select_raw_rows(header, schema, [], columns, where)  # Fail here rather than in every worker
+    ranges = mini_csv_byte_ranges(filename, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for start, end in ranges:
+                pending.append(
+                    executor.submit(mini_parse_csv_range, filename, start, end, header, schema, storage, columns, where)
+                )
+                if len(pending) >= workers * 2:
+                    result = pending.popleft().result()
+                    yield from ([result] if storage == "columnar" else result)
+            while pending:
+                result = pending.popleft().result()
+                yield from ([result] if storage == "columnar" else result)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+@mini_instrumented
+def mini_load_csv_parallel(input_dict: dict[str, Any]) -> list[dict[str, Any]] | MiniTable:
+    """
+    Loads a CSV file using several processes, giving the same result as mini_load_csv_dict.
+
+    The file is split into byte ranges on row boundaries, each range is parsed and typed in a
+    ProcessPoolExecutor and the results are joined back together in file order. The schema is
+    settled once up front so every range types its columns the same way. Fields must not contain
+    quoted line breaks.
+
+    Args:
+        input_dict (dict): The same keys as mini_load_csv_dict, plus optionally 'workers'
+            (default: the number of CPUs).
+
+    Returns:
+        list[dict] | MiniTable: The loaded data, a MiniTable if 'storage' is 'columnar' and a list of
+            MiniRecords if it is 'compact'.
+
+    Raises:
+        ValueError: If 'filename' is not provided in the input dictionary.
+
+    Example:
+        mini_load_csv_parallel({"filename": "datasets/health_activity_data.csv", "workers": 4})
+    """
+    filename = input_dict.get("filename")
+    if not filename:
+        raise ValueError("Filename is required in the input dictionary.")
+    storage = input_dict.get("storage", "dict")
+    if storage not in MINI_STORAGES:
+        raise ValueError(f"Unknown storage '{storage}', use 'dict', 'columnar' or 'compact'.")
+    workers = input_dict.get("workers") or os.cpu_count() or 1
+    with open(filename, mode="r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        sample = list(islice(filter(None, reader), MINI_SCHEMA_SAMPLE_SIZE))
+    schema = mini_resolve_schema(input_dict.get("schema"), header, sample)
+    if input_dict.get("save_schema"):
+        mini_save_schema(schema, input_dict["save_schema"])
+    columns, where = input_dict.get("columns"), input_dict.get("where")
+    parts = mini_parse_csv_parallel(filename, header, schema, storage, workers, columns, where)
+    if storage == "columnar":
+        tables = list(parts)
+        header = header if columns is None else list(columns)
+        schema = {column: schema[column] for column in header}
+        return MiniTable.concat(tables) if tables else MiniTable.from_csv_rows(header, [], schema)
+    return list(parts)
+
+
+MINI_CACHE_SUFFIX = ".minicache"
+MINI_CACHE_MAGIC = b"MINICACHE1\n"
+
+
+def mini_file_key(filename: str, content_hash: bool = True) -> dict[str, Any]:
+    """
+    Describes a file by its path, size, modification time and (optionally) SHA-256 content hash.
+
+    Example:
+        mini_file_key("datasets/sleep_health_and_lifestyle_data.csv")
+        {'path': '/.../datasets/sleep_health_and_lifestyle_data.csv', 'size': 24110, 'mtime_ns': ..., 'sha256': '...'}
+    """
+    stat = os.stat(filename)
+    key = {"path": os.path.abspath(filename), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if content_hash:
+        digest = hashlib.sha256()
+        with open(filename, mode="rb") as file:
+            while block := file.read(1 << 20):
+                digest.update(block)
+        key["sha256"] = digest.hexdigest()
+    return key
+
+
+def mini_write_cache(table: MiniTable, filename: str, key: dict[str, Any] = None) -> str:
+    """
+    Writes a MiniTable to a binary sidecar cache next to the CSV file it was loaded from.
+
+    The cache is a JSON header (the file key, the schema and the layout of each column) followed
+    by the raw column buffers, each aligned to 8 bytes so they can be mapped back without copying.
+
+    Args:
+        table (MiniTable): The table loaded from filename.
+        filename (str): The path of the CSV file.
+        key (dict): The mini_file_key of the file taken before it was parsed, so a file that
+            changes while it is being loaded is never cached under its new key.
+
+    Returns:
+        str: The path of the cache file.
+    """
+    buffers = []
+    offset = 0
+    layout = []
+    for name, column in table.columns.items():
+        entry = {"name": name, "kind": column.kind, "pool": column.pool, "buffers": {}}
+        if column.kind == "object":
+            entry["object"] = column.values
+        for part in ("values", "valid", "ints"):
+            buffer = getattr(column, part)
+            if buffer is None or column.kind == "object":
+                continue
+            data = memoryview(buffer).cast("B")
+            entry["buffers"][part] = [offset, len(data), getattr(buffer, "typecode", "B")]
+            padding = -len(data) % 8
+            buffers.append(bytes(data) + b"\0" * padding)
+            offset += len(data) + padding
+        layout.append(entry)
+
+    header = json.dumps(
+        {
+            "key": key or mini_file_key(filename),
+            "byteorder": sys.byteorder,
+            "schema": table.schema,
+            "length": len(table),
+            "columns": layout,
+        }
+    ).encode("utf-8")
+    start = len(MINI_CACHE_MAGIC) + 8 + len(header)
+    cache_path = filename + MINI_CACHE_SUFFIX
+    with open(cache_path + ".tmp", mode="wb") as file:
+        file.write(MINI_CACHE_MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        file.write(b"\0" * (-start % 8))
+        file.writelines(buffers)
+    os.replace(cache_path + ".tmp", cache_path)  # Readers never see a half written cache
+    return cache_path
+
+
+def mini_read_cache(filename: str, schema: dict[str, str] | str = None, verify_hash: bool = False) -> MiniTable | None:
+    """
+    Maps the binary sidecar cache of a CSV file back into a MiniTable without copying the columns.
+
+    The cache is only used if it was written for the same path, size and modification time. If
+    the modification time changed (for example the file was copied or touched) the SHA-256 hash
+    of the content decides. With verify_hash the hash is always checked.
+
+    Args:
+        filename (str): The path of the CSV file.
+        schema (dict | str): If given, the cache is only used if it was built with this schema.
+        verify_hash (bool): Always compare the content hash, not just the size and modification time.
+
+    Returns:
+        MiniTable | None: The table, or None if there is no usable cache.
+
+    Example:
+        mini_read_cache("datasets/health_activity_data.csv")
+    """
+    cache_path = filename + MINI_CACHE_SUFFIX
+    try:
+        with open(cache_path, mode="rb") as file:
+            if file.read(len(MINI_CACHE_MAGIC)) != MINI_CACHE_MAGIC:
+                return None
+            header = json.loads(file.read(int.from_bytes(file.read(8), "little")))
+            start = file.tell() + (-file.tell() % 8)
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    key = mini_file_key(filename, content_hash=False)
+    cached = header["key"]
+    if header["byteorder"] != sys.byteorder or any(cached[name] != key[name] for name in ("path", "size")):
+        return None
+    if verify_hash or cached["mtime_ns"] != key["mtime_ns"]:
+        if mini_file_key(filename)["sha256"] != cached["sha256"]:
+            return None
+    if isinstance(schema, str):
+        schema = mini_load_schema(schema)
+    if schema is not None and schema != header["schema"]:
+        return None
+
+    view = memoryview(mapped)
+    columns = {}
+    for entry in header["columns"]:
+        parts = {}
+        for part, (offset, size, typecode) in entry["buffers"].items():
+            parts[part] = view[start + offset : start + offset + size].cast(typecode)
+        values = entry.get("object", parts.pop("values", None))
+        columns[entry["name"]] = MiniColumn(entry["kind"], values, entry["pool"], **parts)
+    table = MiniTable(columns, header["schema"])
+    table.length = header["length"]
+    return table
+
+
+@mini_instrumented
+def mini_load_csv_cached(input_dict: dict[str, Any]) -> MiniTable:
+    """
+    Loads a CSV file through its binary sidecar cache ('<filename>.minicache').
+
+    The first load parses the CSV into a MiniTable and writes the cache. Later loads map the cache
+    with mmap instead of running the CSV parser, so numeric columns and string codes are read
+    straight from the page cache without copying. The cache is rebuilt when the file changes.
+
+    Args:
+        input_dict (dict): A dictionary containing the filename under the key 'filename'.
+            Optionally 'schema', 'save_schema' and 'workers' as for mini_load_csv_dict, and
+            'verify_hash' to always check the content hash.
+
+    Returns:
+        MiniTable: The loaded table.
+
+    Raises:
+        ValueError: If 'filename' is not provided in the input dictionary.
+
+    Example:
+        mini_load_csv_cached({"filename": "datasets/health_activity_data.csv"})
+    """
+    filename = input_dict.get("filename")
+    if not filename:
+        raise ValueError("Filename is required in the input dictionary.")
+    table = mini_read_cache(filename, input_dict.get("schema"), input_dict.get("verify_hash", False))
+    if MINI_METRICS_SINKS:
+        mini_emit({"metric": "cache", "cache": "csv", "hit": table is not None})
+    if table is not None:
+        if input_dict.get("save_schema"):
+            mini_save_schema(table.schema, input_dict["save_schema"])
+        return table
+    key = mini_file_key(filename)
+    table = mini_load_csv_dict({**input_dict, "storage": "columnar", "cache": False, "columns": None, "where": None})
+    mini_write_cache(table, filename, key)
+    return table
+
+
+MINI_TAIL_BLOCK_SIZE = 1 << 22  # Bytes read at a time by MiniTailLoader
+
+
+class MiniTailLoader:
+    """
+    Follows a CSV file that is appended to, parsing only the rows added since the last refresh.
+
+    The loader remembers the byte offset it has read up to. Each refresh seeks there, reads the
+    complete lines that were added (a last line without its newline is left for the next refresh)
+    and types them with the schema settled on the first load. The new records are added to
+    `data`, whose indexes are merged rather than rebuilt, and to running aggregates, so the cost
+    of a refresh depends on the new rows and not on the size of the file. Fields must not contain
+    quoted line breaks. If the file gets shorter it is taken to have been replaced and is read
+    again from the start.
+
+    Args:
+        filename (str): The CSV file to follow.
+        schema (dict | str, optional): Column types, or the path of a saved schema; inferred from
+            the first rows otherwise. Defaults to None.
+        aggregates (list[dict], optional): Aggregates kept up to date, in the format of
+            mini_aggregate. Defaults to None.
+        indexes (list[str], optional): Columns to index like mini_build_index. Defaults to None.
+        storage (str, optional): 'dict' for dictionaries or 'compact' for MiniRecords. Defaults to 'dict'.
+        keep_rows (bool, optional): If False, rows only feed the aggregates and are not kept, so
+            memory stays bounded. Defaults to True.
+
+    Attributes:
+        data (MiniIndexedList): The records read so far, carrying the indexes.
+        offset (int): The byte offset the next refresh reads from.
+        total (int): The number of records read so far.
+
+    Raises:
+        ValueError: If storage is unknown, an aggregate is unknown or indexes are asked for
+            without keep_rows. A refresh raises it if an index column is not in the file.
+
+    Example:
+        loader = MiniTailLoader("datasets/health_activity_data.csv",
+                                aggregates=[{"Function": "average", "Column": "BMI"}], indexes=["Daily_Steps"])
+        loader.refresh()  # Reads the whole file the first time
+        ...               # Rows are appended to the file
+        loader.refresh()  # Reads only the new rows
+        loader.results()
+        [{'Exists': True, 'Column': 'BMI', 'Average': 26.73}]
+        mini_value_exists(loader.data.indexes["Daily_Steps"].sorted_values, 6457)
+        {'Value': 6457, 'Exists': True}
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        schema: dict[str, str] | str = None,
+        aggregates: list[dict[str, Any]] = None,
+        indexes: list[str] = None,
+        storage: str = "dict",
+        keep_rows: bool = True,
+    ):
+        if storage not in ("dict", "compact"):
+            raise ValueError(f"Unknown storage '{storage}', use 'dict' or 'compact'.")
+        if indexes and not keep_rows:
+            raise ValueError("Indexes need the rows, so keep_rows must be True.")
+        self.specs = list(aggregates or [])
+        for spec in self.specs:
+            mini_validate_input_dict(spec, ["Function", "Column"])
+            if spec["Function"] not in MINI_AGGREGATES:
+                raise ValueError(f"Unknown aggregate '{spec['Function']}', use one of {list(MINI_AGGREGATES)}.")
+        self.filename = filename
+        self.schema_source = schema
+        self.index_columns = list(indexes or [])
+        self.storage = storage
+        self.keep_rows = keep_rows
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets everything read so far, so the next refresh reads the file from the start."""
+        self.offset = 0
+        self.total = 0
+        self.header = self.schema = self.converters = self.record_type = None
+        self.data = MiniIndexedList()
+        self.data.indexes = {column: MiniColumnIndex(column, []) for column in self.index_columns}
+        self.aggregates = [MINI_AGGREGATES[spec["Function"]](spec) for spec in self.specs]
+
+    def refresh(self) -> list[dict[str, Any]]:
+        """
+        Reads the rows appended since the last refresh and updates the data, indexes and aggregates.
+
+        Returns:
+            list[dict[str, Any]]: The new records, in file order.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        if os.path.getsize(self.filename) < self.offset:
+            self.reset()  # The file was truncated or replaced
+        added = []
+        with open(self.filename, mode="rb") as file:
+            file.seek(self.offset)
+            pending = b""
+            while block := file.read(MINI_TAIL_BLOCK_SIZE):
+                block = pending + block
+                end = block.rfind(b"\n") + 1
+                pending = block[end:] if end and self.add_lines(block[:end], added) else block
+        return added
+
+    def add_lines(self, lines: bytes, added: list[dict[str, Any]]) -> bool:
+        """Types complete lines, adds them everywhere and moves the offset past them; False if nothing was taken."""
+        rows = list(filter(None, csv.reader(io.StringIO(lines.decode("utf-8"), newline=""))))
+        if self.header is None:
+            header, rows = (rows[0], rows[1:]) if rows else ([], [])
+            if not rows and self.schema_source is None:
+                return False  # Only the header so far; the schema waits for the first rows
+            mini_header_positions(header, self.index_columns)
+            self.header = header
+            self.schema = mini_resolve_schema(self.schema_source, header, rows[:MINI_SCHEMA_SAMPLE_SIZE])
+            self.converters = mini_compile_schema(self.schema, header)
+            self.record_type = mini_record_type(header) if self.storage == "compact" else None
+        self.offset += len(lines)
+        records = mini_convert_rows(self.header, self.converters, rows, self.record_type)
+        for aggregate in self.aggregates:
+            if aggregate.column in self.header:
+                add = aggregate.add
+                for record in records:
+                    add(record[aggregate.column])
+        if self.keep_rows:
+            self.data.extend(records)
+        self.total += len(records)
+        added.extend(records)
+        return True
+
+    def results(self) -> list[dict[str, Any]]:
+        """Returns the aggregates over every row read so far, the same as mini_aggregate would give."""
+        if self.header is None:
+            return mini_aggregate({"Data": [], "Aggregates": self.specs})
+        return [
+            aggregate.result(self.total) if aggregate.column in self.header else aggregate.absent()
+            for aggregate in self.aggregates
+        ]
+
+
+@mini_instrumented
+def mini_len(input_dict: dict[str, str]) -> dict[str, Any]:
+    """
+    Takes a dictionary with 'Data' and 'Column' keys and returns a dictionary with information about the number of records in a specified column.
+
+    Args:
+        input_dict (dict): The input dictionary. Must contain 'Data' and 'Column' keys.
+
+    Returns:
+        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'NumRecords', and 'NumMissing'.
+
+    Raises:
+        ValueError: If 'Data' or 'Column' is not provided in the input dictionary.
+
+    Example:
+        mini_len({"Data": sleep_data, "Column": "sleep"})
+        {'Exists': True, 'Column': 'BMI Category', 'NumRecords': 374, 'NumMissing': 0}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column"])
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+
+    if isinstance(data, MiniTable):
+        if column not in data.columns:
+            return {"Exists": False}
+        return {
+            "Exists": True,
+            "Column": column,
+            "NumRecords": len(data),
+            "NumMissing": data.column(column).num_missing(),
+        }
+    if isinstance(data, Iterator):  # A stream such as mini_load_csv_yield, read it once
+        return mini_aggregate({"Data": data, "Aggregates": [{"Function": "len", "Column": column}]})[0]
+
+    columns = data[0].keys()
+    if column in columns:
+        records = mini_simple_len(data)
+        missing = 0
+        for row in data:
+            if row[column] in MINI_MISSING:
+                missing += 1
+        return {
+            "Exists": True,
+            "Column": column,
+            "NumRecords": records,
+            "NumMissing": missing,
+        }
+    else:
+        return {"Exists": False}
+
+
+@mini_instrumented
+def mini_search(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Searches for a specific value in a a specific column and returns a dictionary with information about the search result.
+
+    Arg:
+        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
+            Example: {"Data": sleep_data, "Column": "sleep", "Value": "insomnia"}
+
+    Returns:
+        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'NumRecords', and 'NumMissing'.
+
+    Raises:
+        ValueError: If 'Data', 'Column' or 'Value' is not provided in the input dictionary.
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column", "Value"])
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+    search_value = input_dict.get("Value")
+
+    index = mini_get_index(data, column)
+    if index is not None:
+        return {"Exists": index.count(search_value) > 0, "Column": column, "Value": search_value}
+
+    output_dict = {}
+    output_dict["Exists"] = False
+    for record in data:
+        if isinstance(record[column], str):
+            if record[column].lower() == search_value.lower():
+                output_dict["Exists"] = True
+                break
+        elif record[column] == search_value:
+            output_dict["Exists"] = True
+            break
+
+    output_dict["Column"] = column
+    output_dict["Value"] = search_value
+
+    return output_dict
+
+
+@mini_instrumented
+def mini_count(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Searches for a specific value in a a specific column and returns a dictionary which contains the proportion of records that match the search value.
+
+    Arg:
+        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
+
+    Returns:
+        dict[str, Any]: A dictionary with keys 'Exists', 'Column', 'Value' and 'Proportion'.
+
+    Raises:
+        ValueError: If 'Data', 'Column' or 'Value' is not provided in the input dictionary.
+
+    Example:
+        mini_count({"Data": sleep_data, "Column": "sleep", "Value": "insomnia"})
+        {'Exists': True, 'Column': 'BMI Category', 'Value': 'Obese', 'Proportion': 0.03}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column", "Value"])
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+    search_value = input_dict.get("Value")
+    # One pass counts the matches and the records together
+    return mini_aggregate({"Data": data, "Aggregates": [{"Function": "count", "Column": column, "Value": search_value}]})[0]
+
+
+@mini_instrumented
+def mini_count_match(input_dict: dict[str, str]) -> dict[str, Any]:
+    """
+    Counts the number of records that match a specific value in a specific column.
+
+    Args:
+        input_dict (dict): A dictionary containing the search term and data. Must contain 'Data', 'Column', and 'Value' keys.
+
+    Returns:
+        dict[str, int]: A dictionary with keys 'Exists', 'Column', 'Value', and 'Count'.
+
+    Raises:
+        ValueError: If a condition column is not in the data.
+
+    Example:
+        mini_count_match({"Data": sleep_data, "Occupation": "Doctor", "BMI Category": "Normal"})
+        {'Exists': True, 'Column': 'BMI Category', 'Value': 'Obese', 'Count': 30}
+    """
+    data = input_dict.get("Data")
+    conditions = input_dict.copy()
     del conditions["Data"]
-    columns = conditions.keys()
 
-    count = 0
+    if isinstance(data, Iterator):  # Peek at the first record of a stream for its columns
+        first = next(data, None)
+        data = chain(() if first is None else (first,), data)
+    else:
+        first = data[0] if data else None
+    absent = [column for column in conditions if first is not None and column not in first]
+    if absent:
+        raise ValueError(f"Columns not in the data: {absent}")
+
+    # The conditions are compiled once into one test; indexed columns narrow the rows down first
+    count = mini_count_where({"Data": data, "Where": conditions})["Count"]
+
+    output_dict = {"Conditions": conditions, "Count": count}
+    return output_dict
+
+
+def mini_numeric_array(values: list[Any]) -> tuple[Any, list[int | float]] | None:
+    """
+    Returns the present values of a list as a NumPy array for the NumPy backend, with the values themselves.
+
+    Missing values (None, "" and "None") are left out. None is returned when the backend is off, or the
+    list holds anything other than ints, floats and missing values (or a NaN), so the caller can fall
+    back to its pure Python loop and give exactly the same result.
+
+    Example:
+        mini_numeric_array([6.1, "", 7])
+        (array([6.1, 7. ]), [6.1, 7])
+    """
+    if MINI_BACKEND != "numpy":
+        return None
+    kinds = set(map(type, values))
+    if not kinds <= {int, float}:
+        values = [value for value in values if value not in MINI_MISSING]
+        kinds = set(map(type, values))
+        if not kinds <= {int, float}:
+            return None
+    try:
+        numbers = np.array(values, dtype=np.int64 if kinds == {int} else np.float64)
+    except OverflowError:
+        return None  # Ints too big for 64 bits
+    if numbers.dtype == np.float64 and np.isnan(numbers).any():
+        return None
+    return numbers, values
+
+
+@mini_instrumented
+def mini_average(input_dict: dict[str, int | float]) -> dict[str, Any]:
+    """
+    Calculates the mean of a specific column in the data. This only works for numerical values.
+
+    Args:
+        input_dict (dict): A dictionary containing the data and the column to calculate the mean for. Must contain 'Data' and 'Column' keys.
+
+    Returns:
+        dict: Containing if the value exists and the average.
+
+    Raises:
+        ValueError: If 'Data' or 'Column' is not provided in the input dictionary.
+        ValueError: If the specified column does not contain numeric values.
+
+    Example:
+        mini_average({"Data": sleep_data, "Column": "Heart Rate"})
+        {"Exists": True, "Column": "Heart Rate", "Average": 69}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column"])
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+
+    if isinstance(data, Iterator):  # A stream such as mini_load_csv_yield, read it once
+        return mini_aggregate({"Data": data, "Aggregates": [{"Function": "average", "Column": column}]})[0]
+
+    # Check if column exists in the first record (assuming data is non-empty)
+    if not data or column not in data[0]:
+        return {"Exists": False, "Column": column}
+
+    if isinstance(data, MiniTable) and data.column(column).kind != "object":
+        values = data.column(column)
+        if values.kind == "str":
+            if any(text not in ("", "None") for text in values.pool):
+                raise ValueError(f"Column '{column}' does not contain numeric values.")
+            return {"Exists": True, "Column": column, "Average": 0}
+        count = len(values) - values.num_missing()
+        average = round(mini_column_sum(values) / count, 2) if count else 0
+        return {"Exists": True, "Column": column, "Average": average}
+
+    values = [record.get(column) for record in data]
+    numeric = mini_numeric_array(values)
+    if numeric is not None:
+        numbers = numeric[0]
+        with np.errstate(all="ignore"):  # inf - inf is nan, silently, as in the loop below
+            # accumulate adds in order like the loop below, so the rounding matches it exactly
+            total = float(np.add.accumulate(numbers, dtype=np.float64)[-1]) if len(numbers) else 0
+        average = round(total / len(numbers), 2) if len(numbers) else 0
+        return {"Exists": True, "Column": column, "Average": average}
+
+    total = 0.0
+    count = 0
+    for value in values:
+        if value not in MINI_MISSING:
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"Column '{column}' does not contain numeric values.")
+            total += float(value)
+            count += 1
+
+    if count == 0:
+        average = 0
+    else:
+        average = round(total / count, 2)
+
+    return {"Exists": True, "Column": column, "Average": average}
+
+
+@mini_instrumented
+def mini_extract_metrics(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Takes specified columns and returns a list of dictionaries containing the values for those columns for records where the 'Occupation' is "Teacher".
+
+    Args:
+        input_dict (dict[str, str]): A dictionary containing the data and the metrics to extract.
+        Must contain 'Data' and 'Metrics' keys. An optional 'Where' predicate (see
+        mini_compile_predicate) picks other records than ("Occupation", "=", "Teacher").
+
+    Yields:
+        dict: A dictionary with the specified metrics and their values.
+
+    Raises:
+        ValueError: If 'Data' is not provided in the input dictionary.
+
+    Example:
+        mini_extract_metrics({"Data": sleep_data, "Col1":"Person ID", "Col2":"Quality of Sleep", "Col3": "Physical Activity Level"})
+        {'Person ID': 262, 'Quality of Sleep': 7, 'Physical Activity Level': 45}
+    """
+    mini_validate_input_dict(input_dict, ["Data"])
+    data = input_dict.get("Data")
+    where = input_dict.get("Where", ("Occupation", "=", "Teacher"))
+    columns = [v for k, v in input_dict.items() if k not in ("Data", "Where")]
+    yield from mini_filter({"Data": data, "Where": where, "Columns": columns})
+
+
+def mini_array_sum(numbers: Any) -> int | float | None:
+    """Returns the sum of a NumPy array exactly as sum() would, or None if an int sum could overflow 64 bits."""
+    if numbers.dtype == np.float64:
+        with np.errstate(all="ignore"):
+            return float(np.add.accumulate(numbers)[-1]) if numbers.size else 0  # In order, like sum()
+    if numbers.size == 0 or max(abs(int(numbers.min())), abs(int(numbers.max()))) < 2**63 // numbers.size:
+        return int(numbers.sum())
+    return None
+
+
+def mini_column_sum(values: MiniColumn) -> int | float:
+    """Returns the sum of the present values of a numeric column, exactly as sum() would."""
+    if MINI_BACKEND == "numpy":
+        total = mini_array_sum(values.to_numpy().compressed())
+        if total is not None:
+            return total
+    return sum(values.present())
+
+
+def mini_numeric_extreme(values: list[Any], func: Callable) -> tuple[bool, int | float | None]:
+    """
+    Finds max or min (passed as func) of a list with the NumPy backend, as mini_max and mini_min would.
+
+    Returns:
+        tuple[bool, int | float | None]: (False, None) if the NumPy backend cannot be used, otherwise
+            (True, the first extreme value as it was stored or None if there are no numbers).
+    """
+    numeric = mini_numeric_array(values)
+    if numeric is None:
+        return False, None
+    numbers, present = numeric
+    if not len(numbers):
+        return True, None
+    best = present[int(numbers.argmax() if func is max else numbers.argmin())]
+    return True, None if best == (float("-inf") if func is max else float("inf")) else best  # As the loops
+
+
+@mini_instrumented
+def mini_max(data: list | dict, column: str = None) -> int | float:
+    """
+    Function to find the max of either a list or a dictionary.
+
+    Args:
+        data: Either list of dicts OR simple list of values
+        column: Column name (only needed for list of dicts)
+
+    Returns:
+        int | float: the maximum value found.
+
+    Example:
+        mini_max([1,2,3], None)
+        3
+    """
+    index = mini_get_index(data, column)
+    if index is not None and index.sorted_values is not None:
+        return index.extreme("max")
+    if isinstance(data, MiniTable) and column is not None and data.column(column).kind != "object":
+        values = data.column(column)
+        return None if values.kind == "str" else values.extreme(max)
+
+    if isinstance(data, Iterator) and column is not None:  # A stream such as mini_load_csv_yield, read it once
+        return mini_aggregate({"Data": data, "Aggregates": [{"Function": "max", "Column": column}]})[0]["Result"]
+    if MINI_BACKEND == "numpy" and isinstance(data, list):
+        values = data if column is None else [record[column] for record in data]
+        used, result = mini_numeric_extreme(values, max)
+        if used:
+            return result
+
+    max_value = float("-inf")
+
+    for value in data if column is None else (record[column] for record in data):
+        if value not in MINI_MISSING and isinstance(value, (int, float)):
+            if value > max_value:
+                max_value = value
+
+    return max_value if max_value != float("-inf") else None
+
+
+@mini_instrumented
+def mini_min(data: list | dict, column=None) -> int | float:
+    """
+    Function to find the min of either a list or a dictionary.
+
+    Args:
+        data: Either list of dicts OR simple list of values
+        column: Column name (only needed for list of dicts)
+
+    Returns:
+        int | float: the minimum value found.
+
+    Example:
+        mini_min([1,2,3], None)
+        1
+    """
+    index = mini_get_index(data, column)
+    if index is not None and index.sorted_values is not None:
+        return index.extreme("min")
+    if isinstance(data, MiniTable) and column is not None and data.column(column).kind != "object":
+        values = data.column(column)
+        return None if values.kind == "str" else values.extreme(min)
+
+    if isinstance(data, Iterator) and column is not None:  # A stream such as mini_load_csv_yield, read it once
+        return mini_aggregate({"Data": data, "Aggregates": [{"Function": "min", "Column": column}]})[0]["Result"]
+    if MINI_BACKEND == "numpy" and isinstance(data, list):
+        values = data if column is None else [record[column] for record in data]
+        used, result = mini_numeric_extreme(values, min)
+        if used:
+            return result
+
+    min_value = float("inf")
+
+    for value in data if column is None else (record[column] for record in data):
+        if value not in MINI_MISSING and isinstance(value, (int, float)):
+            if value < min_value:
+                min_value = value
+
+    return min_value if min_value != float("inf") else None
+
+
+@mini_instrumented
+def mini_stats(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Takes a dictionary with 'Data', 'Column', and 'Function' keys and returns a dictionary with the result of the specified function ('max' or 'min') applied to the specified column.
+
+    Args:
+        input_dict (dict): A dictionary containing the data, column, and function to apply.
+            Must contain 'Data', 'Column', and 'Function' keys.
+
+    Returns:
+        dict: A dictionary with the function name, column, and result.
+
+    Raises:
+        ValueError: If 'Data', 'Column' and 'Function' are not included as columns.
+
+    Example:
+        mini_stats{"Data": sleep_data, "Column": "Age", "Function": "max"}
+        {'Function': 'max', 'Column': 'Age', 'Result': 65}
+    """
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+    mini_validate_input_dict(input_dict, ["Data", "Column", "Function"])
+    output_dict = {
+        "Function": input_dict.get("Function"),
+        "Column": column,
+    }
+    if input_dict.get("Function") == "max":
+        output_dict["Result"] = mini_max(data, column)
+    elif input_dict.get("Function") == "min":
+        output_dict["Result"] = mini_min(data, column)
+
+    return output_dict
+
+
+@mini_instrumented
+def mini_bubble_sort(
+    data: list[dict[str, Any]], column: str, inplace: bool = True
+) -> dict[str, Any]:
+    """
+    Sorts the values of a specified column in a list of dictionaries.
+
+    The name is kept for existing callers; the sort itself is now the stable O(n log n) mini_sort.
+
+    Args:
+        data (list[dict[str, Any]]): A list of dictionaries where each dictionary represents a record.
+        column (str): The column name to sort values by.
+        inplace (bool): If True sorts the data in place, if False returns the sorted list of values
+            and leaves the data as it was.
+
+    Returns:
+        dict[str, Any]: A dictionary containing the column name and the sorted list of values.
+
+    Raises:
+        ValueError: If the column contains non-numeric values.
+
+    Example:
+        mini_bubble_sort([{'person': 'Alice', 'DailySteps': 200}, {'person': 'Bob', 'DailySteps': 300}], 'DailySteps')
+        {'Column': 'DailySteps','Sorted data': [{'person': 'Alice', 'DailySteps': 200}, {'person': 'Bob', 'DailySteps': 300}]}
+    """
+    if isinstance(data, MiniTable) and data.column(column).kind in ("int", "float"):
+        numeric = data.column(column).valid is None
+    else:
+        numeric = all(isinstance(record[column], (int, float)) for record in data)
+    if not numeric:
+        raise ValueError(f"Column '{column}' does not contain numeric values.")
+
+    sorted_data = mini_sort(data, column, inplace=inplace)["Sorted data"]
+    if not inplace:
+        sorted_data = [
+            record[column] for record in sorted_data if column in record
+        ]  # Sorted list of values
+
+    return {"Column": column, "Sorted data": sorted_data}
+
+
+class MiniDescending:
+    """Wraps a value so that it sorts in reverse, used for descending keys in a mixed direction sort."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "MiniDescending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MiniDescending) and self.value == other.value
+
+
+def mini_sort_keys(keys: str | list[str | tuple[str, str]]) -> list[tuple[str, bool]]:
+    """
+    Normalises sort keys to a list of (column, descending) pairs.
+
+    Example:
+        mini_sort_keys(["Occupation", ("Daily Steps", "desc")])
+        [('Occupation', False), ('Daily Steps', True)]
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+    normalised = []
+    for key in keys:
+        column, order = (key, "asc") if isinstance(key, str) else key
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Sort order must be 'asc' or 'desc', not '{order}'.")
+        normalised.append((column, order == "desc"))
+    return normalised
+
+
+@mini_instrumented
+def mini_sort(
+    data: list[dict[str, Any]] | MiniTable,
+    keys: str | list[str | tuple[str, str]],
+    nulls: str = "last",
+    top_k: int = None,
+    inplace: bool = False,
+) -> dict[str, Any]:
+    """
+    Sorts records by one or more columns with a stable O(n log n) sort.
+
+    Each key can be ascending or descending. Missing values (None, "" and "None") go first or last
+    whatever the direction. Records that compare equal keep their original order. With top_k only
+    the first k records are kept, found with a heap in O(n log k) without sorting everything.
+    A MiniTable is sorted by computing the row order (an argsort) from its column buffers.
+
+    Args:
+        data (list[dict] | MiniTable): The records to sort.
+        keys (str | list): A column name, or a list of column names and (column, 'asc' | 'desc') pairs.
+            The first key is the most significant.
+        nulls (str): 'last' (default) or 'first'.
+        top_k (int): If given, only return the first top_k records.
+        inplace (bool): If True, sort data itself (ignored when top_k is given).
+
+    Returns:
+        dict[str, Any]: 'Column' (the key column, or list of columns) and 'Sorted data'.
+
+    Raises:
+        ValueError: If nulls or an order is not recognised, or a column mixes values that cannot be compared.
+
+    Example:
+        mini_sort(sleep_data, [("Quality of Sleep", "desc"), "Daily Steps"], top_k=2)
+        {'Column': ['Quality of Sleep', 'Daily Steps'], 'Sorted data': [{'Person ID': 277, ...}, {'Person ID': 278, ...}]}
+    """
+    if nulls not in ("first", "last"):
+        raise ValueError(f"nulls must be 'first' or 'last', not '{nulls}'.")
+    sort_keys = mini_sort_keys(keys)
+    columns = keys if isinstance(keys, str) else [column for column, _ in sort_keys]
+    table = data if isinstance(data, MiniTable) else None
+
+    try:
+        if top_k is not None and table is None and len({descending for _, descending in sort_keys}) == 1:
+            # One direction needs no MiniDescending wrappers: nlargest keeps ties in order like a reverse sort
+            descending = sort_keys[0][1]
+            record_keys = [mini_record_sort_key(column, descending, nulls) for column, _ in sort_keys]
+            key = record_keys[0] if len(record_keys) == 1 else lambda record: tuple(get(record) for get in record_keys)
+            top = (heapq.nlargest if descending else heapq.nsmallest)(top_k, data, key=key)
+            return {"Column": columns, "Sorted data": top}
+        if top_k is not None:
+            rows = range(len(table)) if table is not None else data
+            key = mini_composite_sort_key(table, sort_keys, nulls)
+            top = heapq.nsmallest(top_k, rows, key=key)
+            return {"Column": columns, "Sorted data": table.take(top) if table is not None else top}
+
+        if table is not None:
+            order = list(range(len(table)))
+            for column, descending in reversed(sort_keys):
+                order.sort(key=mini_column_sort_keys(table.column(column), descending, nulls).__getitem__, reverse=descending)
+            if not inplace:
+                return {"Column": columns, "Sorted data": table.take(order)}
+            table.columns = table.take(order).columns
+            table.indexes.clear()
+            return {"Column": columns, "Sorted data": table}
+
+        records = data if inplace else list(data)
+        for column, descending in reversed(sort_keys):  # Least significant key first, each pass is stable
+            records.sort(key=mini_record_sort_key(column, descending, nulls), reverse=descending)
+        return {"Column": columns, "Sorted data": records}
+    except TypeError as error:
+        raise ValueError(f"Sort columns {columns} mix values that cannot be compared: {error}") from error
+
+
+def mini_null_ranks(descending: bool, nulls: str) -> tuple[int, int]:
+    """Returns the (value, missing) ranks that put missing values first or last for a sort direction."""
+    missing = 1 if (nulls == "last") != descending else 0
+    return 1 - missing, missing
+
+
+def mini_record_sort_key(column: str, descending: bool, nulls: str) -> Callable:
+    """Returns the key function for one sort pass over records."""
+    value_rank, missing_rank = mini_null_ranks(descending, nulls)
+
+    def key(record: dict[str, Any]) -> tuple:
+        value = record[column]
+        return (missing_rank, 0) if value in MINI_MISSING else (value_rank, value)
+
+    return key
+
+
+def mini_column_sort_keys(column: MiniColumn, descending: bool, nulls: str) -> Any:
+    """Returns a sequence with the sort key of every row of a MiniTable column."""
+    if column.kind in ("int", "float") and column.valid is None:
+        return column.values  # The buffer itself is the key
+    if column.kind == "str" and not {"", "None"} & set(column.pool):
+        ranks = [0] * len(column.pool)
+        for rank, code in enumerate(sorted(range(len(column.pool)), key=column.pool.__getitem__)):
+            ranks[code] = rank
+        return array("l", map(ranks.__getitem__, column.values))
+    value_rank, missing_rank = mini_null_ranks(descending, nulls)
+    keys = []
+    for row in range(len(column)):
+        value = column.get(row)
+        keys.append((missing_rank, 0) if value in MINI_MISSING else (value_rank, value))
+    return keys
+
+
+def mini_composite_sort_key(table: MiniTable | None, sort_keys: list[tuple[str, bool]], nulls: str) -> Callable:
+    """Returns one key function covering every sort key, for the top_k heap (records, or row ids of a table)."""
+    missing_rank = 1 if nulls == "last" else 0
+    value_rank = 1 - missing_rank
+    getters = [table.column(column).get if table is not None else None for column, _ in sort_keys]
+
+    def key(item: Any) -> tuple:
+        parts = []
+        for (column, descending), get in zip(sort_keys, getters):
+            value = get(item) if get is not None else item[column]
+            if value in MINI_MISSING:
+                parts.append((missing_rank, 0))
+            else:
+                parts.append((value_rank, MiniDescending(value) if descending else value))
+        return tuple(parts)
+
+    return key
+
+
+@mini_instrumented
+def mini_value_exists(
+    sorted_data: list[int | float], value: int | float
+) -> dict[str, str | bool]:
+    """
+    Checks if a value exists in a list of data using binary search.
+
+    Args:
+        data (list[int, float]]): A list of dictionaries where each dictionary represents a record.
+        value (int or float): The value to check.
+
+    Returns:
+        dict: Of the value searched for and if it exists.
+
+    Example:
+        mini_value_exists([{'person': 'Alice', 'Daily Steps': 200}, {'person': 'Bob', 'Daily Steps': 300}], 200)
+        {"Value": 200, "Exists: True}
+    """
+    left = 0
+    right = mini_simple_len(sorted_data) - 1
+
+    while left <= right:
+        mid = (left + right) // 2
+        mid_value = sorted_data[mid]
+
+        if mid_value == value:
+            return {"Value": value, "Exists": True}
+        elif mid_value < value:
+            left = mid + 1
+        else:
+            right = mid - 1
+
+    return {"Value": value, "Exists": False}
+
+
+def mini_sorted_view(sorted_data: list[int | float] | MiniColumnIndex) -> tuple[Any, list[int] | None]:
+    """
+    Returns the sorted values to search and, for an index, the row id of each sorted value.
+
+    Raises:
+        ValueError: If an index has no sorted order because its column is not numeric.
+    """
+    if isinstance(sorted_data, MiniColumnIndex):
+        if sorted_data.sorted_values is None:
+            raise ValueError(f"Column '{sorted_data.column}' has no sorted index, it is not numeric.")
+        return sorted_data.sorted_values, sorted_data.sorted_rows
+    return sorted_data, None
+
+
+@mini_instrumented
+def mini_values_exist(
+    sorted_data: list[int | float] | MiniColumnIndex, values: list[int | float], positions: bool = True
+) -> dict[str, list]:
+    """
+    Checks a whole batch of values against a sorted column in one call using binary search.
+
+    The probes are visited in sorted order, so each search starts where the previous one ended.
+    Pass the sorted index from mini_build_index to reuse the order it already built and get row
+    ids back instead of positions in the sorted list.
+
+    Args:
+        sorted_data (list | MiniColumnIndex): Values sorted ascending, or an index on a numeric column.
+        values (list[int | float]): The values to look up, in any order.
+        positions (bool): If False, skip collecting the positions.
+
+    Returns:
+        dict: 'Values', and for each value in the same order 'Exists', 'Counts' (how many times it
+            appears) and 'Positions' (a range of positions in sorted_data, or the row ids for an index).
+
+    Example:
+        mini_values_exist(sorted_steps, [3500, 3600, 10000])
+        {'Values': [3500, 3600, 10000], 'Exists': [True, False, True], 'Counts': [3, 0, 36],
+         'Positions': [range(5, 8), range(8, 8), range(338, 374)]}
+    """
+    keys, rows = mini_sorted_view(sorted_data)
+    counts = [0] * len(values)
+    found = [None] * len(values)
+    lo = 0
+    for probe in sorted(range(len(values)), key=values.__getitem__):
+        value = values[probe]
+        lo = bisect_left(keys, value, lo)
+        hi = bisect_right(keys, value, lo)
+        counts[probe] = hi - lo
+        if positions:
+            found[probe] = range(lo, hi) if rows is None else rows[lo:hi]
+    output_dict = {"Values": values, "Exists": [count > 0 for count in counts], "Counts": counts}
+    if positions:
+        output_dict["Positions"] = found
+    return output_dict
+
+
+@mini_instrumented
+def mini_values_between(
+    sorted_data: list[int | float] | MiniColumnIndex, ranges: list[tuple[int | float, int | float]], positions: bool = True
+) -> dict[str, list]:
+    """
+    Counts the values of a sorted column inside each of a batch of [lo, hi) ranges.
+
+    Args:
+        sorted_data (list | MiniColumnIndex): Values sorted ascending, or an index on a numeric column.
+        ranges (list[tuple]): (lo, hi) pairs; lo is included and hi is not.
+        positions (bool): If False, skip collecting the positions.
+
+    Returns:
+        dict: 'Ranges', and for each range in the same order 'Counts' and 'Positions' (a range of
+            positions in sorted_data, or the row ids for an index).
+
+    Example:
+        mini_values_between(sorted_steps, [(3000, 4000), (10000, 20000)])
+        {'Ranges': [(3000, 4000), (10000, 20000)], 'Counts': [10, 36], 'Positions': [range(0, 10), range(338, 374)]}
+    """
+    keys, rows = mini_sorted_view(sorted_data)
+    counts = []
+    found = []
+    for lo_value, hi_value in ranges:
+        lo = bisect_left(keys, lo_value)
+        hi = max(lo, bisect_left(keys, hi_value, lo))
+        counts.append(hi - lo)
+        if positions:
+            found.append(range(lo, hi) if rows is None else rows[lo:hi])
+    output_dict = {"Ranges": ranges, "Counts": counts}
+    if positions:
+        output_dict["Positions"] = found
+    return output_dict
+
+
+def mini_percentile(ordered: list[int | float], percent: float) -> float:
+    """Returns a percentile of sorted values, interpolating between the two nearest like NumPy's default."""
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return float(ordered[lower] + (position - lower) * (ordered[upper] - ordered[lower]))
+
+
+def mini_histogram_edges(low: int | float, high: int | float, bins: int) -> list[float]:
+    """Returns bins + 1 evenly spaced edges from low to high, widened by 0.5 each side if they are equal."""
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return [low + (high - low) * i / bins for i in range(bins)] + [high]
+
+
+@mini_instrumented
+def mini_column_summary(input_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Summarises a numeric column in one call: count, missing, sum, mean, standard deviation, min, max,
+    percentiles and a histogram.
+
+    With NumPy installed the whole column is worked on as one array (a MiniTable column is used in
+    place, without copying); otherwise the same results are worked out in pure Python. Values are
+    rounded to 2 places like mini_average, and Min and Max are returned as stored like mini_max.
+
+    Args:
+        input_dict (dict): A dictionary containing the data and the column. Must contain 'Data' and
+            'Column' keys. 'Percentiles' (default [25, 50, 75]) and 'Bins' (default 10, the number
+            of histogram bins) are optional.
+
+    Returns:
+        dict[str, Any]: 'Exists', 'Column', 'Count', 'NumMissing', 'Sum', 'Mean', 'Std' (sample),
+            'Min', 'Max', 'Percentiles' ({percent: value}) and 'Histogram' ({'Edges', 'Counts'}, the
+            last bin includes its right edge).
+
+    Raises:
+        ValueError: If 'Data' or 'Column' is not provided, the column is not numeric, 'Bins' is less
+            than 1 or a percentile is outside 0 to 100.
+
+    Example:
+        mini_column_summary({"Data": sleep_data, "Column": "Heart Rate", "Bins": 3})
+        {'Exists': True, 'Column': 'Heart Rate', 'Count': 374, 'NumMissing': 0, 'Sum': 26242, 'Mean': 70.17,
+         'Std': 4.14, 'Min': 65, 'Max': 86, 'Percentiles': {25: 68.0, 50: 70.0, 75: 72.0},
+         'Histogram': {'Edges': [65.0, 72.0, 79.0, 86.0], 'Counts': [241, 118, 15]}}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column"])
+    data = input_dict["Data"]
+    column = input_dict["Column"]
+    percentiles = list(input_dict.get("Percentiles", [25, 50, 75]))
+    bins = input_dict.get("Bins", 10)
+    if bins < 1 or any(not 0 <= percent <= 100 for percent in percentiles):
+        raise ValueError("'Bins' must be at least 1 and 'Percentiles' between 0 and 100.")
+
+    numbers = present = None
+    if isinstance(data, MiniTable):
+        if column not in data.columns:
+            return {"Exists": False, "Column": column}
+        values = data.column(column)
+        if values.kind in ("int", "float"):
+            missing = values.num_missing()
+            if MINI_BACKEND == "numpy":
+                numbers = values.to_numpy().compressed()
+            else:
+                present = [values.get(row) for row in range(len(values)) if values.valid is None or values.valid[row]]
+        else:
+            values = [values.get(row) for row in range(len(values))]
+    else:
+        records = iter(data)
+        first = next(records, None)
+        if first is None or column not in first:
+            return {"Exists": False, "Column": column}
+        values = [record.get(column) for record in chain((first,), records)]
+
+    if numbers is None and present is None:
+        numeric = mini_numeric_array(values)
+        if numeric is not None:
+            numbers, present = numeric
+        else:
+            present = [value for value in values if value not in MINI_MISSING]
+            if not all(isinstance(value, (int, float)) for value in present):
+                raise ValueError(f"Column '{column}' does not contain numeric values.")
+        missing = len(values) - len(present)
+
+    count = len(numbers) if numbers is not None else len(present)
+    result = {"Exists": True, "Column": column, "Count": count, "NumMissing": missing}
+    if count == 0:
+        result.update({"Sum": 0, "Mean": None, "Std": None, "Min": None, "Max": None})
+        result.update({"Percentiles": {percent: None for percent in percentiles}, "Histogram": {"Edges": [], "Counts": []}})
+        return result
+
+    total = mini_array_sum(numbers) if numbers is not None else None
+    if numbers is not None and total is not None:
+        if isinstance(values, MiniColumn):
+            low, high = values.extreme(min), values.extreme(max)
+        else:
+            low, high = present[int(numbers.argmin())], present[int(numbers.argmax())]
+        std = float(numbers.std(ddof=1)) if count > 1 else None
+        points = np.percentile(numbers, percentiles).tolist()
+        edges = mini_histogram_edges(low, high, bins)
+        counts = np.histogram(numbers, bins=edges)[0].tolist()
+    else:
+        present = numbers.tolist() if present is None else present
+        total = sum(present)
+        low, high = min(present), max(present)
+        mean = total / count
+        std = (sum((value - mean) ** 2 for value in present) / (count - 1)) ** 0.5 if count > 1 else None
+        ordered = sorted(present)
+        points = [mini_percentile(ordered, percent) for percent in percentiles]
+        edges = mini_histogram_edges(low, high, bins)
+        counts = [0] * bins
+        for value in ordered:
+            counts[min(bisect_right(edges, value) - 1, bins - 1)] += 1
+
+    result.update(
+        {
+            "Sum": round(total, 2),
+            "Mean": round(total / count, 2),
+            "Std": round(std, 2) if std is not None else None,
+            "Min": low,
+            "Max": high,
+            "Percentiles": {percent: round(point, 2) for percent, point in zip(percentiles, points)},
+            "Histogram": {"Edges": [round(float(edge), 2) for edge in edges], "Counts": counts},
+        }
+    )
+    return result
+
+
+@mini_instrumented
+def mini_frequency_table(input_dict: dict[str, str]) -> dict:
+    """
+    Takes an input dictionary which contains the data and the column to check and returns a frequency table containing the number of times a value appears in the column.
+
+    Args:
+        input_dict (dict): Dictionary containing the data and column to check frequencies.
+
+    Returns:
+        dict: Containing the column and the frequencies of all occurences in that column.
+
+    Raises:
+        ValueError: If 'Data' and 'Column' are not in the input_dict.
+
+    Example:
+        mini_frequency_table({"Data": sleep_data, "Column": "Daily Steps"})
+        {'Daily Steps': {3000: 3, 3300: 2}
+    """
+    mini_validate_input_dict(input_dict, ["Data", "Column"])
+    data = input_dict.get("Data")
+    column = input_dict.get("Column")
+
+    if isinstance(data, MiniTable):
+        values = data.column(column)
+        if values.kind == "str" or (values.kind != "object" and values.valid is None):
+            return {column: values.frequencies()}
+
+    results = {}
+
     for record in data:
-        match = True
-        for column in columns:
-            if record[column] != input_dict[column]:
-                match = False
-                break
-        if match:  # If all conditions are met
-            count += 1
+        item = record[column]
+        if isinstance(item, str):
+            item = item.lower()
+        results[item] = results.get(item, 0) + 1
+
+    return {column: results}
+
+
+class MiniLenAggregate:
+    """Running state for a 'len' aggregate, the same output as mini_len."""
+
+    __slots__ = ("column", "missing")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.missing = 0
+
+    def add(self, value: Any) -> None:
+        if value in MINI_MISSING:
+            self.missing += 1
+
+    def absent(self) -> dict[str, Any]:
+        return {"Exists": False}
+
+    def result(self, total: int) -> dict[str, Any]:
+        return {"Exists": True, "Column": self.column, "NumRecords": total, "NumMissing": self.missing}
+
+
+class MiniCountAggregate:
+    """Running state for a 'count' or 'search' aggregate, the same output as mini_count and mini_search."""
+
+    __slots__ = ("column", "value", "target", "proportion", "count")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.value = spec.get("Value")
+        self.target = self.value.lower() if isinstance(self.value, str) else None
+        self.proportion = spec["Function"] == "count"
+        self.count = 0
+
+    def add(self, value: Any) -> None:
+        if isinstance(value, str):
+            if value.lower() == self.target:
+                self.count += 1
+        elif value == self.value:
+            self.count += 1
+
+    def absent(self) -> dict[str, Any]:
+        raise KeyError(self.column)
+
+    def result(self, total: int) -> dict[str, Any]:
+        output_dict = {"Exists": self.count > 0, "Column": self.column, "Value": self.value}
+        if self.proportion and self.count:
+            output_dict["Proportion"] = round(self.count / total, 2)
+        return output_dict
+
+
+class MiniAverageAggregate:
+    """Running state for an 'average' aggregate, the same output as mini_average."""
+
+    __slots__ = ("column", "total", "count")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: Any) -> None:
+        if value not in MINI_MISSING:
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"Column '{self.column}' does not contain numeric values.")
+            self.total += float(value)
+            self.count += 1
+
+    def absent(self) -> dict[str, Any]:
+        return {"Exists": False, "Column": self.column}
+
+    def result(self, total: int) -> dict[str, Any]:
+        average = round(self.total / self.count, 2) if self.count else 0
+        return {"Exists": True, "Column": self.column, "Average": average}
+
+
+class MiniExtremeAggregate:
+    """Running state for a 'max' or 'min' aggregate, the same output as mini_stats."""
+
+    __slots__ = ("column", "function", "best")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.function = spec["Function"]
+        self.best = None
+
+    def add(self, value: Any) -> None:
+        if value not in MINI_MISSING and isinstance(value, (int, float)):
+            if self.best is None or (value > self.best if self.function == "max" else value < self.best):
+                self.best = value
+
+    def absent(self) -> dict[str, Any]:
+        raise KeyError(self.column)
+
+    def result(self, total: int) -> dict[str, Any]:
+        return {"Function": self.function, "Column": self.column, "Result": self.best}
+
+
+class MiniFrequencyAggregate:
+    """Running state for a 'frequency' aggregate, the same output as mini_frequency_table."""
+
+    __slots__ = ("column", "results")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.results = {}
+
+    def add(self, value: Any) -> None:
+        if isinstance(value, str):
+            value = value.lower()
+        self.results[value] = self.results.get(value, 0) + 1
+
+    def absent(self) -> dict[str, Any]:
+        raise KeyError(self.column)
+
+    def result(self, total: int) -> dict[str, Any]:
+        return {self.column: self.results}
+
+
+class MiniRunningStats:
+    """
+    Constant memory running statistics for one numeric column.
+
+    Uses Welford's method, so the mean and variance stay accurate over very long streams, and keeps
+    the exact count, missing count, min and max. Two instances built over separate chunks can be
+    combined with merge.
+
+    Example:
+        stats = MiniRunningStats()
+        for value in [6.1, 6.2, 7.8]:
+            stats.add(value)
+        stats.result()
+        {'Count': 3, 'NumMissing': 0, 'Mean': 6.7, 'Variance': 0.91, 'Std': 0.95, 'Min': 6.1, 'Max': 7.8}
+    """
+
+    __slots__ = ("count", "missing", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: Any) -> None:
+        """
+        Adds one value; None, "" and "None" are counted as missing.
+
+        Raises:
+            ValueError: If the value is not numeric.
+        """
+        if value in MINI_MISSING:
+            self.missing += 1
+            return
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"Value '{value}' is not numeric.")
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "MiniRunningStats") -> "MiniRunningStats":
+        """Combines the statistics of another chunk into this one (Chan et al.) and returns self."""
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.mean += delta * other.count / total
+            self.count = total
+            self.min = other.min if self.min is None or other.min < self.min else self.min
+            self.max = other.max if self.max is None or other.max > self.max else self.max
+        self.missing += other.missing
+        return self
+
+    def result(self) -> dict[str, Any]:
+        """Returns the statistics, rounded to 2 places like mini_average; the variance is the sample variance."""
+        variance = self.m2 / (self.count - 1) if self.count > 1 else None
+        return {
+            "Count": self.count,
+            "NumMissing": self.missing,
+            "Mean": round(self.mean, 2) if self.count else None,
+            "Variance": round(variance, 2) if variance is not None else None,
+            "Std": round(variance**0.5, 2) if variance is not None else None,
+            "Min": self.min,
+            "Max": self.max,
+        }
+
+
+class MiniDescribeAggregate:
+    """Running state for a 'describe' aggregate, the same output as mini_describe."""
+
+    __slots__ = ("column", "stats")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.stats = MiniRunningStats()
+
+    def add(self, value: Any) -> None:
+        try:
+            self.stats.add(value)
+        except ValueError:
+            raise ValueError(f"Column '{self.column}' does not contain numeric values.") from None
+
+    def absent(self) -> dict[str, Any]:
+        return {"Exists": False, "Column": self.column}
+
+    def result(self, total: int) -> dict[str, Any]:
+        return {"Exists": True, "Column": self.column, "NumRecords": total, **self.stats.result()}
+
+
+def mini_sketch_key(value: Any) -> Any:
+    """Returns the value a sketch counts: strings lower cased like mini_frequency_table, whole floats as ints."""
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def mini_sketch_hash(key: Any) -> int:
+    """
+    Returns a 128 bit BLAKE2b hash of a sketch key.
+
+    Unlike hash() it is the same in every process and run, so sketches built by separate workers
+    or on different days can be merged. Text and numbers hash differently, so "7" and 7 are two values.
+    """
+    data = b"s" + key.encode("utf-8") if isinstance(key, str) else repr(key).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "little")
+
+
+class MiniHyperLogLog:
+    """
+    Approximate distinct count in fixed memory (HyperLogLog).
+
+    Each value is hashed; the first bits pick one of 2**precision registers and each register keeps
+    the longest run of leading zeros seen in the rest of the hash. The estimate is off by about
+    error (one standard deviation) whatever the number of rows, and the sketch takes 2**precision
+    bytes: 16 KiB for the default 1%. Values are counted like mini_frequency_table counts them.
+
+    Attributes:
+        precision (int): The number of hash bits that pick a register, from error.
+        registers (bytearray): One byte per register.
+
+    Raises:
+        ValueError: If error is not between 0.003 and 0.26.
+
+    Example:
+        distinct = MiniHyperLogLog(error=0.01)
+        for record in mini_load_csv_yield("datasets/health_activity_data.csv"):
+            distinct.add(record["Daily_Steps"])
+        distinct.count()
+        973
+    """
 
-    output_dict = {"Conditions": conditions, "Count": count}
-    return output_dict
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, error: float = 0.01):
+        if not 0.003 <= error <= 0.26:
+            raise ValueError("'Error' must be between 0.003 and 0.26 for a distinct count.")
+        self.precision = math.ceil(math.log2((1.04 / error) ** 2))
+        self.registers = bytearray(1 << self.precision)
+
+    @property
+    def error(self) -> float:
+        """The relative standard error of the estimate."""
+        return round(1.04 / math.sqrt(len(self.registers)), 4)
+
+    def add(self, value: Any) -> None:
+        """Adds one value; adding the same value again does not change the sketch."""
+        hashed = mini_sketch_hash(mini_sketch_key(value)) & 0xFFFFFFFFFFFFFFFF
+        index = hashed & (len(self.registers) - 1)
+        rank = 65 - self.precision - (hashed >> self.precision).bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "MiniHyperLogLog") -> "MiniHyperLogLog":
+        """
+        Combines the sketch of another chunk into this one and returns self.
+
+        Raises:
+            ValueError: If the sketches were made with a different error.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Only sketches made with the same 'Error' can be merged.")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Returns the estimated number of distinct values."""
+        registers = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(registers, 0.7213 / (1 + 1.079 / registers))
+        estimate = alpha * registers * registers / math.fsum(2.0**-rank for rank in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * registers and empty:
+            estimate = registers * math.log(registers / empty)  # Linear counting is better for few values
+        return round(estimate)
+
+
+class MiniCountMin:
+    """
+    Approximate frequencies and the k most frequent values in fixed memory (Count-Min sketch plus a heap).
+
+    Every value adds its count to one counter in each of depth rows of width counters, picked by
+    its hash; a value's estimate is its smallest counter, which is never too low and, with
+    probability confidence, too high by at most error times the number of values added. The k
+    values with the highest estimates are kept in a min-heap as they go past, so the heavy hitters
+    come out without keeping every distinct value like mini_frequency_table does.
+
+    Attributes:
+        k (int): The number of heavy hitters kept.
+        width (int): Counters per row, e / error.
+        depth (int): Rows, ln(1 / (1 - confidence)).
+        tables (list[array]): The counters.
+        total (int): The number of values added.
+        top (dict): The heavy hitter candidates and their estimates.
 
+    Raises:
+        ValueError: If k is less than 1, or error or confidence is not between 0 and 1.
 
-def mini_average(input_dict: dict[str, int | float]) -> dict[str, Any]:
+    Example:
+        top = MiniCountMin(k=3, error=0.001)
+        for record in mini_load_csv_yield("datasets/health_activity_data.csv"):
+            top.add(record["Age"])
+        top.result()
+        {79: 29, 75: 27, 77: 25}
     """
-    Calculates the mean of a specific column in the data. This only works for numerical values.
 
-    Args:
-        input_dict (dict): A dictionary containing the data and the column to calculate the mean for. Must contain 'Data' and 'Column' keys.
+    __slots__ = ("k", "width", "depth", "tables", "total", "top", "heap", "order")
+
+    def __init__(self, k: int = 10, error: float = 0.001, confidence: float = 0.99):
+        if k < 1 or not 0 < error < 1 or not 0 < confidence < 1:
+            raise ValueError("'K' must be at least 1 and 'Error' and 'Confidence' between 0 and 1.")
+        self.k = k
+        self.width = math.ceil(math.e / error)
+        self.depth = math.ceil(math.log(1 / (1 - confidence)))
+        self.tables = [array("q", [0]) * self.width for _ in range(self.depth)]
+        self.total = 0
+        self.top = {}
+        self.heap = []  # (estimate, order, key) per candidate; an estimate may be stale but never too high
+        self.order = 0
+
+    def positions(self, key: Any) -> list[int]:
+        """Returns the counter each row uses for a key, by double hashing one BLAKE2b digest."""
+        hashed = mini_sketch_hash(key)
+        first, step, width = hashed & 0xFFFFFFFFFFFFFFFF, (hashed >> 64) | 1, self.width
+        return [(first + row * step) % width for row in range(self.depth)]
+
+    def add(self, value: Any, count: int = 1) -> None:
+        """Adds count occurrences of a value."""
+        key = mini_sketch_key(value)
+        estimate = self.total + count
+        for table, position in zip(self.tables, self.positions(key)):
+            table[position] += count
+            if table[position] < estimate:
+                estimate = table[position]
+        self.total += count
+        self.offer(key, estimate)
+
+    def offer(self, key: Any, estimate: int) -> None:
+        """Keeps key among the heavy hitters if its estimate beats the smallest one."""
+        if key in self.top:
+            self.top[key] = estimate  # Its heap entry is refreshed when it reaches the top of the heap
+            return
+        if len(self.top) < self.k:
+            self.top[key] = estimate
+            self.push(estimate, key)
+            return
+        while self.top[self.heap[0][2]] != self.heap[0][0]:
+            _, _, stale = heapq.heappop(self.heap)
+            self.push(self.top[stale], stale)
+        lowest, _, lowest_key = self.heap[0]
+        if estimate > lowest:
+            heapq.heappop(self.heap)
+            del self.top[lowest_key]
+            self.top[key] = estimate
+            self.push(estimate, key)
+
+    def push(self, estimate: int, key: Any) -> None:
+        self.order += 1  # Breaks ties, so keys of different types are never compared
+        heapq.heappush(self.heap, (estimate, self.order, key))
+
+    def estimate(self, value: Any) -> int:
+        """Returns the estimated number of times a value was added."""
+        return min(table[position] for table, position in zip(self.tables, self.positions(mini_sketch_key(value))))
+
+    def merge(self, other: "MiniCountMin") -> "MiniCountMin":
+        """
+        Combines the sketch of another chunk into this one and returns self.
+
+        Raises:
+            ValueError: If the sketches were made with a different error or confidence.
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Only sketches made with the same 'Error' and 'Confidence' can be merged.")
+        for table, counts in zip(self.tables, other.tables):
+            for position, count in enumerate(counts):
+                if count:
+                    table[position] += count
+        self.total += other.total
+        candidates = {key: self.estimate(key) for key in chain(self.top, other.top)}
+        self.top, self.heap = {}, []
+        for key in heapq.nlargest(self.k, candidates, key=candidates.get):
+            self.top[key] = candidates[key]
+            self.push(candidates[key], key)
+        return self
+
+    def result(self) -> dict[Any, int]:
+        """Returns the heavy hitters and their estimated counts, most frequent first."""
+        return dict(sorted(self.top.items(), key=lambda item: item[1], reverse=True))
+
+
+class MiniTDigest:
+    """
+    Approximate percentiles in bounded memory (a merging t-digest).
 
-    Returns:
-        dict: Containing if the value exists and the average.
+    Values are gathered into at most about compression centroids (a mean and a weight each), kept
+    small near the ends of the distribution and larger in the middle, so the tails stay accurate.
+    New values wait in a buffer and are merged in sorted batches. Percentiles are interpolated
+    between centroids like mini_percentile interpolates between values, and are exact while every
+    centroid still holds a single value.
+
+    Attributes:
+        compression (int): Bounds the number of centroids; more is more accurate and larger.
+        means (list[float]): The centroid means, in order.
+        weights (list[int]): The number of values in each centroid.
+        count (int): The number of numeric values added.
+        missing (int): The number of missing values added.
 
     Raises:
-        ValueError: If 'Data' or 'Column' is not provided in the input dictionary.
-        ValueError: If the specified column does not contain numeric values.
+        ValueError: If compression is less than 10.
 
     Example:
-        mini_average({"Data": sleep_data, "Column": "Heart Rate"})
-        {"Exists": True, "Column": "Heart Rate", "Average": 69}
+        digest = MiniTDigest()
+        for record in mini_load_csv_yield("datasets/health_activity_data.csv"):
+            digest.add(record["BMI"])
+        digest.result([50, 99])
+        {'Count': 1000, 'NumMissing': 0, 'Min': 18.5, 'Max': 34.98, 'Percentiles': {50: 26.82, 99: 34.76}}
     """
-    mini_validate_input_dict(input_dict, ["Data", "Column"])
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
 
-    # Check if column exists in the first record (assuming data is non-empty)
-    if not data or column not in data[0]:
-        return {"Exists": False, "Column": column}
+    __slots__ = ("compression", "means", "weights", "buffer", "count", "missing", "min", "max")
+
+    def __init__(self, compression: int = 200):
+        if compression < 10:
+            raise ValueError("'Compression' must be at least 10.")
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.buffer = []
+        self.count = 0
+        self.missing = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: Any) -> None:
+        """
+        Adds one value; None, "" and "None" are counted as missing.
+
+        Raises:
+            ValueError: If the value is not numeric.
+        """
+        if value in MINI_MISSING:
+            self.missing += 1
+            return
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"Value '{value}' is not numeric.")
+        self.buffer.append(value)
+        if len(self.buffer) >= 5 * self.compression:
+            self.flush()
+
+    def flush(self) -> None:
+        """Merges the buffered values into the centroids."""
+        if self.buffer:
+            self.buffer.sort()
+            low, high = self.buffer[0], self.buffer[-1]
+            self.min = low if self.min is None or low < self.min else self.min
+            self.max = high if self.max is None or high > self.max else self.max
+            self.count += len(self.buffer)
+            self.compress(sorted(chain(zip(self.means, self.weights), zip(self.buffer, repeat(1)))))
+            self.buffer = []
+
+    def compress(self, points: list[tuple[float, int]]) -> None:
+        """Rebuilds the centroids from sorted (mean, weight) points, joining neighbours while they fit."""
+        total = sum(weight for _, weight in points)
+        scale = self.compression / (2 * math.pi)
+
+        def limit(done: float) -> float:  # The most weight a centroid starting after done may hold
+            k = scale * math.asin(2 * min(done / total, 1.0) - 1) + 1
+            return total * (math.sin(min(k / scale, math.pi / 2)) + 1) / 2
+
+        means, weights = [], []
+        mean, weight = points[0]
+        done, bound = 0, limit(0)
+        for point_mean, point_weight in islice(points, 1, None):
+            if done + weight + point_weight <= bound:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                done += weight
+                bound = limit(done)
+                mean, weight = point_mean, point_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def merge(self, other: "MiniTDigest") -> "MiniTDigest":
+        """Combines the digest of another chunk into this one and returns self."""
+        self.flush()
+        other.flush()
+        if other.count:
+            self.compress(sorted(chain(zip(self.means, self.weights), zip(other.means, other.weights))))
+            self.count += other.count
+            self.min = other.min if self.min is None or other.min < self.min else self.min
+            self.max = other.max if self.max is None or other.max > self.max else self.max
+        self.missing += other.missing
+        return self
+
+    def percentile(self, percent: float) -> float | None:
+        """Returns the estimated percentile (0 to 100), or None if no values were added."""
+        self.flush()
+        if not self.count:
+            return None
+        target = (self.count - 1) * percent / 100 + 0.5  # A value's centre, like mini_percentile's positions
+        previous_centre, previous_mean = 0.5, self.min
+        done = 0
+        for mean, weight in zip(self.means, self.weights):
+            centre = done + weight / 2
+            if target <= centre:
+                if centre == previous_centre:
+                    return float(mean)
+                return float(previous_mean + (target - previous_centre) * (mean - previous_mean) / (centre - previous_centre))
+            previous_centre, previous_mean = centre, mean
+            done += weight
+        end = self.count - 0.5
+        if end <= previous_centre:
+            return float(self.max)
+        return float(previous_mean + (target - previous_centre) * (self.max - previous_mean) / (end - previous_centre))
+
+    def result(self, percentiles: Iterable[float] = (25, 50, 75)) -> dict[str, Any]:
+        """Returns the count, missing count, min, max and the percentiles rounded to 2 places like mini_column_summary."""
+        self.flush()
+        return {
+            "Count": self.count,
+            "NumMissing": self.missing,
+            "Min": self.min,
+            "Max": self.max,
+            "Percentiles": {
+                percent: None if self.count == 0 else round(self.percentile(percent), 2) for percent in percentiles
+            },
+        }
 
-    total = 0.0
-    count = 0
-    for record in data:
-        value = record.get(column)
-        if value not in (None, "", "None"):
-            if not isinstance(value, (int, float)):
-                raise ValueError(f"Column '{column}' does not contain numeric values.")
-            total += float(value)
-            count += 1
 
-    if count == 0:
-        average = 0
-    else:
-        average = round(total / count, 2)
+class MiniSketchAggregate:
+    """Running state for an 'approx_distinct', 'approx_top_k' or 'approx_percentiles' aggregate."""
 
-    return {"Exists": True, "Column": column, "Average": average}
+    __slots__ = ("column", "function", "sketch", "percentiles")
 
+    def __init__(self, spec: dict[str, Any]):
+        self.column = spec["Column"]
+        self.function = spec["Function"]
+        self.percentiles = list(spec.get("Percentiles", [25, 50, 75]))
+        if self.function == "approx_distinct":
+            self.sketch = MiniHyperLogLog(spec.get("Error", 0.01))
+        elif self.function == "approx_top_k":
+            self.sketch = MiniCountMin(spec.get("K", 10), spec.get("Error", 0.001), spec.get("Confidence", 0.99))
+        else:
+            if any(not 0 <= percent <= 100 for percent in self.percentiles):
+                raise ValueError("'Percentiles' must be between 0 and 100.")
+            self.sketch = MiniTDigest(spec.get("Compression", 200))
 
-def mini_extract_metrics(input_dict: dict[str, Any]) -> dict[str, Any]:
+    def add(self, value: Any) -> None:
+        try:
+            self.sketch.add(value)
+        except ValueError:
+            raise ValueError(f"Column '{self.column}' does not contain numeric values.") from None
+
+    def absent(self) -> dict[str, Any]:
+        return {"Exists": False, "Column": self.column}
+
+    def result(self, total: int) -> dict[str, Any]:
+        if self.function == "approx_distinct":
+            return {"Exists": True, "Column": self.column, "NumRecords": total, "Distinct": self.sketch.count(), "Error": self.sketch.error}
+        if self.function == "approx_top_k":
+            return {self.column: self.sketch.result()}
+        return {"Exists": True, "Column": self.column, **self.sketch.result(self.percentiles)}
+
+
+MINI_AGGREGATES = {
+    "len": MiniLenAggregate,
+    "search": MiniCountAggregate,
+    "count": MiniCountAggregate,
+    "average": MiniAverageAggregate,
+    "max": MiniExtremeAggregate,
+    "min": MiniExtremeAggregate,
+    "frequency": MiniFrequencyAggregate,
+    "describe": MiniDescribeAggregate,
+    "approx_distinct": MiniSketchAggregate,
+    "approx_top_k": MiniSketchAggregate,
+    "approx_percentiles": MiniSketchAggregate,
+}
+
+
+@mini_instrumented
+def mini_aggregate(input_dict: dict[str, Any]) -> list[dict[str, Any]]:
     """
-    Takes specified columns and returns a list of dictionaries containing the values for those columns for records where the 'Occupation' is "Teacher".
+    Computes several aggregates over one or more columns in a single pass over the data.
+
+    Each aggregate gives exactly the dictionary its own function would return, so a dashboard that
+    calls mini_len, mini_average, mini_stats and mini_frequency_table one after another can ask for
+    all of them at once and scan the data only once. 'Data' can be any iterable, including the
+    generator from mini_load_csv_yield, and only the running state of each aggregate is kept.
 
     Args:
-        input_dict (dict[str, str]): A dictionary containing the data and the metrics to extract.
-        Must contain 'Data' and 'Metrics' keys.
+        input_dict (dict): A dictionary containing the data and the aggregates. Must contain 'Data'
+            and 'Aggregates' keys. Each aggregate is a dictionary with 'Function' (one of 'len',
+            'search', 'count', 'average', 'max', 'min', 'frequency', 'describe', 'approx_distinct',
+            'approx_top_k' or 'approx_percentiles'), 'Column' and, for 'search' and 'count', 'Value'.
+            The approximate aggregates use fixed memory however many rows stream past:
+            'approx_distinct' (MiniHyperLogLog, optional 'Error') gives 'Distinct', 'approx_top_k'
+            (MiniCountMin, optional 'K', 'Error' and 'Confidence') gives the heavy hitters in the
+            shape of mini_frequency_table, and 'approx_percentiles' (MiniTDigest, optional
+            'Percentiles' and 'Compression') gives 'Percentiles' like mini_column_summary.
 
-    Yields:
-        dict: A dictionary with the specified metrics and their values.
+    Returns:
+        list[dict[str, Any]]: The result of each aggregate, in the order they were asked for.
 
     Raises:
-        ValueError: If 'Data' is not provided in the input dictionary.
+        ValueError: If 'Data' or 'Aggregates' is not provided, or an aggregate is unknown.
+        ValueError: If an 'average', 'describe' or 'approx_percentiles' column does not contain numeric values.
 
     Example:
-        mini_extract_metrics({"Data": sleep_data, "Col1":"Person ID", "Col2":"Quality of Sleep", "Col3": "Physical Activity Level"})
-        {'Person ID': 262, 'Quality of Sleep': 7, 'Physical Activity Level': 45}
+        mini_aggregate({"Data": sleep_data, "Aggregates": [
+            {"Function": "len", "Column": "Heart Rate"},
+            {"Function": "average", "Column": "Heart Rate"},
+            {"Function": "max", "Column": "Heart Rate"},
+        ]})
+        [{'Exists': True, 'Column': 'Heart Rate', 'NumRecords': 374, 'NumMissing': 0},
+         {'Exists': True, 'Column': 'Heart Rate', 'Average': 70.17},
+         {'Function': 'max', 'Column': 'Heart Rate', 'Result': 86}]
     """
-    mini_validate_input_dict(input_dict, ["Data"])
+    mini_validate_input_dict(input_dict, ["Data", "Aggregates"])
     data = input_dict.get("Data")
-    columns = [v for k, v in input_dict.items() if k != "Data"]
-    for record in data:
-        if record.get("Occupation") == "Teacher":
-            result = {col: record.get(col, None) for col in columns}
-            yield result
+    specs = input_dict.get("Aggregates")
+    for spec in specs:
+        mini_validate_input_dict(spec, ["Function", "Column"])
+        if spec["Function"] not in MINI_AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{spec['Function']}', use one of {list(MINI_AGGREGATES)}.")
+
+    if isinstance(data, MiniTable):
+        # Every aggregate already runs over its column buffer, so there are no rows to share
+        return [mini_table_aggregate(data, spec) for spec in specs]
+
+    aggregates = [MINI_AGGREGATES[spec["Function"]](spec) for spec in specs]
+    if getattr(data, "indexes", None):
+        answered = {}
+        for position, aggregate in enumerate(aggregates):
+            index = mini_get_index(data, aggregate.column)
+            if isinstance(aggregate, MiniCountAggregate) and index is not None:
+                aggregate.count = index.count(aggregate.value)
+                answered[position] = aggregate.result(len(data))
+        if answered:
+            rest = [spec for position, spec in enumerate(specs) if position not in answered]
+            results = iter(mini_aggregate({"Data": data, "Aggregates": rest}) if rest else [])
+            return [answered[position] if position in answered else next(results) for position in range(len(specs))]
+
+    records = iter(data)
+    first = next(records, None)
+    if first is None:
+        no_rows = (MiniLenAggregate, MiniAverageAggregate, MiniDescribeAggregate)
+        return [aggregate.absent() if isinstance(aggregate, no_rows) else aggregate.result(0) for aggregate in aggregates]
+
+    by_column = {}
+    for aggregate in aggregates:
+        if aggregate.column in first:
+            by_column.setdefault(aggregate.column, []).append(aggregate.add)
+    groups = list(by_column.items())
+
+    total = 0
+    for record in chain([first], records):
+        total += 1
+        for column, adds in groups:
+            value = record[column]
+            for add in adds:
+                add(value)
 
+    return [aggregate.result(total) if aggregate.column in first else aggregate.absent() for aggregate in aggregates]
 
-def mini_max(data: list | dict, column: str = None) -> int | float:
+
+@mini_instrumented
+def mini_describe(input_dict: dict[str, Any]) -> dict[str, Any]:
     """
-    Function to find the max of either a list or a dictionary.
+    Summarises a numeric column in one pass and constant memory, so it works directly on a stream.
 
     Args:
-        data: Either list of dicts OR simple list of values
-        column: Column name (only needed for list of dicts)
+        input_dict (dict): A dictionary containing the data and the column. Must contain 'Data' and
+            'Column' keys. 'Data' can be a list, a MiniTable or any iterator of records.
 
     Returns:
-        int | float: the maximum value found.
+        dict[str, Any]: 'Exists', 'Column', 'NumRecords', 'Count' (numeric values), 'NumMissing',
+            'Mean', 'Variance' (sample), 'Std', 'Min' and 'Max'.
+
+    Raises:
+        ValueError: If 'Data' or 'Column' is not provided, or the column is not numeric.
 
     Example:
-        mini_max([1,2,3], None)
-        3
+        mini_describe({"Data": mini_load_csv_yield("datasets/health_activity_data.csv"), "Column": "BMI"})
+        {'Exists': True, 'Column': 'BMI', 'NumRecords': 1000, 'Count': 1000, 'NumMissing': 0, 'Mean': 26.73, ...}
     """
-    max_value = float("-inf")
+    mini_validate_input_dict(input_dict, ["Data", "Column"])
+    spec = {"Function": "describe", "Column": input_dict["Column"]}
+    return mini_aggregate({"Data": input_dict["Data"], "Aggregates": [spec]})[0]
 
-    if column is None:  # Simple list of values
-        for value in data:
-            if value not in [None, "", "None"] and isinstance(value, (int, float)):
-                if value > max_value:
-                    max_value = value
-    else:  # List of dictionaries
-        for record in data:
-            value = record[column]
-            if value not in [None, "", "None"] and isinstance(value, (int, float)):
-                if value > max_value:
-                    max_value = value
 
-    return max_value if max_value != float("-inf") else None
+MINI_GROUP_FUNCTIONS = ("count", "sum", "mean", "min", "max")
 
 
-def mini_min(data: list | dict, column=None) -> int | float:
+@mini_instrumented
+def mini_group_by(
+    data: Iterable[dict[str, Any]] | MiniTable,
+    keys: str | list[str],
+    aggregates: list[dict[str, Any]],
+) -> dict[str, Any]:
     """
-    Function to find the min of either a list or a dictionary.
+    Groups the records by one or more columns and works out count, sum, mean, min and max per group in one pass.
+
+    Each record is added to its group in a hash table, so every group is answered by the same scan
+    instead of one mini_count_match and mini_average call per group. Group values are compared like
+    mini_frequency_table counts them (strings ignoring case) and shown as first seen. Missing values
+    are skipped by the aggregates; 'mean' is rounded to 2 places and is 0 for no values like
+    mini_average, and 'min' and 'max' ignore anything that is not a number like mini_max.
 
     Args:
-        data: Either list of dicts OR simple list of values
-        column: Column name (only needed for list of dicts)
+        data (Iterable[dict] | MiniTable): A list of records, a MiniTable or a stream such as mini_load_csv_yield.
+        keys (str | list[str]): The column or columns to group by.
+        aggregates (list[dict]): Each a dictionary with 'Function' (one of 'count', 'sum', 'mean',
+            'min' or 'max') and 'Column'; a 'count' without 'Column' counts the records. An optional
+            'Name' sets the output key, otherwise it is e.g. 'Mean Sleep Duration' or 'Count'.
 
     Returns:
-        int | float: the minimum value found.
+        dict[str, Any]: 'Keys' and 'Groups', one dictionary per group in first seen order holding
+            the key columns and the aggregates.
+
+    Raises:
+        ValueError: If an aggregate is unknown, a column is not in the data, or a 'sum' or 'mean'
+            column holds text.
 
     Example:
-        mini_min([1,2,3], None)
-        1
+        mini_group_by(sleep_data, "Occupation", [{"Function": "count"}, {"Function": "mean", "Column": "Sleep Duration"}])
+        {'Keys': ['Occupation'], 'Groups': [{'Occupation': 'Software Engineer', 'Count': 4, 'Mean Sleep Duration': 6.75}, ...]}
     """
-    min_value = float("inf")
-
-    if column is None:
-        # Simple list of values
-        for value in data:
-            if value not in [None, "", "None"] and isinstance(value, (int, float)):
-                if value < min_value:
-                    min_value = value
-    else:
-        # List of dictionaries
-        for record in data:
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    specs = []
+    for spec in aggregates:
+        function, column = spec.get("Function"), spec.get("Column")
+        if function not in MINI_GROUP_FUNCTIONS or (column is None and function != "count"):
+            raise ValueError(f"Unknown aggregate {spec}, use one of {list(MINI_GROUP_FUNCTIONS)} with a 'Column'.")
+        default = "Count" if column is None else f"{function.title()} {column}"
+        specs.append((function, column, spec.get("Name", default)))
+
+    records = iter(data)
+    first = next(records, None)
+    if first is None:
+        return {"Keys": keys, "Groups": []}
+    absent = [column for column in keys + [spec[1] for spec in specs if spec[1] is not None] if column not in first]
+    if absent:
+        raise ValueError(f"Columns not in the data: {absent}")
+
+    single = keys[0] if len(keys) == 1 else None
+    groups = {}  # Folded key -> [key values, record count, one state list per aggregate]
+    for record in chain((first,), records):
+        if single is not None:
+            value = record[single]
+            key = value.lower() if isinstance(value, str) else value
+        else:
+            key = tuple(mini_fold_key(record[column]) for column in keys)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = [[record[column] for column in keys], 0] + [[0, None] for _ in specs]
+        group[1] += 1
+        for state, (function, column, _) in zip(islice(group, 2, None), specs):
+            if column is None:
+                continue
             value = record[column]
-            if value not in [None, "", "None"] and isinstance(value, (int, float)):
-                if value < min_value:
-                    min_value = value
-
-    return min_value if min_value != float("inf") else None
+            if value in MINI_MISSING:
+                continue
+            if function in ("min", "max"):
+                if isinstance(value, (int, float)) and (
+                    state[1] is None or (value > state[1] if function == "max" else value < state[1])
+                ):
+                    state[1] = value
+                continue
+            if function != "count":
+                if not isinstance(value, (int, float)):
+                    raise ValueError(f"Column '{column}' does not contain numeric values.")
+                state[1] = (0.0 if function == "mean" else 0) + value if state[1] is None else state[1] + value
+            state[0] += 1
+
+    results = []
+    for group in groups.values():
+        row = dict(zip(keys, group[0]))
+        for state, (function, column, name) in zip(islice(group, 2, None), specs):
+            if function == "count":
+                row[name] = group[1] if column is None else state[0]
+            elif function == "mean":
+                row[name] = round(state[1] / state[0], 2) if state[0] else 0
+            elif function == "sum":
+                row[name] = round(state[1], 2) if state[1] is not None else 0
+            else:
+                row[name] = state[1]
+        results.append(row)
+    return {"Keys": keys, "Groups": results}
+
+
+def mini_join_key(record: Mapping[str, Any], columns: list[str]) -> Any:
+    """Returns the join key of a record (a tuple for several columns), or None if any part is missing."""
+    if len(columns) == 1:
+        value = record.get(columns[0])
+        return None if value in MINI_MISSING else value
+    values = tuple(record.get(column) for column in columns)
+    return None if any(value in MINI_MISSING for value in values) else values
+
+
+def mini_spill_rows(filename: str) -> Iterator[dict[str, Any]]:
+    """Yields the records pickled one after another into a partition file by mini_join."""
+    with open(filename, mode="rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+@mini_instrumented
+def mini_join(
+    left: Iterable[dict[str, Any]] | MiniTable,
+    right: Iterable[dict[str, Any]] | MiniTable,
+    on: str | tuple[str, str] | list[str | tuple[str, str]],
+    how: str = "inner",
+    suffixes: tuple[str, str] = ("_left", "_right"),
+    max_build_rows: int | None = None,
+    partitions: int = 16,
+    spill_dir: str | None = None,
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Joins two sets of records on equal key values with a hash join.
 
+    The smaller side is loaded into a hash table of key -> records and the other side is streamed
+    through it, so each record is looked at once instead of comparing every pair. When only one side
+    has a length (the other is a stream such as mini_load_csv_yield) the table is built on that side.
+    If the build side has more than `max_build_rows` records, both sides are split by key into
+    `partitions` temporary files and joined one partition at a time, so only about 1/partitions of
+    the build side is in memory at once.
 
-def mini_stats(input_dict: dict[str, Any]) -> dict[str, Any]:
-    """
-    Takes a dictionary with 'Data', 'Column', and 'Function' keys and returns a dictionary with the result of the specified function ('max' or 'min') applied to the specified column.
+    Keys are compared exactly and a missing key (None, "" or "None") never matches. Columns found on
+    both sides, other than a key with the same name, get the suffixes. A left join keeps every left
+    record, with None for the right columns when nothing matched. Records come out in the order of
+    the streamed side, then unmatched left records when the table was built on the left; with
+    spilling, partition by partition.
 
     Args:
-        input_dict (dict): A dictionary containing the data, column, and function to apply.
-            Must contain 'Data', 'Column', and 'Function' keys.
+        left (Iterable[dict] | MiniTable): The left records.
+        right (Iterable[dict] | MiniTable): The right records.
+        on (str | tuple | list): The key column if it has the same name on both sides, a
+            (left column, right column) pair, or a list of these for a key of several columns.
+        how (str, optional): 'inner' or 'left'. Defaults to "inner".
+        suffixes (tuple[str, str], optional): Added to clashing left and right column names. Defaults to ("_left", "_right").
+        max_build_rows (int | None, optional): The most build records kept in memory before spilling
+            to disk. Defaults to None (never spill).
+        partitions (int, optional): The number of partition files when spilling. Defaults to 16.
+        spill_dir (str | None, optional): Where to put the partition files. Defaults to the system temp directory.
 
-    Returns:
-        dict: A dictionary with the function name, column, and result.
+    Yields:
+        dict: One merged record per matching pair (and per unmatched left record for a left join).
 
     Raises:
-        ValueError: If 'Data', 'Column' and 'Function' are not included as columns.
+        ValueError: If how is not 'inner' or 'left', or a key column is not in the data.
 
     Example:
-        mini_stats{"Data": sleep_data, "Column": "Age", "Function": "max"}
-        {'Function': 'max', 'Column': 'Age', 'Result': 65}
+        joined = list(mini_join(sleep_data, health_data, ("Person ID", "ID")))
+        joined[0]
+        {'Person ID': 1, 'Gender_left': 'Male', 'Age_left': 27, ..., 'ID': 1, 'Age_right': 56, 'Gender_right': 'Male', ...}
     """
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
-    mini_validate_input_dict(input_dict, ["Data", "Column", "Function"])
-    output_dict = {
-        "Function": input_dict.get("Function"),
-        "Column": column,
-    }
-    if input_dict.get("Function") == "max":
-        output_dict["Result"] = mini_max(data, column)
-    elif input_dict.get("Function") == "min":
-        output_dict["Result"] = mini_min(data, column)
+    if how not in ("inner", "left"):
+        raise ValueError(f"Join type must be 'inner' or 'left', not '{how}'.")
+    pairs = [(key, key) if isinstance(key, str) else tuple(key) for key in ([on] if isinstance(on, (str, tuple)) else on)]
+    left_keys, right_keys = [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+
+    left_rows, right_rows = iter(left), iter(right)
+    left_first, right_first = next(left_rows, None), next(right_rows, None)
+    if left_first is None or (right_first is None and how == "inner"):
+        return
+    absent = [key for key in left_keys if key not in left_first]
+    absent += [key for key in right_keys if right_first is not None and key not in right_first]
+    if absent:
+        raise ValueError(f"Join columns not in the data: {absent}")
+    left_rows, right_rows = chain((left_first,), left_rows), chain(() if right_first is None else (right_first,), right_rows)
+
+    shared = {left_key for left_key, right_key in pairs if left_key == right_key}
+    left_columns = list(left_first)
+    right_columns = [column for column in (right_first or ()) if column not in shared]
+    clash = set(left_columns) & set(right_columns)
+    left_names = [(column, column + suffixes[0] if column in clash else column) for column in left_columns]
+    right_names = [(column, column + suffixes[1] if column in clash else column) for column in right_columns]
+
+    def merge(left_record: Mapping[str, Any], right_record: Mapping[str, Any] | None) -> dict[str, Any]:
+        row = {name: left_record.get(column) for column, name in left_names}
+        for column, name in right_names:
+            row[name] = None if right_record is None else right_record.get(column)
+        return row
+
+    try:
+        build_left = len(left) < len(right)
+    except TypeError:  # A stream has no length, build on the side that has one
+        build_left = hasattr(left, "__len__") and not hasattr(right, "__len__")
+    build_rows, probe_rows = (left_rows, right_rows) if build_left else (right_rows, left_rows)
+    build_keys, probe_keys = (left_keys, right_keys) if build_left else (right_keys, left_keys)
+    keep_left = how == "left"
+
+    def hash_join(build: Iterable[Mapping[str, Any]], probe: Iterable[Mapping[str, Any]]) -> Iterator[dict[str, Any]]:
+        table = {}
+        unkeyed = []  # Left records with a missing key, which a left join still returns
+        for record in build:
+            key = mini_join_key(record, build_keys)
+            if key is not None:
+                table.setdefault(key, []).append(record)
+            elif build_left and keep_left:
+                unkeyed.append(record)
+        matched = set()
+        for record in probe:
+            key = mini_join_key(record, probe_keys)
+            matches = table.get(key) if key is not None else None
+            if matches:
+                if build_left:
+                    matched.add(key)
+                    for match in matches:
+                        yield merge(match, record)
+                else:
+                    for match in matches:
+                        yield merge(record, match)
+            elif keep_left and not build_left:
+                yield merge(record, None)
+        if keep_left and build_left:
+            for key, records in table.items():
+                if key not in matched:
+                    for record in records:
+                        yield merge(record, None)
+            for record in unkeyed:
+                yield merge(record, None)
+
+    if max_build_rows is None:
+        yield from hash_join(build_rows, probe_rows)
+        return
+    head = list(islice(build_rows, max_build_rows + 1))
+    if len(head) <= max_build_rows:
+        yield from hash_join(head, probe_rows)
+        return
 
+    # Too big for memory: partition both sides by key so matching records land in the same file
+    with tempfile.TemporaryDirectory(prefix="minijoin_", dir=spill_dir) as folder:
+        names = {
+            side: [os.path.join(folder, f"{side}_{part}.pkl") for part in range(partitions)] for side in ("build", "probe")
+        }
+        for side, records, keys in (("build", chain(head, build_rows), build_keys), ("probe", probe_rows, probe_keys)):
+            files = [open(name, mode="wb") for name in names[side]]
+            try:
+                for record in records:
+                    key = mini_join_key(record, keys)
+                    part = 0 if key is None else hash(key) % partitions
+                    pickle.dump(dict(record), files[part], protocol=pickle.HIGHEST_PROTOCOL)
+            finally:
+                for file in files:
+                    file.close()
+        del head
+        for build_name, probe_name in zip(names["build"], names["probe"]):
+            yield from hash_join(mini_spill_rows(build_name), mini_spill_rows(probe_name))
+
+
+def mini_table_aggregate(table: MiniTable, spec: dict[str, Any]) -> dict[str, Any]:
+    """Runs one mini_aggregate aggregate on a MiniTable column with the matching mini_* function."""
+    function = spec["Function"]
+    if function == "describe":
+        column = table.column(spec["Column"]) if spec["Column"] in table.columns else None
+        if column is None:
+            return {"Exists": False, "Column": spec["Column"]}
+        aggregate = MiniDescribeAggregate(spec)
+        for value in column.present() if column.kind in ("int", "float") else map(column.get, range(len(table))):
+            aggregate.add(value)
+        aggregate.stats.missing += column.num_missing() if column.kind in ("int", "float") else 0
+        return aggregate.result(len(table))
+    if MINI_AGGREGATES[function] is MiniSketchAggregate:
+        if spec["Column"] not in table.columns:
+            return {"Exists": False, "Column": spec["Column"]}
+        aggregate = MiniSketchAggregate(spec)
+        column = table.column(spec["Column"])
+        for value in map(column.get, range(len(table))):
+            aggregate.add(value)
+        return aggregate.result(len(table))
+    if function in ("search", "count") and mini_get_index(table, spec["Column"]) is not None:
+        aggregate = MiniCountAggregate(spec)
+        aggregate.count = mini_get_index(table, spec["Column"]).count(aggregate.value)
+        return aggregate.result(len(table))
+    input_dict = {"Data": table, "Column": spec["Column"]}
+    if function == "len":
+        return mini_len(input_dict)
+    if function == "average":
+        return mini_average(input_dict)
+    if function in ("max", "min"):
+        return mini_stats({**input_dict, "Function": function})
+    if function == "frequency":
+        return mini_frequency_table(input_dict)
+    count = table.column(spec["Column"]).count_value(spec.get("Value"))
+    output_dict = {"Exists": count > 0, "Column": spec["Column"], "Value": spec.get("Value")}
+    if function == "count" and count:
+        output_dict["Proportion"] = round(count / len(table), 2)
     return output_dict
 
 
-def mini_bubble_sort(
-    data: list[dict[str, Any]], column: str, inplace: bool = True
-) -> dict[str, Any]:
+class MiniQuery:
     """
-    Sorts the values of a specified column in a list of dictionaries using bubble sort.
+    A lazy query over a CSV file or loaded data, only run when its results are asked for.
+
+    where, select, sort, limit, aggregate and group_by each return a new MiniQuery with one more
+    step, so a query can be built up in pieces and reused. Before it runs the steps are planned:
+    filters ahead of any limit are pushed into the scan (the indexes or column masks of loaded data,
+    or the loader for a file), a file or stream is narrowed to the columns later steps use as it is
+    read (loaded records are only copied for the output), a sort followed by a limit becomes a top-k
+    heap, back to back sorts become one, and aggregates asked for one after another share a single
+    pass. Records flow from step to step without intermediate lists, except for a full sort.
+    explain() shows the plan that was chosen.
 
     Args:
-        data (list[dict[str, Any]]): A list of dictionaries where each dictionary represents a record.
-        column (str): The column name to sort values by.
-        inplace (bool): If True sorts the data in place, if False returns the sorted list of data.
+        source (str | Iterable[dict] | MiniTable): A CSV file name, a list of records, a MiniTable
+            or a stream such as mini_load_csv_yield. A stream can only be run once.
+        schema (dict | str, optional): Column types for a CSV file (see mini_load_csv_yield). Defaults to None.
 
-    Returns:
-        dict[str, Any]: A dictionary containing the column name and the sorted list of values.
+    Example:
+        query = (MiniQuery("datasets/sleep_health_and_lifestyle_data.csv")
+                 .where(("Occupation", "=", "Teacher"))
+                 .select("Person ID", "Daily Steps", "Sleep Duration")
+                 .sort([("Daily Steps", "desc")])
+                 .limit(3))
+        print(query.explain())
+        1. Scan 'datasets/sleep_health_and_lifestyle_data.csv' where Occupation = 'Teacher' keeping Person ID, Daily Steps, Sleep Duration
+        2. Top 3 by Daily Steps desc
+        query.collect()
+        [{'Person ID': 99, 'Daily Steps': 7000, 'Sleep Duration': 7.1}, ...]
+    """
 
-    Raises:
-        ValueError: If the column contains non-numeric values.
+    def __init__(self, source: str | Iterable[dict[str, Any]] | MiniTable, schema: dict[str, str] | str = None):
+        self.source = source
+        self.schema = schema
+        self.steps = []
+        self.columns = None  # The columns records have after the last select, None for all of them
+
+    def add(self, step: tuple, used: Iterable[str] = ()) -> "MiniQuery":
+        """Returns a copy of the query with one more step, after checking it can follow the others."""
+        if self.steps and self.steps[-1][0] in ("aggregate", "group_by") and not (
+            step[0] == "aggregate" == self.steps[-1][0]
+        ):
+            raise ValueError(f"Nothing can follow {self.steps[-1][0]}, it must be the last step.")
+        dropped = [column for column in used if self.columns is not None and column not in self.columns]
+        if dropped:
+            raise ValueError(f"Columns {dropped} were not selected.")
+        query = MiniQuery(self.source, self.schema)
+        query.steps = self.steps + [step]
+        query.columns = self.columns
+        return query
+
+    def where(self, predicate: Any) -> "MiniQuery":
+        """Keeps the records that match a predicate (see mini_compile_predicate)."""
+        node = mini_normalize_predicate(predicate)  # Checked now rather than when the query runs
+        return self.add(("where", predicate), mini_predicate_columns(node))
+
+    def select(self, *columns: str) -> "MiniQuery":
+        """Keeps only these columns, in this order. They can also be given as one list."""
+        columns = list(columns[0]) if len(columns) == 1 and not isinstance(columns[0], str) else list(columns)
+        if not columns:
+            raise ValueError("select needs at least one column.")
+        query = self.add(("select", columns), columns)
+        query.columns = columns
+        return query
+
+    def sort(self, keys: str | list[str | tuple[str, str]], nulls: str = "last") -> "MiniQuery":
+        """Sorts the records like mini_sort, by one or more columns, each 'asc' or 'desc'."""
+        if nulls not in ("first", "last"):
+            raise ValueError(f"nulls must be 'first' or 'last', not '{nulls}'.")
+        sort_keys = mini_sort_keys(keys)
+        return self.add(("sort", sort_keys, nulls), [column for column, _ in sort_keys])
+
+    def limit(self, count: int) -> "MiniQuery":
+        """Keeps only the first count records."""
+        if not isinstance(count, int) or count < 0:
+            raise ValueError(f"limit must be a whole number of at least 0, not {count!r}.")
+        return self.add(("limit", count))
+
+    def aggregate(self, *aggregates: dict[str, Any]) -> "MiniQuery":
+        """Ends the query with mini_aggregate aggregates; collect() returns their results in order."""
+        for spec in aggregates:
+            mini_validate_input_dict(spec, ["Function", "Column"])
+            if spec["Function"] not in MINI_AGGREGATES:
+                raise ValueError(f"Unknown aggregate '{spec['Function']}', use one of {list(MINI_AGGREGATES)}.")
+        return self.add(("aggregate", list(aggregates)), [spec["Column"] for spec in aggregates])
+
+    def group_by(self, keys: str | list[str], aggregates: list[dict[str, Any]]) -> "MiniQuery":
+        """Ends the query with mini_group_by; collect() returns its 'Keys' and 'Groups'."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        used = keys + [spec["Column"] for spec in aggregates if spec.get("Column") is not None]
+        return self.add(("group_by", keys, list(aggregates)), used)
+
+    def plan(self) -> list[tuple]:
+        """
+        Returns the optimized plan: a ('scan', where, columns) step followed by 'filter', 'sort',
+        'top_k', 'limit', 'project', 'aggregate' and 'group_by' steps, run in order.
+        """
+        pushed, steps, limited = [], [], False
+        for step in self.steps:
+            kind = step[0]
+            if kind == "where" and not limited:
+                pushed.append(step[1])  # A filter can move ahead of sorts and selects, but not of a limit
+            elif kind == "where":
+                steps.append(("filter", step[1]))
+            elif kind == "select":
+                continue  # Only the last select decides the output, see below
+            elif kind == "limit":
+                limited = True
+                if steps and steps[-1][0] == "sort":
+                    steps[-1] = ("top_k", steps[-1][1], steps[-1][2], step[1])
+                elif steps and steps[-1][0] in ("limit", "top_k"):
+                    steps[-1] = steps[-1][:-1] + (min(steps[-1][-1], step[1]),)
+                else:
+                    steps.append(step)
+            elif kind == "sort" and steps and steps[-1][0] == "sort" and steps[-1][2] == step[2]:
+                # The later sort is stable, so it only breaks its own ties with the earlier keys
+                later = [column for column, _ in step[1]]
+                steps[-1] = ("sort", step[1] + [key for key in steps[-1][1] if key[0] not in later], step[2])
+            elif kind == "aggregate" and steps and steps[-1][0] == "aggregate":
+                steps[-1] = ("aggregate", steps[-1][1] + step[1])
+            else:
+                steps.append(step)
+
+        terminal = bool(steps) and steps[-1][0] in ("aggregate", "group_by")
+        used = []
+        for step in steps:
+            if step[0] == "filter":
+                used += mini_predicate_columns(mini_normalize_predicate(step[1]))
+            elif step[0] in ("sort", "top_k"):
+                used += [column for column, _ in step[1]]
+            elif step[0] == "aggregate":
+                used += [spec["Column"] for spec in step[1]]
+            elif step[0] == "group_by":
+                used += step[1] + [spec["Column"] for spec in step[2] if spec.get("Column") is not None]
+        loaded = isinstance(self.source, (list, MiniTable))
+        if terminal:
+            columns = None if loaded else list(dict.fromkeys(used))
+        elif loaded:
+            columns = None  # Records are already in memory, so only the ones returned are copied, at the end
+            if self.columns is not None:
+                steps.append(("project", self.columns))
+        elif self.columns is not None:
+            columns = list(dict.fromkeys(self.columns + used))
+            if columns != self.columns:
+                steps.append(("project", self.columns))  # Sort or filter columns are dropped at the end
+        else:
+            columns = None
+        where = None if not pushed else pushed[0] if len(pushed) == 1 else ("and", *pushed)
+        return [("scan", where, columns)] + steps
+
+    def explain(self) -> str:
+        """Returns the plan as numbered lines, one per step in the order they run."""
+        lines = []
+        for step in self.plan():
+            kind = step[0]
+            if kind == "scan":
+                if isinstance(self.source, str):
+                    line = f"Scan {self.source!r}"
+                elif isinstance(self.source, (list, MiniTable)):
+                    line = f"Scan {type(self.source).__name__} of {len(self.source)} records"
+                else:
+                    line = "Scan stream"
+                if isinstance(self.source, (list, MiniTable)) and getattr(self.source, "indexes", None):
+                    line += f" (indexed on {', '.join(self.source.indexes)})"
+                if step[1] is not None:
+                    line += f" where {mini_predicate_text(mini_normalize_predicate(step[1]))}"
+                if step[2] is not None:
+                    line += f" keeping {', '.join(step[2])}"
+            elif kind == "filter":
+                line = f"Filter {mini_predicate_text(mini_normalize_predicate(step[1]))}"
+            elif kind in ("sort", "top_k"):
+                order = ", ".join(f"{column} desc" if descending else column for column, descending in step[1])
+                line = f"Top {step[3]} by {order}" if kind == "top_k" else f"Sort by {order}"
+                line += " (nulls first)" if step[2] == "first" else ""
+            elif kind == "limit":
+                line = f"Limit {step[1]}"
+            elif kind == "project":
+                line = f"Project {', '.join(step[1])}"
+            elif kind == "aggregate":
+                line = "Aggregate in one pass: " + ", ".join(f"{spec['Function']}({spec['Column']})" for spec in step[1])
+            else:
+                functions = ", ".join(f"{spec['Function']}({spec.get('Column', '*')})" for spec in step[2])
+                line = f"Group by {', '.join(step[1])}: {functions}"
+            lines.append(line)
+        return "\n".join(f"{number}. {line}" for number, line in enumerate(lines, 1))
+
+    def scan(self, where: Any, columns: list[str] | None, whole: bool) -> Any:
+        """Reads the source with the pushed down filter and columns; whole keeps a MiniTable columnar."""
+        if isinstance(self.source, str):  # The loader skips the other cells and drops rows before building them
+            return mini_load_csv_yield(self.source, self.schema, where=where, columns=columns)
+        data = self.source
+        if whole and isinstance(data, MiniTable):
+            table = data if where is None else data.take(mini_where_rows(data, where))
+            if len(table):  # No rows are aggregated like an empty list, not an empty table
+                return table
+            return iter(())
+        if where is not None:
+            return mini_filter({"Data": data, "Where": where, "Columns": columns})
+        if columns is not None:
+            return ({column: record.get(column) for column in columns} for record in data)
+        return iter(data)
+
+    def run(self) -> Any:
+        """Runs the plan, returning a stream of records or the result of the final aggregate or group_by."""
+        plan = self.plan()
+        _, where, columns = plan[0]
+        records = self.scan(where, columns, whole=len(plan) == 2 and plan[1][0] == "aggregate")
+        for step in plan[1:]:
+            kind = step[0]
+            if kind == "filter":
+                records = filter(mini_compile_predicate(step[1]), records)
+            elif kind in ("sort", "top_k"):
+                keys = [(column, "desc" if descending else "asc") for column, descending in step[1]]
+                if kind == "top_k":
+                    records = iter(mini_sort(records, keys, step[2], top_k=step[3])["Sorted data"])
+                else:
+                    records = iter(mini_sort(list(records), keys, step[2], inplace=True)["Sorted data"])
+            elif kind == "limit":
+                records = islice(records, step[1])
+            elif kind == "project":
+                records = ({column: record[column] for column in step[1]} for record in records)
+            elif kind == "aggregate":
+                return mini_aggregate({"Data": records, "Aggregates": step[1]})
+            else:
+                return mini_group_by(records, step[1], step[2])
+        return records
+
+    def collect(self) -> list[dict[str, Any]] | dict[str, Any]:
+        """
+        Runs the query.
+
+        Returns:
+            list[dict] | dict: The records, or the list of aggregate results, or the mini_group_by result.
+        """
+        result = self.run()
+        return list(result) if isinstance(result, Iterator) else result
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Runs the query and streams its records, for queries that do not end in an aggregate."""
+        if self.steps and self.steps[-1][0] in ("aggregate", "group_by"):
+            raise ValueError("This query ends in an aggregate, use collect().")
+        return self.run()
+
+
+MINI_WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+MINI_WEATHER_RETRY_STATUS = (429, 500, 502, 503, 504)
+MINI_WEATHER_MAX_DELAY = 60.0  # Longest wait between retries, whatever Retry-After asks for
+
+
+class MiniTokenBucket:
+    """
+    Thread safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, and each request takes one, so
+    short bursts go straight through and the long run average never exceeds `rate`. It replaces a
+    fixed sleep after every request, which wasted the wait even when no more requests were due.
 
     Example:
-        mini_bubble_sort([{'person': 'Alice', 'DailySteps': 200}, {'person': 'Bob', 'DailySteps': 300}], 'DailySteps')
-        {'Column': 'DailySteps','Sorted data': [{'person': 'Alice', 'DailySteps': 200}, {'person': 'Bob', 'DailySteps': 300}]}
+        bucket = MiniTokenBucket(rate=5, capacity=5)
+        bucket.acquire()  # returns at once while tokens are left, otherwise waits for the next one
     """
 
-    n = mini_simple_len(data)
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            if not isinstance(data[j][column], (int, float)):
-                raise ValueError(f"Column '{column}' does not contain numeric values.")
-            if data[j][column] > data[j + 1][column]:
-                data[j], data[j + 1] = data[j + 1], data[j]
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Rate must be positive and capacity at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self) -> None:
+        """Takes one token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def mini_weather_params(place: dict[str, Any]) -> dict[str, Any]:
+    """Returns the open-meteo query parameters for one city."""
+    return {
+        "latitude": place.get("lat"),
+        "longitude": place.get("lon"),
+        "current": "temperature_2m",
+        "daily": ["temperature_2m_max", "temperature_2m_min"],
+        "forecast_days": 1,
+    }
 
-    if inplace:
-        sorted_data = data  # Sorted list of dicts
-    else:
-        sorted_data = [
-            record[column] for record in data if column in record
-        ]  # Sorted list of values
 
-    return {"Column": column, "Sorted data": sorted_data}
+def mini_weather_record(place: dict[str, Any], response_dict: dict[str, Any]) -> dict[str, Any]:
+    """Returns a copy of the city with current_temp, today_max and today_min from one open-meteo response."""
+    return {
+        **place,
+        "current_temp": response_dict["current"]["temperature_2m"],
+        "today_max": response_dict["daily"]["temperature_2m_max"][0],
+        "today_min": response_dict["daily"]["temperature_2m_min"][0],
+    }
 
 
-def mini_value_exists(
-    sorted_data: list[int | float], value: int | float
-) -> dict[str, str | bool]:
+def mini_retry_after(value: str | None) -> float | None:
     """
-    Checks if a value exists in a list of data using binary search.
-
-    Args:
-        data (list[int, float]]): A list of dictionaries where each dictionary represents a record.
-        value (int or float): The value to check.
-
-    Returns:
-        dict: Of the value searched for and if it exists.
+    Returns the seconds to wait from a Retry-After header, given as seconds or an HTTP date.
 
     Example:
-        mini_value_exists([{'person': 'Alice', 'Daily Steps': 200}, {'person': 'Bob', 'Daily Steps': 300}], 200)
-        {"Value": 200, "Exists: True}
+        mini_retry_after("120")
+        120.0
     """
-    left = 0
-    right = mini_simple_len(sorted_data) - 1
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:  # "-0000" dates come back without a timezone, they are UTC
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def mini_request_json(
+    session: requests.Session | Any,
+    url: str,
+    params: dict[str, Any],
+    bucket: MiniTokenBucket | None = None,
+    retries: int = 2,
+    backoff: float = 0.5,
+    max_delay: float = MINI_WEATHER_MAX_DELAY,
+) -> Any:
+    """
+    Sends a GET request and returns the decoded JSON, retrying failures with exponential backoff.
 
-    while left <= right:
-        mid = (left + right) // 2
-        mid_value = sorted_data[mid]
+    Connection errors, timeouts and the statuses in MINI_WEATHER_RETRY_STATUS are retried up to
+    `retries` more times, waiting backoff, 2*backoff, 4*backoff... seconds, or what the Retry-After
+    header asks for if the server sends one (in seconds or as an HTTP date). No wait is longer than
+    `max_delay`, so a server asking for a day does not hold a thread for a day. Other HTTP errors
+    are raised straight away.
 
-        if mid_value == value:
-            return {"Value": value, "Exists": True}
-        elif mid_value < value:
-            left = mid + 1
-        else:
-            right = mid - 1
+    While metrics are enabled, every attempt emits an 'http' event with its status and latency.
 
-    return {"Value": value, "Exists": False}
+    Raises:
+        requests.exceptions.RequestException: If the last attempt fails.
+    """
+    for attempt in range(retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=15)
+            if MINI_METRICS_SINKS:
+                mini_emit({"metric": "http", "url": url, "status": response.status_code, "attempt": attempt,
+                           "seconds": time.perf_counter() - start})
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            if MINI_METRICS_SINKS and e.response is None:  # No response at all, such as a timeout
+                mini_emit({"metric": "http", "url": url, "status": type(e).__name__, "attempt": attempt,
+                           "seconds": time.perf_counter() - start})
+            status = e.response.status_code if e.response is not None else None
+            if attempt == retries or (status is not None and status not in MINI_WEATHER_RETRY_STATUS):
+                raise
+            delay = mini_retry_after(e.response.headers.get("Retry-After") if e.response is not None else None)
+            time.sleep(min(backoff * 2**attempt if delay is None else delay, max_delay))
 
 
-def mini_frequency_table(input_dict: dict[str, str]) -> dict:
+class MiniWeatherCache:
     """
-    Takes an input dictionary which contains the data and the column to check and returns a frequency table containing the number of times a value appears in the column.
+    A time-to-live cache of open-meteo responses with least recently used eviction.
 
-    Args:
-        input_dict (dict): Dictionary containing the data and column to check frequencies.
+    Responses are keyed on the city's coordinates rounded to `precision` decimal places (2 places is
+    about 1km) and the requested fields, so repeated lookups of the same place within `ttl` seconds
+    need no HTTP request. At most `maxsize` responses are kept in memory; the least recently used
+    one is dropped first. With a `path`, responses are also written to a SQLite file so they survive
+    a restart, bounded to `maxsize` rows the same way. Each batch of responses is written in one
+    commit and lookups only update the file with the next write. `hits` and `misses` count the lookups.
 
-    Returns:
-        dict: Containing the column and the frequencies of all occurences in that column.
+    Args:
+        ttl (float, optional): Seconds a response stays valid. Defaults to 600.
+        maxsize (int, optional): The most responses kept. Defaults to 1024.
+        path (str | None, optional): A SQLite file to keep the responses in as well. Defaults to None.
+        precision (int, optional): Decimal places the coordinates are rounded to. Defaults to 2.
 
     Raises:
-        ValueError: If 'Data' and 'Column' are not in the input_dict.
+        ValueError: If ttl is not positive or maxsize is less than 1.
 
     Example:
-        mini_frequency_table({"Data": sleep_data, "Column": "Daily Steps"})
-        {'Daily Steps': {3000: 3, 3300: 2}
+        cache = MiniWeatherCache(ttl=600, path="weather_cache.sqlite")
+        with MiniWeatherClient(cache=cache) as client:
+            list(client.fetch(cities))
+            list(client.fetch(cities))
+        cache.stats()
+        {'Hits': 30, 'Misses': 30, 'Size': 30}
     """
-    mini_validate_input_dict(input_dict, ["Data", "Column"])
-    data = input_dict.get("Data")
-    column = input_dict.get("Column")
 
-    results = {}
+    def __init__(self, ttl: float = 600, maxsize: int = 1024, path: str | None = None, precision: int = 2):
+        if ttl <= 0 or maxsize < 1:
+            raise ValueError("TTL must be positive and maxsize at least 1.")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.precision = precision
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        self.db = None
+        self.touched = {}  # Keys read since the last write and when, so `used` is updated in batches
+        if path is not None:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS weather (key TEXT PRIMARY KEY, expires REAL, used REAL, response TEXT)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS weather_used ON weather (used)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS weather_expires ON weather (expires)")
+            self.db.commit()
+
+    def key(self, place: dict[str, Any], params: dict[str, Any]) -> str:
+        """Returns the cache key for a city and the request parameters other than its coordinates."""
+        fields = {name: value for name, value in params.items() if name not in ("latitude", "longitude")}
+        lat, lon = round(float(place["lat"]), self.precision), round(float(place["lon"]), self.precision)
+        return json.dumps([lat, lon, fields], sort_keys=True)
+
+    def get(self, place: dict[str, Any], params: dict[str, Any]) -> Any | None:
+        """Returns the cached response for a city, or None if there is none or it has expired."""
+        return self.get_many([place], params)[0]
+
+    def get_many(self, places: list[dict[str, Any]], params: dict[str, Any]) -> list[Any | None]:
+        """
+        Returns the cached response for each city, or None where there is none or it has expired.
+
+        A hit only notes when it was used; the SQLite file is updated with the next write, so reads
+        never wait on the disk.
+        """
+        keys = [self.key(place, params) for place in places]
+        now = time.time()
+        responses = []
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self.entries[key]
+                    entry = None
+                if entry is None and self.db is not None:
+                    row = self.db.execute("SELECT expires, response FROM weather WHERE key = ?", (key,)).fetchone()
+                    if row is not None and row[0] > now:
+                        entry = (row[0], json.loads(row[1]))
+                        self.store(key, entry)
+                if MINI_METRICS_SINKS:
+                    mini_emit({"metric": "cache", "cache": "weather", "hit": entry is not None})
+                if entry is None:
+                    self.misses += 1
+                    responses.append(None)
+                    continue
+                self.entries.move_to_end(key)
+                if self.db is not None:
+                    self.touched[key] = now
+                self.hits += 1
+                responses.append(entry[1])
+            if len(self.touched) >= self.maxsize:
+                self.write([])
+        return responses
+
+    def put(self, place: dict[str, Any], params: dict[str, Any], response: Any) -> None:
+        """Caches the response for a city for the next `ttl` seconds."""
+        self.put_many([(place, response)], params)
+
+    def put_many(self, items: Iterable[tuple[dict[str, Any], Any]], params: dict[str, Any]) -> None:
+        """Caches each (city, response) pair for the next `ttl` seconds, with one SQLite commit for all of them."""
+        now = time.time()
+        entries = [(self.key(place, params), (now + self.ttl, response)) for place, response in items]
+        with self.lock:
+            for key, entry in entries:
+                self.store(key, entry)
+            if self.db is not None:
+                self.write([(key, expires, now, json.dumps(response)) for key, (expires, response) in entries])
+
+    def write(self, rows: list[tuple[str, float, float, str]]) -> None:
+        """
+        Writes the pending use times and new rows to SQLite in one commit. Called with the lock held.
+
+        The file is only trimmed once it holds more than `maxsize` rows: expired rows go first, then
+        the least recently used ones, found through the index on `used`.
+        """
+        if self.touched:
+            self.db.executemany("UPDATE weather SET used = ? WHERE key = ?", [(used, key) for key, used in self.touched.items()])
+            self.touched.clear()
+        self.db.executemany("INSERT OR REPLACE INTO weather VALUES (?, ?, ?, ?)", rows)
+        excess = self.db.execute("SELECT COUNT(*) FROM weather").fetchone()[0] - self.maxsize
+        if excess > 0:
+            excess -= self.db.execute("DELETE FROM weather WHERE expires <= ?", (time.time(),)).rowcount
+        if excess > 0:
+            self.db.execute("DELETE FROM weather WHERE key IN (SELECT key FROM weather ORDER BY used LIMIT ?)", (excess,))
+        self.db.commit()
+
+    def store(self, key: str, entry: tuple[float, Any]) -> None:
+        """Adds an entry to the in-memory cache, evicting the least recently used one when full."""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every cached response, in memory and on disk."""
+        with self.lock:
+            self.entries.clear()
+            self.touched.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM weather")
+                self.db.commit()
+
+    def close(self) -> None:
+        """Writes any pending use times and closes the SQLite file, if there is one."""
+        if self.db is not None:
+            with self.lock:
+                self.write([])
+            self.db.close()
+            self.db = None
+
+    def stats(self) -> dict[str, int]:
+        """Returns the hit and miss counts and the number of responses held in memory."""
+        return {"Hits": self.hits, "Misses": self.misses, "Size": len(self.entries)}
+
+
+class MiniWeatherClient:
+    """
+    A reusable open-meteo client that batches cities and keeps its connections open.
 
-    for record in data:
-        item = record[column]
-        if isinstance(item, str):
-            item = item.lower()
-        results[item] = results.get(item, 0) + 1
+    The forecast endpoint takes comma separated latitude and longitude lists, so up to `batch_size`
+    cities are packed into one request and the response is split back into one record per city. All
+    requests go through one requests.Session, so connections are kept alive and reused. Batches can
+    be fetched by `workers` threads at once, sharing a MiniTokenBucket that limits the requests per
+    second, and failed requests are retried with backoff by mini_request_json. With a
+    MiniWeatherCache, cities with a fresh cached response are left out of the requests.
 
-    return {column: results}
+    Args:
+        batch_size (int, optional): The most cities in one request. Defaults to 50.
+        workers (int, optional): The number of requests in flight at once. Defaults to 1.
+        rate (float, optional): The maximum requests per second. Defaults to 1.0.
+        retries (int, optional): Extra attempts for a failed request. Defaults to 2.
+        backoff (float, optional): The first retry delay in seconds, doubled each retry. Defaults to 0.5.
+        url (str, optional): The forecast endpoint, for pointing at a local stub server. Defaults to open-meteo.
+        cache (MiniWeatherCache | None, optional): A cache to read and store responses. Defaults to None.
+
+    Raises:
+        ValueError: If batch_size or workers is less than 1.
+
+    Example:
+        with MiniWeatherClient(batch_size=50) as client:
+            weather_data = list(client.fetch(cities))
+        len(weather_data)  # 30 cities in one request
+        30
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        workers: int = 1,
+        rate: float = 1.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        url: str = MINI_WEATHER_URL,
+        cache: MiniWeatherCache | None = None,
+    ):
+        if batch_size < 1 or workers < 1:
+            raise ValueError("Batch size and workers must be at least 1.")
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.url = url
+        self.bucket = MiniTokenBucket(rate, capacity=max(1, min(workers, rate)))  # Bursts of at most one second
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = cache
+        self.requests = 0
+        self.lock = Lock()
+
+    def __enter__(self) -> "MiniWeatherClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def batch_params(self, batch: list[dict[str, Any]]) -> dict[str, Any]:
+        """Returns the query parameters for a batch of cities, with comma separated coordinates."""
+        params = mini_weather_params(batch[0])
+        params["latitude"] = ",".join(str(place.get("lat")) for place in batch)
+        params["longitude"] = ",".join(str(place.get("lon")) for place in batch)
+        return params
+
+    def fetch_batch(self, batch: list[dict[str, Any]]) -> list[Any]:
+        """
+        Returns one response per city in a batch, in order, requesting the ones not in the cache.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails after its retries.
+            ValueError: If the response does not have one entry per city.
+        """
+        params = mini_weather_params(batch[0])
+        responses = self.cache.get_many(batch, params) if self.cache else [None] * len(batch)
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if not missing:
+            return responses
+        with self.lock:
+            self.requests += 1
+        fetch = [batch[i] for i in missing]
+        fetched = mini_request_json(self.session, self.url, self.batch_params(fetch), self.bucket, self.retries, self.backoff)
+        if isinstance(fetched, dict):  # A single location is returned on its own, not in a list
+            fetched = [fetched]
+        if len(fetched) != len(fetch):
+            raise ValueError(f"Expected {len(fetch)} locations in the response, got {len(fetched)}.")
+        complete = []
+        for i, response in zip(missing, fetched):
+            responses[i] = response
+            if self.cache is not None:
+                try:
+                    mini_weather_record(batch[i], response)  # Only cache complete responses
+                except (KeyError, IndexError, TypeError):
+                    continue
+                complete.append((batch[i], response))
+        if complete:
+            self.cache.put_many(complete, params)
+        return responses
+
+    def fetch(self, cities: Iterable[dict[str, Any]]) -> Generator[dict[str, Any], None, None]:
+        """
+        Yields a copy of each city with current_temp, today_max and today_min.
+
+        With one worker the cities come back in order; with more, each batch is yielded as soon as it
+        completes, and at most 2 * workers batches are queued at once, so `cities` can be a long stream.
+        A city whose batch fails is reported and skipped, like mini_get_weather_data_stream.
+        """
+        batches = iter(lambda it=iter(cities): list(islice(it, self.batch_size)), [])
+        if self.workers == 1:
+            for batch in batches:
+                yield from self.split_batch(batch, self.fetch_batch, batch)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            try:
+                while True:
+                    # Top up to 2 * workers batches, so cities are only read as they're needed
+                    for batch in islice(batches, 2 * self.workers - len(futures)):
+                        futures[executor.submit(self.fetch_batch, batch)] = batch
+                    if not futures:
+                        return
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from self.split_batch(futures.pop(future), future.result)
+            finally:
+                for future in futures:  # The caller stopped early, don't fetch the rest
+                    future.cancel()
+
+    @staticmethod
+    def split_batch(batch: list[dict[str, Any]], get_responses: Callable, *args: Any) -> Iterator[dict[str, Any]]:
+        """Pairs each city in a batch with its response, reporting the cities that failed."""
+        try:
+            responses = get_responses(*args)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            for place in batch:
+                print(f"Error fetching data for {place['city']}: {e}")
+            return
+        for place, response_dict in zip(batch, responses):
+            try:
+                yield mini_weather_record(place, response_dict)
+            except (KeyError, IndexError, TypeError) as e:
+                print(f"Error fetching data for {place['city']}: {e}")
 
 
+@mini_instrumented
 def mini_get_weather_data_stream(
-    cities: dict[str, Any],
+    cities: list[dict[str, Any]],
+    workers: int = 1,
+    rate: float = 1.0,
+    retries: int = 2,
+    backoff: float = 0.5,
+    url: str = MINI_WEATHER_URL,
+    cache: MiniWeatherCache | None = None,
 ) -> Generator[dict[str, Any], None, None]:
     """
     Takes an input dictionary and pulls current temperature data from the open-meteo api. This function should be used when the data should be streamed.
 
+    With the defaults the cities are fetched one at a time, in order, at no more than one request a
+    second. With workers > 1 they are fetched by a pool of threads, like
+    mini_get_weather_data_concurrent, and yielded as each one completes. For many cities,
+    MiniWeatherClient with a batch_size above 1 needs far fewer requests.
+
     Args:
         cities_dict: Input dictionary which includes the city, lat and lon.
             Example: {"city": "New York", "country": "USA", "lat": 40.7128, "lon": -74.0060}
-        timeperiod: Must be 'hourly' for hourly breakdown of temperatures or 'daily' for min and max per each day.
+        workers (int, optional): The number of requests in flight at once. Defaults to 1.
+        rate (float, optional): The maximum requests per second. Defaults to 1.0.
+        retries (int, optional): Extra attempts for a failed request. Defaults to 2.
+        backoff (float, optional): The first retry delay in seconds, doubled each retry. Defaults to 0.5.
+        url (str, optional): The forecast endpoint, for pointing at a local stub server. Defaults to open-meteo.
+        cache (MiniWeatherCache | None, optional): Reuse fresh responses instead of requesting them. Defaults to None.
 
     Yields:
         dict: Response data for each city as it's retrieved.
@@ -565,28 +5143,403 @@ def mini_get_weather_data_stream(
         mini_get_weather_data_stream([{'city': 'Lagos','country': 'Nigeria','lat': 6.5244,'lon': 3.3792}])
         {'city': 'Lagos','country': 'Nigeria','lat': 6.5244,'lon': 3.3792,'current_temp': 29.2,'today_max': 29.6,'today_min': 25.6}
     """
-    url = "https://api.open-meteo.com/v1/forecast"
-    for place in cities:
-        params = {
-            "latitude": place.get("lat"),
-            "longitude": place.get("lon"),
-            "current": "temperature_2m",
-            "daily": ["temperature_2m_max", "temperature_2m_min"],
-            "forecast_days": 1,
-        }
+    with MiniWeatherClient(1, workers, rate, retries, backoff, url, cache) as client:
+        yield from client.fetch(cities)
+
+
+@mini_instrumented
+def mini_get_weather_data_concurrent(
+    cities: list[dict[str, Any]],
+    workers: int = 8,
+    rate: float = 10.0,
+    retries: int = 2,
+    backoff: float = 0.5,
+    url: str = MINI_WEATHER_URL,
+    cache: MiniWeatherCache | None = None,
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Pulls weather data for many cities at once using a bounded pool of threads.
+
+    At most `workers` requests are in flight and a shared MiniTokenBucket keeps the total under `rate`
+    requests per second, so the API's limits are respected without a fixed sleep between cities.
+    Results are yielded as soon as each city completes, so the order can differ from `cities`. A
+    city that still fails after its retries is reported and skipped, like mini_get_weather_data_stream.
+
+    Args:
+        cities (list[dict]): Cities with 'city', 'lat' and 'lon' keys.
+        workers (int, optional): The number of threads. Defaults to 8.
+        rate (float, optional): The maximum requests per second across all threads. Defaults to 10.0.
+        retries (int, optional): Extra attempts for a failed request. Defaults to 2.
+        backoff (float, optional): The first retry delay in seconds, doubled each retry. Defaults to 0.5.
+        url (str, optional): The forecast endpoint, for pointing at a local stub server. Defaults to open-meteo.
+        cache (MiniWeatherCache | None, optional): Reuse fresh responses instead of requesting them. Defaults to None.
+
+    Yields:
+        dict: A copy of each city with current_temp, today_max and today_min.
+
+    Raises:
+        ValueError: If workers is less than 1.
+
+    Example:
+        weather_data = list(mini_get_weather_data_concurrent(cities, workers=8, rate=10))
+        len(weather_data)
+        30
+    """
+    if workers < 1:
+        raise ValueError("Workers must be at least 1.")
+    with MiniWeatherClient(1, workers, rate, retries, backoff, url, cache) as client:
+        yield from client.fetch(cities)
+
+
+MINI_EARTH_RADIUS_KM = 6371.0088
+
+
+def mini_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Returns the great circle distance in kilometres between two points given in degrees.
+
+    Example:
+        mini_haversine(51.5074, -0.1278, 48.8566, 2.3522)
+        343.56
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * MINI_EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def mini_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    """Returns the point on the unit sphere for a latitude and longitude in degrees."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+class MiniSpatialIndex:
+    """
+    A k-d tree over city records for nearest, radius and bounding box lookups.
+
+    Each record's latitude and longitude is turned into a point on the unit sphere. The straight line
+    distance between two such points only grows with the great circle (haversine) distance, so the
+    tree can search in three dimensions and still return exactly the nearest cities on the globe,
+    with no trouble at the poles or across the 180th meridian. The tree is stored as a permutation of
+    the rows (each median split sits in the middle of its range), so it needs no node objects. A
+    copy of the rows sorted by latitude answers bounding box queries with bisect.
+
+    Every query takes a list of points, either (lat, lon) tuples or records with 'lat' and 'lon', and
+    returns one list of matching records per point. The records are copies with a 'distance_km' key,
+    so they can be passed straight to the weather functions.
+
+    Args:
+        places (Iterable[dict]): Records with 'lat' and 'lon' keys, such as the cities in main.py.
+        leaf_size (int, optional): Rows scanned directly instead of split further. Defaults to 16.
+
+    Raises:
+        ValueError: If a record does not have a numeric 'lat' and 'lon'.
+
+    Example:
+        index = MiniSpatialIndex(cities)
+        index.nearest([(51.5, 0.0)], k=2)
+        [[{'city': 'London', ..., 'distance_km': 8.884}, {'city': 'Paris', ..., 'distance_km': 338.266}]]
+    """
+
+    def __init__(self, places: Iterable[dict[str, Any]], leaf_size: int = 16):
+        self.places = list(places)
+        self.leaf_size = max(1, leaf_size)
+        self.coords = (array("d"), array("d"), array("d"))
+        for place in self.places:
+            try:
+                point = mini_unit_vector(float(place["lat"]), float(place["lon"]))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Record {place} does not have a numeric 'lat' and 'lon'.") from None
+            for axis in range(3):
+                self.coords[axis].append(point[axis])
+        size = len(self.places)
+        self.order = array("l", range(size))
+        self.axes = array("b", bytes(size))
+        stack = [(0, size)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= self.leaf_size:
+                continue
+            rows = self.order[lo:hi]
+            # Split on the axis the points are most spread along
+            axis = max(range(3), key=lambda a: max(map(self.coords[a].__getitem__, rows)) - min(map(self.coords[a].__getitem__, rows)))
+            self.order[lo:hi] = array("l", sorted(rows, key=self.coords[axis].__getitem__))
+            mid = (lo + hi) // 2
+            self.axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+        self.lat_order = sorted(range(size), key=lambda row: float(self.places[row]["lat"]))
+        self.lats = [float(self.places[row]["lat"]) for row in self.lat_order]
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    @staticmethod
+    def point(query: Any) -> tuple[float, float, float]:
+        """Returns the unit vector of a (lat, lon) tuple or a record with 'lat' and 'lon'."""
+        if isinstance(query, Mapping):
+            query = (query["lat"], query["lon"])
+        return mini_unit_vector(float(query[0]), float(query[1]))
+
+    @staticmethod
+    def chord_to_km(squared: float) -> float:
+        """Converts a squared straight line distance on the unit sphere to kilometres along the surface."""
+        return 2 * MINI_EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(squared) / 2))
+
+    def result(self, found: Iterable[tuple[float, int]]) -> list[dict[str, Any]]:
+        """Returns copies of the rows in (squared distance, row) pairs, nearest first, with 'distance_km'."""
+        return [
+            {**self.places[row], "distance_km": round(self.chord_to_km(squared), 3)} for squared, row in sorted(found)
+        ]
+
+    def nearest_rows(self, point: tuple[float, float, float], k: int) -> list[tuple[float, int]]:
+        """Returns the (squared distance, row) pairs of the k rows nearest a unit vector."""
+        xs, ys, zs = self.coords
+        qx, qy, qz = point
+        order, axes, leaf = self.order, self.axes, self.leaf_size
+        heap = []  # Max heap of the best k so far, as (-squared distance, row)
+
+        def consider(row: int) -> None:
+            squared = (xs[row] - qx) ** 2 + (ys[row] - qy) ** 2 + (zs[row] - qz) ** 2
+            if len(heap) < k:
+                heapq.heappush(heap, (-squared, row))
+            elif squared < -heap[0][0]:
+                heapq.heapreplace(heap, (-squared, row))
+
+        def search(lo: int, hi: int) -> None:
+            if hi - lo <= leaf:
+                for row in order[lo:hi]:
+                    consider(row)
+                return
+            mid = (lo + hi) // 2
+            row = order[mid]
+            diff = point[axes[mid]] - self.coords[axes[mid]][row]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            search(*near)
+            consider(row)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                search(*far)
+
+        search(0, len(order))
+        return [(-squared, row) for squared, row in heap]
+
+    def radius_rows(self, point: tuple[float, float, float], radius_km: float) -> list[tuple[float, int]]:
+        """Returns the (squared distance, row) pairs of every row within radius_km of a unit vector."""
+        limit = (2 * math.sin(min(radius_km / MINI_EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        xs, ys, zs = self.coords
+        qx, qy, qz = point
+        order, axes, leaf = self.order, self.axes, self.leaf_size
+        found = []
+        stack = [(0, len(order))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= leaf:
+                rows = order[lo:hi]
+            else:
+                mid = (lo + hi) // 2
+                rows = (order[mid],)
+                diff = point[axes[mid]] - self.coords[axes[mid]][rows[0]]
+                if diff <= 0 or diff * diff <= limit:
+                    stack.append((lo, mid))
+                if diff >= 0 or diff * diff <= limit:
+                    stack.append((mid + 1, hi))
+            for row in rows:
+                squared = (xs[row] - qx) ** 2 + (ys[row] - qy) ** 2 + (zs[row] - qz) ** 2
+                if squared <= limit:
+                    found.append((squared, row))
+        return found
+
+    def nearest(self, points: Iterable[Any], k: int = 1) -> list[list[dict[str, Any]]]:
+        """
+        Returns the k nearest records to each point, nearest first.
+
+        Raises:
+            ValueError: If k is less than 1.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        return [self.result(self.nearest_rows(self.point(query), k)) for query in points]
+
+    def within_radius(self, points: Iterable[Any], radius_km: float) -> list[list[dict[str, Any]]]:
+        """Returns every record within radius_km of each point, nearest first."""
+        return [self.result(self.radius_rows(self.point(query), radius_km)) for query in points]
+
+    def within_box(self, boxes: Iterable[tuple[float, float, float, float]]) -> list[list[dict[str, Any]]]:
+        """
+        Returns every record inside each (min_lat, min_lon, max_lat, max_lon) box, ordered by latitude.
+
+        A box with min_lon greater than max_lon crosses the 180th meridian. The records are copies
+        without 'distance_km'.
+        """
+        results = []
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            matches = []
+            for row in self.lat_order[bisect_left(self.lats, min_lat) : bisect_right(self.lats, max_lat)]:
+                lon = float(self.places[row]["lon"])
+                if (min_lon <= lon <= max_lon) if min_lon <= max_lon else (lon >= min_lon or lon <= max_lon):
+                    matches.append(dict(self.places[row]))
+            results.append(matches)
+        return results
+
+    def groups(self, radius_km: float) -> list[tuple[dict[str, Any], list[dict[str, Any]]]]:
+        """
+        Splits the records into groups of nearby places, each with one representative.
+
+        Records are taken in order; each one not yet grouped becomes a representative and takes every
+        ungrouped record within radius_km of it, so every record is within radius_km of its
+        representative.
+
+        Returns:
+            list[tuple[dict, list[dict]]]: (representative, members) pairs; the members include the representative.
+        """
+        grouped = bytearray(len(self.places))
+        result = []
+        for row, place in enumerate(self.places):
+            if grouped[row]:
+                continue
+            members = []
+            for _, member in sorted(self.radius_rows(self.point(place), radius_km)):
+                if not grouped[member]:
+                    grouped[member] = 1
+                    members.append(self.places[member])
+            result.append((place, members))
+        return result
+
+    def fetch_weather(
+        self, radius_km: float = 10.0, client: "MiniWeatherClient | None" = None
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Yields the weather for every record, sharing one upstream lookup between places within radius_km.
+
+        Only the representative of each group from `groups` is fetched; its current_temp, today_max
+        and today_min are copied to the other members. With a radius of a few kilometres the readings
+        are the same grid cell in open-meteo, and thousands of nearby sites cost a handful of requests.
+
+        Args:
+            radius_km (float, optional): How close places must be to share a lookup. Defaults to 10.0.
+            client (MiniWeatherClient | None, optional): The client to fetch with; a batched one is created if None.
+
+        Yields:
+            dict: A copy of each record with current_temp, today_max and today_min.
+
+        Example:
+            sites = MiniSpatialIndex(monitoring_sites)
+            for record in sites.fetch_weather(radius_km=10):
+                print(record)
+        """
+        members = {}
+        for representative, group in self.groups(radius_km):
+            members[(representative["lat"], representative["lon"])] = group
+        own_client = client is None
+        client = MiniWeatherClient() if own_client else client
         try:
-            response = requests.get(url, params=params, timeout=15)
-            response_dict = response.json()
-            place["current_temp"] = response_dict["current"]["temperature_2m"]
-            place["today_max"] = response_dict["daily"]["temperature_2m_max"][0]
-            place["today_min"] = response_dict["daily"]["temperature_2m_min"][0]
-            yield place
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data for {place['city']}: {e}")
-            continue
-        time.sleep(1)
+            representatives = [group[0] for group in members.values()]
+            for record in client.fetch(representatives):
+                for member in members[(record["lat"], record["lon"])]:
+                    yield {
+                        **member,
+                        "current_temp": record["current_temp"],
+                        "today_max": record["today_max"],
+                        "today_min": record["today_min"],
+                    }
+        finally:
+            if own_client:
+                client.close()
+
+
+class MiniWeatherAnalytics:
+    """
+    Keeps the weather summaries up to date as each city arrives, without storing the records.
+
+    It tracks what mini_hottest_city, mini_coldest_city, mini_temp_between and mini_biggest_temp_diff
+    return: the hottest and coldest cities, the cities whose current temperature is between `low` and
+    `high`, and the `top_k` biggest daily temperature differences in a heap of k entries. Records are
+    never changed. `snapshot` can be called at any point, for example while the weather stream is
+    still running.
+
+    Args:
+        low (float, optional): The bottom of the current temperature range, exclusive. Defaults to -inf.
+        high (float, optional): The top of the current temperature range, exclusive. Defaults to inf.
+        top_k (int, optional): How many of the biggest temperature differences to keep. Defaults to 5.
+
+    Example:
+        analytics = MiniWeatherAnalytics(20, 30)
+        for record in analytics.watch(mini_get_weather_data_stream(cities)):
+            print(analytics.snapshot()["Hottest"])
+        {'City': 'Madrid', 'Hottest temp': 36.0}
+    """
+
+    def __init__(self, low: float = float("-inf"), high: float = float("inf"), top_k: int = 5):
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1.")
+        self.low = low
+        self.high = high
+        self.top_k = top_k
+        self.count = 0
+        self.max_temp = float("-inf")
+        self.hottest_city = None
+        self.min_temp = float("inf")
+        self.coldest_city = None
+        self.in_range = []
+        self.diffs = []  # Min heap of (difference, arrival, city), so ties keep the later city like a stable sort
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Updates every summary with one weather record."""
+        self.count += 1
+        city_max, city_min, current = record.get("today_max"), record.get("today_min"), record.get("current_temp")
+        if city_max is not None and city_max > self.max_temp:
+            self.max_temp, self.hottest_city = city_max, record["city"]
+        if city_min is not None and city_min < self.min_temp:
+            self.min_temp, self.coldest_city = city_min, record["city"]
+        if current is not None and self.low < current < self.high:
+            self.in_range.append(record["city"])
+        if city_max is not None and city_min is not None:
+            entry = (round(city_max - city_min, 2), self.count, record["city"])
+            if len(self.diffs) < self.top_k:
+                heapq.heappush(self.diffs, entry)
+            elif entry > self.diffs[0]:
+                heapq.heapreplace(self.diffs, entry)
+
+    def update(self, records: Iterable[dict[str, Any]]) -> "MiniWeatherAnalytics":
+        """Adds every record and returns self."""
+        for record in records:
+            self.add(record)
+        return self
+
+    def watch(self, records: Iterable[dict[str, Any]]) -> Generator[dict[str, Any], None, None]:
+        """Yields each record unchanged after adding it, so the stream can still be used as it runs."""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def hottest(self) -> dict[str, str | float]:
+        """Returns the hottest city so far, as mini_hottest_city does."""
+        return {"City": self.hottest_city, "Hottest temp": self.max_temp}
+
+    def coldest(self) -> dict[str, str | float]:
+        """Returns the coldest city so far, as mini_coldest_city does."""
+        return {"City": self.coldest_city, "Coldest temp": self.min_temp}
+
+    def between(self) -> list[str]:
+        """Returns the cities so far with a current temperature between low and high, in arrival order."""
+        return list(self.in_range)
+
+    def biggest_temp_diff(self) -> list[dict[str, str | float]]:
+        """Returns the biggest temperature differences so far, as mini_biggest_temp_diff does."""
+        return [{"city": city, "difference": diff} for diff, _, city in sorted(self.diffs, reverse=True)]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns all of the summaries at this point."""
+        return {
+            "NumRecords": self.count,
+            "Hottest": self.hottest(),
+            "Coldest": self.coldest(),
+            "Between": self.between(),
+            "Biggest temp diff": self.biggest_temp_diff(),
+        }
 
 
+@mini_instrumented
 def mini_hottest_city(weather_data: list[dict]) -> dict[str, str | float]:
     """
     Returns the maximum temperature and city from existing weather data.
@@ -615,6 +5568,7 @@ def mini_hottest_city(weather_data: list[dict]) -> dict[str, str | float]:
     return {"City": hottest_city, "Hottest temp": max_temp}
 
 
+@mini_instrumented
 def mini_coldest_city(weather_data: list[dict]) -> dict[str, str | float]:
     """
     Returns the maximum value in a specified column of a list of dictionaries.
@@ -644,6 +5598,7 @@ def mini_coldest_city(weather_data: list[dict]) -> dict[str, str | float]:
     return {"City": coldest_city, "Coldest temp": min_temp}
 
 
+@mini_instrumented
 def mini_temp_between(data: list[dict[str, Any]], min: int | float, max: int | float):
     """
     List cities where the temperature is between two numbers.
@@ -666,6 +5621,7 @@ def mini_temp_between(data: list[dict[str, Any]], min: int | float, max: int | f
             yield record["city"]
 
 
+@mini_instrumented
 def mini_biggest_temp_diff(data: list[dict[str, Any]]) -> dict[str, str | float]:
     """
     Lists the top five cities with the biggest temperature difference.
@@ -677,11 +5633,4 @@ def mini_biggest_temp_diff(data: list[dict[str, Any]]) -> dict[str, str | float]
         dict: Containing the top five cities and their temperature difference.
 
     """
-    for record in data:
-        record["temperature_diff"] = round(record["today_max"] - record["today_min"], 2)
-
-    sorted_result = mini_bubble_sort(data, "temperature_diff", True)["Sorted data"]
-    top5 = []
-    for rec in sorted_result[-5:][::-1]:  # take last 5 and reverse for descending
-        top5.append({"city": rec["city"], "difference": rec["temperature_diff"]})
-    return top5
\ No newline at end of file
+    return MiniWeatherAnalytics(top_k=5).update(data).biggest_temp_diff()  # Heap of five, records unchanged
\ No newline at end of file
@@ -1,8 +1,11 @@
+import os
+import tempfile
+
 from fun import *
 
 # Part A
 
-file_dict = {"filename": "MiniYou/datasets/sleep_health_and_lifestyle_data.csv"}
+file_dict = {"filename": "MiniYou/datasets/sleep_health_and_lifestyle_data.csv", "cache": True}
 filename = file_dict["filename"]
 
 # Test out mini_load_csv_dict
@@ -10,7 +13,7 @@ sleep_data = mini_load_csv_dict(file_dict)
 print(sleep_data[0])
 
 # Test out mini_load_csv_yield
-sleep_data_yield = mini_load_csv_yield(filename)
+sleep_data_yield = mini_load_csv_yield(filename, cache=True)
 for row in sleep_data_yield:
     print(row)
     break  # Print only the first row for demonstration
@@ -56,8 +59,11 @@ print(mini_value_exists(sorted_data, 3500))
 # Test mini_frequency_table
 print(mini_frequency_table({"Data": sleep_data, "Column": "Occupation"}))
 
+# Test mini_group_by
+print(mini_group_by(sleep_data, "Occupation", [{"Function": "count"}, {"Function": "mean", "Column": "Sleep Duration"}]))
+
 # Part C
-file_dict = {"filename": "MiniYou/datasets/health_activity_data.csv"}
+file_dict = {"filename": "MiniYou/datasets/health_activity_data.csv", "cache": True}
 filename = file_dict["filename"]
 health_data = mini_load_csv_dict(file_dict)
 
@@ -73,6 +79,64 @@ print(mini_average({"Data": health_data, "Column": "BMI"}))
 # Count how many female users sleep 7.4 hours.
 print(mini_count_match({"Data": health_data, "Gender": "Female", "Hours_of_Sleep": 7.4}))
 
+# Mean BMI by gender and smoker, in one pass over the file
+print(mini_group_by(mini_load_csv_yield(filename), ["Gender", "Smoker"], [{"Function": "mean", "Column": "BMI"}]))
+
+# Join the sleep records to the health records with the same ID
+for record in islice(mini_join(sleep_data, health_data, ("Person ID", "ID")), 3):
+    print(record)
+
+# Count and filter with a predicate: tired nurses, or anyone very stressed
+tired_or_stressed = ("or", ("and", ("Occupation", "ieq", "nurse"), ("Sleep Duration", "<", 6.5)), ("Stress Level", ">=", 8))
+print(mini_count_where({"Data": sleep_data, "Where": tired_or_stressed}))
+for record in islice(mini_filter({"Data": sleep_data, "Where": tired_or_stressed, "Columns": ["Person ID", "Occupation"]}), 3):
+    print(record)
+
+# Only read two columns of the obese records, the other cells are never converted
+obese = mini_load_csv_dict({"filename": filename, "columns": ["ID", "BMI"], "where": ("BMI", ">=", 30)})
+print(len(obese), obese[:3])
+
+# A lazy query: nothing is read until collect(), and explain() shows how it will run
+top_teachers = (MiniQuery("MiniYou/datasets/sleep_health_and_lifestyle_data.csv")
+                .where(("Occupation", "=", "Teacher"))
+                .select("Person ID", "Daily Steps", "Sleep Duration")
+                .sort([("Daily Steps", "desc")])
+                .limit(10))
+print(top_teachers.explain())
+print(top_teachers.collect())
+
+# Compact records share one header per file, the functions above work on them unchanged
+compact_health = mini_load_csv_dict({"filename": filename, "storage": "compact"})
+print(compact_health[0], compact_health[0]["BMI"])
+print(mini_count_match({"Data": compact_health, "Gender": "Female", "Hours_of_Sleep": 7.4}))
+
+# Sketches keep fixed memory however long the stream is, and merge across chunks
+print(mini_aggregate({"Data": mini_load_csv_yield(filename), "Aggregates": [
+    {"Function": "approx_distinct", "Column": "Calories_Intake"},
+    {"Function": "approx_top_k", "Column": "Age", "K": 3},
+    {"Function": "approx_percentiles", "Column": "Daily_Steps", "Percentiles": [50, 90]},
+]}))
+male_steps, female_steps = MiniHyperLogLog(), MiniHyperLogLog()
+for record in mini_load_csv_yield(filename, where=("Gender", "=", "Male")):
+    male_steps.add(record["Daily_Steps"])
+for record in mini_load_csv_yield(filename, where=("Gender", "=", "Female")):
+    female_steps.add(record["Daily_Steps"])
+print(male_steps.merge(female_steps).count())
+
+# Follow a file as rows are appended: only the new rows are read, the average and index are updated in place
+with open(filename, encoding="utf-8") as file:
+    health_lines = file.readlines()
+with tempfile.TemporaryDirectory() as directory:
+    growing = os.path.join(directory, "health_growing.csv")
+    with open(growing, "w", encoding="utf-8") as file:
+        file.writelines(health_lines[:501])
+    loader = MiniTailLoader(growing, aggregates=[{"Function": "average", "Column": "BMI"}], indexes=["Daily_Steps"])
+    print(len(loader.refresh()), loader.results())
+    with open(growing, "a", encoding="utf-8") as file:
+        file.writelines(health_lines[501:])
+    print(len(loader.refresh()), loader.results())
+    print(mini_value_exists(loader.data.indexes["Daily_Steps"].sorted_values, 6457))
+
 # Part D
 cities = [
  {"city": "New York", "country": "USA", "lat": 40.7128, "lon": -74.0060},
@@ -107,18 +171,48 @@ cities = [
  {"city": "Lagos", "country": "Nigeria", "lat": 6.5244, "lon": 3.3792}
 ]
 
+# Responses are reused for 10 minutes, across runs too, so the second fetch makes no requests
+weather_cache = MiniWeatherCache(ttl=600, path="MiniYou/weather_cache.sqlite")
+
 # Test mini_get_weath_data_yield
-for result in mini_get_weather_data_stream(cities):
+for result in mini_get_weather_data_stream(cities, cache=weather_cache):
     print(result)
     
 # Test hottest and coldest
-weather_data = list(mini_get_weather_data_stream(cities))
+with MiniWeatherClient(batch_size=50, cache=weather_cache) as client:  # One request for all the cities
+    weather_data = list(client.fetch(cities))
 print(mini_hottest_city(weather_data))
 print(mini_coldest_city(weather_data))
+print(weather_cache.stats())
 
 # Test mini_temp_between
 for result in mini_temp_between(weather_data, 20, 30):
     print(result)
     
+# Test MiniWeatherAnalytics, the same summaries kept up to date as the stream runs, with no list
+weather_analytics = MiniWeatherAnalytics(20, 30, top_k=5)
+for result in weather_analytics.watch(mini_get_weather_data_stream(cities, cache=weather_cache)):
+    print(result["city"], weather_analytics.snapshot()["Hottest"])
+print(weather_analytics.snapshot())
+
+# Test MiniSpatialIndex
+city_index = MiniSpatialIndex(cities)
+print(city_index.nearest([(51.5, 0.0), (-33.0, 151.0)], k=2))
+print(city_index.within_radius([(48.8566, 2.3522)], 1000))
+print(city_index.within_box([(35, -10, 60, 30)]))
+
 # Test mini_biggest_temp_diff
-print(mini_biggest_temp_diff(weather_data))
\ No newline at end of file
+print(mini_biggest_temp_diff(weather_data))
+# Metrics: count and time the calls of one block, then turn them off again
+metrics = mini_enable_metrics()
+mini_load_csv_dict({"filename": "MiniYou/datasets/health_activity_data.csv", "cache": True})
+mini_count_match({"Data": sleep_data, "Occupation": "Nurse"})
+print(metrics.snapshot())
+print(metrics.prometheus())
+mini_disable_metrics()
+
+# Profile one block with cProfile and tracemalloc
+with mini_profile(top=5) as profile:
+    mini_sort(health_data, [("Daily_Steps", "desc")])
+print(profile["Report"])
+print(profile["Peak bytes"])
@@ -0,0 +1,291 @@
+import csv
+import email.utils
+import os
+import random
+import time
+from itertools import islice
+
+import pytest
+
+from fun import *
+from weather_stub import start_weather_stub, stub_forecast
+
+
+@pytest.fixture
+def late_filled_csv(tmp_path):
+    """A file whose 'score' column is empty for longer than the schema sample, then holds numbers."""
+    filename = tmp_path / "late_filled.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "score"])
+        for row in range(1500):
+            writer.writerow([row, "" if row < 1200 else 1800.0 + (row - 1200) * 1.5])
+    return str(filename)
+
+
+def test_late_filled_column_is_typed_like_mini_data_types(late_filled_csv):
+    with open(late_filled_csv, newline="", encoding="utf-8") as file:
+        raw = list(csv.DictReader(file))
+    expected = [{column: mini_convert_value(value) for column, value in row.items()} for row in raw]
+
+    assert mini_data_types(raw) == expected
+    assert mini_infer_schema({"filename": late_filled_csv})["score"] == "missing"
+    assert mini_load_csv_dict({"filename": late_filled_csv}) == expected
+    assert mini_load_csv_dict({"filename": late_filled_csv, "storage": "compact"}) == expected
+    assert mini_load_csv_dict({"filename": late_filled_csv, "storage": "columnar"}).to_dicts() == expected
+    assert list(mini_load_csv_yield(late_filled_csv)) == expected
+    assert expected[1250]["score"] == 1875.0
+
+
+def test_late_filled_column_average(late_filled_csv):
+    expected = mini_average({"Data": [{"score": "" if row < 1200 else 1800.0 + (row - 1200) * 1.5} for row in range(1500)], "Column": "score"})
+
+    for storage in ("dict", "columnar", "compact"):
+        data = mini_load_csv_dict({"filename": late_filled_csv, "storage": storage})
+        assert mini_average({"Data": data, "Column": "score"}) == expected
+    assert expected["Average"] == 2024.25
+
+
+@pytest.fixture
+def stray_text_csv(tmp_path):
+    """A numeric 'score' column with one stray "N/A" in the sample."""
+    filename = tmp_path / "stray_text.csv"
+    filename.write_text("id,score,note\n1,10,a\n2,N/A,b\n3,30.5,c\n", encoding="utf-8")
+    return str(filename)
+
+
+def test_numbers_next_to_text_are_still_converted(stray_text_csv):
+    expected = [
+        {"id": 1, "score": 10, "note": "a"},
+        {"id": 2, "score": "N/A", "note": "b"},
+        {"id": 3, "score": 30.5, "note": "c"},
+    ]
+
+    assert mini_infer_schema({"filename": stray_text_csv}) == {"id": "int", "score": "mixed", "note": "str"}
+    for storage in ("dict", "compact"):
+        assert mini_load_csv_dict({"filename": stray_text_csv, "storage": storage}) == expected
+    assert mini_load_csv_dict({"filename": stray_text_csv, "storage": "columnar"}).to_dicts() == expected
+    assert list(mini_load_csv_yield(stray_text_csv)) == expected
+    assert mini_max(mini_load_csv_dict({"filename": stray_text_csv}), "score") == 30.5
+    assert mini_data_types([{"b": "2.5"}, {"b": "x"}]) == [{"b": 2.5}, {"b": "x"}]
+
+
+def test_biggest_temp_diff_keeps_the_latest_ties_first():
+    weather_data = [{"city": city, "today_max": 20, "today_min": 10} for city in "ABCDEF"]
+    weather_data.append({"city": "G", "today_max": 25, "today_min": 10})
+
+    result = mini_biggest_temp_diff(weather_data)
+
+    assert [record["city"] for record in result] == ["G", "F", "E", "D", "C"]
+    assert result[0]["difference"] == 15
+    assert MiniWeatherAnalytics(top_k=5).update(weather_data).biggest_temp_diff() == result
+
+
+@pytest.fixture
+def parallel_csv(tmp_path):
+    """3000 rows: an int id, a late-filled score, a float, a numeric column with stray text and plain text."""
+    filename = tmp_path / "parallel.csv"
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "score", "ratio", "reading", "group"])
+        for row in range(3000):
+            writer.writerow(
+                [
+                    row,
+                    "" if row < 1200 else row * 2,
+                    row / 8,
+                    "N/A" if row % 97 == 0 else row % 50,
+                    ["North", "South, East", ""][row % 3],
+                ]
+            )
+    return str(filename)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+@pytest.mark.parametrize("storage", ["dict", "columnar", "compact"])
+def test_parallel_load_matches_serial_load(parallel_csv, late_filled_csv, storage, workers):
+    for filename in (parallel_csv, late_filled_csv):
+        ranges = mini_csv_byte_ranges(filename, workers * 4)
+        serial = mini_load_csv_dict({"filename": filename, "storage": storage})
+        parallel = mini_load_csv_parallel({"filename": filename, "storage": storage, "workers": workers})
+
+        with open(filename, "rb") as file:
+            sample_end = sum(len(line) for line in islice(file, MINI_SCHEMA_SAMPLE_SIZE + 1))
+        assert ranges[1][0] < sample_end  # A range starts inside the schema sample
+        if storage == "columnar":
+            assert parallel.schema == serial.schema
+            assert parallel.to_dicts() == serial.to_dicts()
+        else:
+            assert parallel == serial
+            assert [type(record) for record in parallel] == [type(record) for record in serial]
+
+
+def nested_loop_join(left, right, pairs, how, suffixes=("_left", "_right")):
+    """The join mini_join should give, found by comparing every pair of records."""
+    shared = {left_key for left_key, right_key in pairs if left_key == right_key}
+    right_columns = [column for column in (right[0] if right else ()) if column not in shared]
+    clash = set(left[0]) & set(right_columns)
+    for left_record in left:
+        key = [left_record.get(left_key) for left_key, _ in pairs]
+        row = {column + suffixes[0] if column in clash else column: value for column, value in left_record.items()}
+        matched = False
+        for right_record in right:
+            if any(value in MINI_MISSING for value in key) or key != [right_record.get(right_key) for _, right_key in pairs]:
+                continue
+            matched = True
+            yield {**row, **{column + suffixes[1] if column in clash else column: right_record[column] for column in right_columns}}
+        if how == "left" and not matched:
+            yield {**row, **{column + suffixes[1] if column in clash else column: None for column in right_columns}}
+
+
+def canonical(records):
+    return sorted(repr(sorted(record.items(), key=repr)) for record in records)
+
+
+def random_join_sides(seed):
+    rng = random.Random(seed)
+    keys = [1, 2, 3, 4, 5, "", None]
+    left = [{"id": rng.choice(keys), "part": rng.randint(0, 2), "value": i, "name": f"l{i}"} for i in range(rng.randint(1, 60))]
+    right = [{"id": rng.choice(keys), "part": rng.randint(0, 2), "value": -i, "city": f"r{i}"} for i in range(rng.randint(1, 60))]
+    return left, right
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("how", ["inner", "left"])
+@pytest.mark.parametrize("on", ["id", [("id", "id"), "part"]], ids=["one_key", "two_keys"])
+def test_join_matches_nested_loop_reference(seed, how, on):
+    left, right = random_join_sides(seed)
+    pairs = [(key, key) if isinstance(key, str) else key for key in ([on] if isinstance(on, str) else on)]
+    expected = canonical(nested_loop_join(left, right, pairs, how))
+
+    assert canonical(mini_join(left, right, on, how)) == expected
+    assert canonical(mini_join(iter(left), right, on, how)) == expected  # Streamed left side
+    assert canonical(mini_join(left, right, on, how, max_build_rows=5, partitions=4)) == expected  # Spilling
+    assert canonical(mini_join(iter(left), right, on, how, max_build_rows=5, partitions=4)) == expected
+
+
+@pytest.fixture
+def cache_csv(tmp_path):
+    """Int, float, text and numbers-with-text ('object') columns, each with a missing cell."""
+    filename = tmp_path / "cache.csv"
+    filename.write_text(
+        'id,score,ratio,reading,group\n1,,0.5,N/A,North\n2,7,,3,\n3,9,1.25,4.5,"South, East"\n4,11,2.0,,North\n',
+        encoding="utf-8",
+    )
+    return str(filename)
+
+
+def test_cache_round_trip_matches_uncached_load(cache_csv):
+    uncached = mini_load_csv_dict({"filename": cache_csv, "storage": "columnar"})
+    first = mini_load_csv_cached({"filename": cache_csv})
+    cached = mini_read_cache(cache_csv)
+
+    assert {name: column.kind for name, column in cached.columns.items()} == {
+        "id": "int",
+        "score": "int",
+        "ratio": "float",
+        "reading": "object",
+        "group": "str",
+    }
+    assert cached.schema == uncached.schema == first.schema
+    assert cached.to_dicts() == uncached.to_dicts() == mini_load_csv_dict({"filename": cache_csv})
+    assert mini_load_csv_cached({"filename": cache_csv}).to_dicts() == uncached.to_dicts()
+    assert mini_average({"Data": cached, "Column": "score"}) == mini_average({"Data": uncached, "Column": "score"})
+
+
+def test_cache_is_rebuilt_for_another_schema(cache_csv):
+    mini_load_csv_cached({"filename": cache_csv})
+    schema = {**mini_infer_schema({"filename": cache_csv}), "score": "float"}
+
+    assert mini_read_cache(cache_csv, schema) is None
+    table = mini_load_csv_cached({"filename": cache_csv, "schema": schema})
+    assert table.schema == schema
+    assert mini_read_cache(cache_csv, schema).to_dicts() == table.to_dicts()
+    assert mini_read_cache(cache_csv, mini_infer_schema({"filename": cache_csv})) is None
+
+
+def test_cache_survives_a_touch_but_not_an_edit(cache_csv):
+    mini_load_csv_cached({"filename": cache_csv})
+    cache_path = cache_csv + MINI_CACHE_SUFFIX
+    written = os.stat(cache_path).st_mtime_ns
+    stat = os.stat(cache_csv)
+    os.utime(cache_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    assert mini_read_cache(cache_csv) is not None  # Same content, the hash decides
+    mini_load_csv_cached({"filename": cache_csv})
+    assert os.stat(cache_path).st_mtime_ns == written  # Reused, not rewritten
+
+    with open(cache_csv, "r+", encoding="utf-8") as file:
+        text = file.read()
+        file.seek(0)
+        file.write(text.replace("North", "Norte"))  # Same size, different content
+    assert mini_read_cache(cache_csv) is None
+    assert mini_load_csv_cached({"filename": cache_csv}).to_dicts()[0]["group"] == "Norte"
+
+
+@pytest.fixture
+def weather_stub(request):
+    """The local forecast stub, started with the test's parameters and shut down afterwards."""
+    server = start_weather_stub(**getattr(request, "param", {}))
+    yield server
+    server.shutdown()
+
+
+def stub_record(place):
+    forecast = stub_forecast(place["lat"], place["lon"])
+    return {
+        **place,
+        "current_temp": forecast["current"]["temperature_2m"],
+        "today_max": forecast["daily"]["temperature_2m_max"][0],
+        "today_min": forecast["daily"]["temperature_2m_min"][0],
+    }
+
+
+STUB_CITIES = [{"city": f"Place {i}", "country": "Stub", "lat": i * 1.5, "lon": i * 2.5} for i in range(9)]
+
+
+@pytest.mark.parametrize("weather_stub", [{"fail_every": 3}], indirect=True)
+def test_weather_retries_recover_from_429(weather_stub):
+    records = list(mini_get_weather_data_stream(STUB_CITIES, rate=1000, retries=2, backoff=0, url=weather_stub.url))
+
+    assert records == [stub_record(place) for place in STUB_CITIES]
+    assert weather_stub.requests > len(STUB_CITIES)
+
+
+@pytest.mark.parametrize("weather_stub", [{"fail_every": 3}], indirect=True)
+def test_weather_skips_cities_that_still_fail(weather_stub, capsys):
+    records = list(mini_get_weather_data_stream(STUB_CITIES, rate=1000, retries=0, url=weather_stub.url))
+
+    assert records == [stub_record(place) for i, place in enumerate(STUB_CITIES) if i % 3 != 2]
+    assert capsys.readouterr().out.count("Error fetching data for") == 3
+
+
+@pytest.mark.parametrize("weather_stub", [{"fail_every": 2, "retry_after": "86400"}], indirect=True)
+def test_retry_after_is_capped(weather_stub, monkeypatch):
+    waits = []
+    monkeypatch.setattr(time, "sleep", waits.append)
+
+    records = list(mini_get_weather_data_stream(STUB_CITIES[:2], rate=1000, retries=1, url=weather_stub.url))
+
+    assert records == [stub_record(place) for place in STUB_CITIES[:2]]
+    assert [wait for wait in waits if wait >= 1] == [MINI_WEATHER_MAX_DELAY]  # The token bucket's own waits are milliseconds
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert mini_retry_after("120") == 120.0
+    assert mini_retry_after(None) is None
+    assert mini_retry_after("soon") is None
+    assert mini_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # In the past
+    assert 25 < mini_retry_after(email.utils.formatdate(time.time() + 30, usegmt=True)) <= 30
+
+
+def test_count_match_rejects_columns_not_in_the_data():
+    filename = os.path.join(os.path.dirname(__file__), "datasets", "sleep_health_and_lifestyle_data.csv")
+    sleep_data = mini_load_csv_dict({"filename": filename})
+
+    assert mini_count_match({"Data": sleep_data, "Gender": "Female", "Occupation": "Nurse"})["Count"] == 73
+    for data in (sleep_data, mini_load_csv_dict({"filename": filename, "storage": "columnar"}), iter(sleep_data)):
+        with pytest.raises(ValueError, match="Columns not in the data"):
+            mini_count_match({"Data": data, "Column": "Gender", "Value": "Female"})
+    assert mini_count_match({"Data": iter(sleep_data), "Gender": "Female"})["Count"] == 185
+    assert mini_count_match({"Data": [], "Gender": "Female"})["Count"] == 0
@@ -0,0 +1,104 @@
+"""A local stand-in for the open-meteo forecast endpoint, run with `python weather_stub.py --help`.
+
+Point the weather functions at it with `url=`, for example
+mini_get_weather_data_stream(cities, workers=8, url="http://127.0.0.1:8765/v1/forecast").
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def stub_forecast(lat: float, lon: float) -> dict:
+    """Returns a fixed open-meteo style forecast for one location, the same every time for the same place."""
+    current = round(30 - abs(lat) / 3 + (lon % 7) / 2, 1)
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": {"temperature_2m": current},
+        "daily": {"temperature_2m_max": [round(current + 3.5, 1)], "temperature_2m_min": [round(current - 6.2, 1)]},
+    }
+
+
+class WeatherStubHandler(BaseHTTPRequestHandler):
+    """Answers /v1/forecast like open-meteo: one object for one location, a list for comma separated ones."""
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.fail_every and server.requests % server.fail_every == 0
+        if server.delay:
+            time.sleep(server.delay)
+        if fail:
+            self.send_json(429, {"error": True, "reason": "Too many requests"}, {"Retry-After": server.retry_after})
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            lats = [float(value) for value in query["latitude"][0].split(",")]
+            lons = [float(value) for value in query["longitude"][0].split(",")]
+            if len(lats) != len(lons):
+                raise ValueError("latitude and longitude must have the same length")
+        except (KeyError, ValueError) as e:
+            self.send_json(400, {"error": True, "reason": str(e)})
+            return
+        forecasts = [stub_forecast(lat, lon) for lat, lon in zip(lats, lons)]
+        self.send_json(200, forecasts[0] if len(forecasts) == 1 else forecasts)
+
+    def send_json(self, status: int, body: object, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def start_weather_stub(port: int = 0, delay: float = 0.0, fail_every: int = 0, retry_after: str = "0") -> ThreadingHTTPServer:
+    """
+    Starts the stub server in a background thread and returns it.
+
+    Args:
+        port (int, optional): The port to listen on, 0 picks a free one. Defaults to 0.
+        delay (float, optional): Seconds to wait before answering, to mimic network latency. Defaults to 0.0.
+        fail_every (int, optional): Answer every nth request with 429, to exercise retries. Defaults to 0 (never).
+        retry_after (str, optional): The Retry-After header sent with a 429. Defaults to "0".
+
+    Returns:
+        ThreadingHTTPServer: The running server; its `url` attribute is the forecast endpoint, `requests`
+            counts the requests received and `shutdown()` stops it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), WeatherStubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.fail_every = fail_every
+    server.retry_after = retry_after
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds of latency per request")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every nth request with 429")
+    parser.add_argument("--retry-after", default="0", help="the Retry-After header sent with a 429")
+    args = parser.parse_args()
+    stub = start_weather_stub(args.port, args.delay, args.fail_every, args.retry_after)
+    print(f"Serving {stub.url}, press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.shutdown()